@@ -12,11 +12,15 @@ from pathlib import Path
 src_path = Path(__file__).parent / 'src'
 sys.path.insert(0, str(src_path))
 
-try:
-    import questionary
-except ImportError:
-    print("questionaryが見つかりません: pip install questionary")
-    sys.exit(1)
+
+def import_questionary():
+    """questionaryを読み込む（対話モードでのみ使用し、引数解析・--versionでは読み込まない）"""
+    try:
+        import questionary
+    except ImportError:
+        print("questionaryが見つかりません: pip install questionary")
+        sys.exit(1)
+    return questionary
 
 
 class VibesToolsCLI:
@@ -60,7 +64,7 @@ class VibesToolsCLI:
             "❌ 終了"
         ]
 
-        return questionary.select(
+        return import_questionary().select(
             "実行したい機能を選択してください:",
             choices=choices
         ).ask()
@@ -125,7 +129,7 @@ class VibesToolsCLI:
                     self.run_system_config()
 
                 # 継続確認
-                if not questionary.confirm("他の機能を実行しますか？", default=True).ask():
+                if not import_questionary().confirm("他の機能を実行しますか？", default=True).ask():
                     break
 
             except KeyboardInterrupt:
@@ -135,6 +139,31 @@ class VibesToolsCLI:
         print("\n👋 Vibes Tools を終了します")
 
 
+def run_document_action(args) -> int:
+    """ドキュメント管理オーケストレータで非対話実行"""
+    from application.document_management import DocumentManagementCLI
+
+    return DocumentManagementCLI().run_with_args(
+        args.action,
+        getattr(args, 'file', None),
+        getattr(args, 'quiet', False),
+        getattr(args, 'doc_type', None),
+        getattr(args, 'filename', None)
+    )
+
+
+def run_hook_maintenance_action(args) -> int:
+    """フック保守オーケストレータで非対話実行"""
+    from application.hook_maintenance import HookMaintenanceCLI
+
+    return HookMaintenanceCLI().run_with_args(
+        args.action,
+        getattr(args, 'quiet', False),
+        getattr(args, 'dry_run', False),
+        getattr(args, 'group_by', None)
+    )
+
+
 def main():
     """エントリポイント"""
     # 責務は純粋なルータである｡オプションは全て各オーケストラに直接渡す
@@ -151,9 +180,9 @@ def main():
     parser.add_argument('--direct', choices=list(VibesToolsCLI.DIRECT_HANDLERS.keys()),
                        help=direct_help_text)
     
-    # 非対話モード用のオプション（オーケストレータに委譲）
-    from application.document_management import DocumentManagementCLI
-    DocumentManagementCLI.add_parser_arguments(parser)
+    # 非対話モード用のオプション（オーケストレータは実行時にのみ読み込む）
+    from application.cli_options import add_action_arguments, DOCUMENT_ACTIONS, HOOK_MAINTENANCE_ACTIONS
+    add_action_arguments(parser)
 
     args = parser.parse_args()
 
@@ -165,15 +194,9 @@ def main():
         cli = VibesToolsCLI()
         # --directと--actionが両方指定された場合は非対話モード
         if args.direct == 'doc' and args.action:
-            from application.document_management import DocumentManagementCLI
-            doc_cli = DocumentManagementCLI()
-            return doc_cli.run_with_args(
-                args.action, 
-                getattr(args, 'file', None), 
-                getattr(args, 'quiet', False),
-                getattr(args, 'doc_type', None),
-                getattr(args, 'filename', None)
-            )
+            return run_document_action(args)
+        elif args.direct == 'hook' and args.action:
+            return run_hook_maintenance_action(args)
         else:
             # 通常の対話モード
             method_name = cli.DIRECT_HANDLERS.get(args.direct)
@@ -183,18 +206,11 @@ def main():
 
     # 非対話モード: 適切なオーケストレータに委譲
     if args.action:
-        from application.document_management import DocumentManagementCLI
-        
         # アクションを処理できるオーケストレータを探す
-        if DocumentManagementCLI.can_handle_action(args.action):
-            cli = DocumentManagementCLI()
-            return cli.run_with_args(
-                args.action, 
-                getattr(args, 'file', None), 
-                getattr(args, 'quiet', False),
-                getattr(args, 'doc_type', None),
-                getattr(args, 'filename', None)
-            )
+        if args.action in HOOK_MAINTENANCE_ACTIONS:
+            return run_hook_maintenance_action(args)
+        elif args.action in DOCUMENT_ACTIONS:
+            return run_document_action(args)
         else:
             print(f"エラー: 未対応のアクション: {args.action}")
             return 1
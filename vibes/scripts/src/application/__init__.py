@@ -1,5 +1,14 @@
-"""アプリケーション層 - オーケストレータ"""
+"""アプリケーション層 - オーケストレータ
 
-from .document_management import DocumentManagementCLI
+オーケストレータは対話用ライブラリ（questionary, rich）を読み込むため、
+参照時に初めてimportする（main.py の引数解析・--version を軽くするため）。
+"""
 
-__all__ = ['DocumentManagementCLI']
\ No newline at end of file
+__all__ = ['DocumentManagementCLI']
+
+
+def __getattr__(name):
+    if name == 'DocumentManagementCLI':
+        from .document_management import DocumentManagementCLI
+        return DocumentManagementCLI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
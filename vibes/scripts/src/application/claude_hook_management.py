@@ -7,7 +7,7 @@ from rich.table import Table
 from rich.console import Console
 from domain.services.hook_manager import HookManager
 from infrastructure.config.config_manager import ConfigManager
-from infrastructure.hooks.hook_executor import HookExecutor
+from infrastructure.hooks.hook_executor import HookExecutor, ExecutionSettings, aggregate_results
 from shared.base.base_cli import BaseCLI
 
 
@@ -22,7 +22,9 @@ class HookManagementCLI(BaseCLI):
         # デフォルトの.claudeディレクトリを設定から取得
         claude_dir = self.config.get_claude_dir()
         self.hook_manager = HookManager(claude_dir)
-        self.hook_executor = HookExecutor(claude_dir)
+        self.hook_executor = HookExecutor(
+            claude_dir, ExecutionSettings.from_settings(self.config.get_hook_execution_settings())
+        )
 
     def show_menu(self) -> str:
         """サブメニュー表示"""
@@ -35,6 +37,7 @@ class HookManagementCLI(BaseCLI):
             "🧪 フックテスト実行",
             "📝 規約ルール確認",
             "⚙️ 設定ディレクトリ変更",
+            "🗄️ マーカー・一時ファイル整理",
             "🔙 メインメニューに戻る"
         ]
 
@@ -67,6 +70,8 @@ class HookManagementCLI(BaseCLI):
                 self.show_convention_rules()
             elif "設定ディレクトリ変更" in choice:
                 self.change_claude_dir()
+            elif "マーカー・一時ファイル整理" in choice:
+                self.run_maintenance()
 
     def list_hooks(self):
         """フック一覧表示"""
@@ -398,11 +403,19 @@ class HookManagementCLI(BaseCLI):
                             self.print_warning(f"Reason:\n{result.get('reason')}")
                         if result.get('error'):
                             self.print_error(f"Error: {result.get('error')}")
+                    if len(results) > 1:
+                        self.print_info(f"Overall decision: {aggregate_results(results)['decision']}")
                 else:
                     self.print_info("フックは発火しませんでした（該当なし）")
         else:
             self.print_info("カスタムフックのテストは未実装です")
 
+    def run_maintenance(self):
+        """マーカー・一時ファイル整理（フック保守オーケストレータに委譲）"""
+        from application.hook_maintenance import HookMaintenanceCLI
+
+        HookMaintenanceCLI().run_interactive()
+
     def show_convention_rules(self):
         """規約ルール確認"""
         from domain.services.file_convention_matcher import FileConventionMatcher
@@ -0,0 +1,52 @@
+"""非対話モード（--action）のアクションと引数の定義
+
+main.py が対話用ライブラリ（questionary, rich）や各オーケストレータを読み込まずに
+引数を解析できるよう、アクション一覧と引数の追加はここにまとめる。
+各オーケストレータの ACTIONS / add_parser_arguments はここを参照する。
+"""
+
+
+
+# ドキュメント管理（DocumentManagementCLI）のアクション
+DOCUMENT_ACTIONS = ['check_all', 'check_file', 'update_all', 'update_file', 'generate']
+
+# フック保守（HookMaintenanceCLI）のアクション
+HOOK_MAINTENANCE_ACTIONS = ['hook_gc', 'hook_stats']
+
+ACTIONS = DOCUMENT_ACTIONS + HOOK_MAINTENANCE_ACTIONS
+
+# hook_stats の集計単位（infrastructure.metrics.hook_metrics.GROUP_FIELDS と同じ。
+# 引数解析で hook_metrics とその依存を読み込まないよう、ここで定義する）
+METRICS_GROUP_FIELDS = ('hook', 'tool', 'rule')
+
+
+def add_document_arguments(parser) -> None:
+    """ドキュメント管理の引数を追加"""
+    parser.add_argument('--file', type=str, help='対象ファイルパス (check_file, update_file で必須)')
+    parser.add_argument('--quiet', action='store_true', help='簡潔出力モード (例: "12 errors, 0 warnings")')
+
+    # generateアクション用の引数
+    parser.add_argument('--doc-type', choices=['rules', 'specs', 'tasks', 'logics', 'temps'],
+                        help='ドキュメントタイプ (generate で必須)')
+    parser.add_argument('--filename', type=str, help='ファイル名 (拡張子不要, generate で必須)')
+
+
+def add_hook_maintenance_arguments(parser) -> None:
+    """フック保守の引数を追加"""
+    parser.add_argument('--dry-run', action='store_true',
+                        help='対象件数のみ表示し削除しない (hook_gc)')
+    parser.add_argument('--group-by', type=str, default=','.join(METRICS_GROUP_FIELDS),
+                        help=f"集計の単位をカンマ区切りで指定 (hook_stats, 既定: {','.join(METRICS_GROUP_FIELDS)})")
+
+
+def add_action_arguments(parser) -> None:
+    """
+    --action と全オーケストレータの引数を追加
+
+    Args:
+        parser: メインパーサー
+    """
+    parser.add_argument('--action', choices=ACTIONS,
+                        help=f"実行するアクション。利用可能: {', '.join(ACTIONS)}")
+    add_document_arguments(parser)
+    add_hook_maintenance_arguments(parser)
@@ -8,11 +8,14 @@ from domain.services.reference_checker import ReferenceChecker
 from domain.services.document_generator import DocumentGenerator
 from infrastructure.config.config_manager import ConfigManager
 from shared.base.base_cli import BaseCLI
+from application.cli_options import DOCUMENT_ACTIONS, add_document_arguments
 
 
 class DocumentManagementCLI(BaseCLI):
     """ドキュメント管理オーケストレータ"""
 
+    ACTIONS = DOCUMENT_ACTIONS
+
     def __init__(self):
         super().__init__()
         self.config = ConfigManager()
@@ -22,18 +25,11 @@ class DocumentManagementCLI(BaseCLI):
 
     @classmethod
     def add_parser_arguments(cls, parser):
-        """メインパーサーに引数を追加（オーケストレータの責務）"""
-        doc_actions = ['check_all', 'check_file', 'update_all', 'update_file', 'generate']
-        action_help = f"実行するアクション。利用可能: {', '.join(doc_actions)}"
-        
-        parser.add_argument('--action', choices=doc_actions, help=action_help)
-        parser.add_argument('--file', type=str, help='対象ファイルパス (check_file, update_file で必須)')
-        parser.add_argument('--quiet', action='store_true', help='簡潔出力モード (例: "12 errors, 0 warnings")')
-        
-        # generateアクション用の引数
-        parser.add_argument('--doc-type', choices=['rules', 'specs', 'tasks', 'logics', 'temps'],
-                           help='ドキュメントタイプ (generate で必須)')
-        parser.add_argument('--filename', type=str, help='ファイル名 (拡張子不要, generate で必須)')
+        """メインパーサーに引数を追加（オーケストレータの責務）
+
+        --action はルータ（main.py）が application.cli_options から追加する。
+        """
+        add_document_arguments(parser)
 
     def show_menu(self) -> str:
         """サブメニュー表示"""
@@ -88,8 +84,8 @@ class DocumentManagementCLI(BaseCLI):
     def run_with_args(self, action: str, file_path: str = None, quiet: bool = False, doc_type: str = None, filename: str = None) -> int:
         """コマンドライン引数で非対話実行（オーケストレータの責務）"""
         # アクションのバリデーションと実行
-        valid_actions = ['check_all', 'check_file', 'update_all', 'update_file', 'generate']
-        
+        valid_actions = self.ACTIONS
+
         if action not in valid_actions:
             if not quiet:
                 self.print_error(f'不正なアクション: {action}')
@@ -182,8 +178,7 @@ class DocumentManagementCLI(BaseCLI):
     @classmethod
     def can_handle_action(cls, action: str) -> bool:
         """このオーケストレータが処理できるアクションか確認"""
-        valid_actions = ['check_all', 'check_file', 'update_all', 'update_file', 'generate']
-        return action in valid_actions
+        return action in cls.ACTIONS
 
     def generate_new_document(self):
         """新規ドキュメント生成"""
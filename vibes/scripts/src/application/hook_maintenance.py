@@ -0,0 +1,186 @@
+"""フック保守オーケストレータ（マーカー・一時ファイルの整理、実行時間の集計）"""
+
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Sequence
+import questionary
+from rich.table import Table
+from rich.console import Console
+from infrastructure.config.config_manager import ConfigManager
+from infrastructure.markers.marker_store import MarkerStore
+from infrastructure.markers.retention import RetentionService, RetentionPolicy, RetentionResult
+from infrastructure.metrics.hook_metrics import HookMetricsLog, MetricsSettings, summarize, GROUP_FIELDS, PERCENTILES
+from shared.base.base_cli import BaseCLI
+from application.cli_options import HOOK_MAINTENANCE_ACTIONS, add_hook_maintenance_arguments
+
+
+class HookMaintenanceCLI(BaseCLI):
+    """フック保守オーケストレータ"""
+
+    ACTIONS = HOOK_MAINTENANCE_ACTIONS
+
+    # 整理結果の表示名
+    RESULT_LABELS = {
+        'archived_history': '期限切れ履歴（アーカイブへ移動）',
+        'deleted_markers': '長期間未更新のマーカー',
+        'deleted_counters': '参照されない期限切れ回数',
+        'deleted_raw_inputs': 'フック入力の生JSON',
+        'deleted_checkpoints': 'transcriptチェックポイント',
+        'deleted_transcript_usage': 'transcriptのusageキャッシュ'
+    }
+
+    def __init__(self, store: Optional[MarkerStore] = None):
+        super().__init__()
+        self.config = ConfigManager()
+        self.store = store or MarkerStore(logger=self.logger)
+
+    @classmethod
+    def add_parser_arguments(cls, parser):
+        """メインパーサーに引数を追加（オーケストレータの責務）"""
+        add_hook_maintenance_arguments(parser)
+
+    @classmethod
+    def can_handle_action(cls, action: str) -> bool:
+        """このオーケストレータが処理できるアクションか確認"""
+        return action in cls.ACTIONS
+
+    def show_menu(self) -> str:
+        """サブメニュー表示"""
+        choices = [
+            "🔍 整理対象の確認 (dry-run)",
+            "🧹 マーカー・一時ファイル整理",
+            "📊 フック実行時間の統計",
+            "🔙 戻る"
+        ]
+
+        return questionary.select(
+            "フック保守機能を選択:",
+            choices=choices
+        ).ask()
+
+    def run_interactive(self):
+        """対話的実行"""
+        while True:
+            choice = self.show_menu()
+
+            if not choice or "戻る" in choice:
+                break
+
+            if "整理対象の確認" in choice:
+                self._print_result(self.collect_garbage(dry_run=True))
+            elif "マーカー・一時ファイル整理" in choice:
+                self._print_result(self.collect_garbage())
+            elif "フック実行時間の統計" in choice:
+                self._print_stats(self.collect_stats(), GROUP_FIELDS)
+
+    def collect_garbage(self, dry_run: bool = False) -> RetentionResult:
+        """
+        保持期間設定に従いマーカー・一時ファイルを全件整理
+
+        Args:
+            dry_run: Trueの場合は対象件数のみ数える
+
+        Returns:
+            整理結果
+        """
+        policy = RetentionPolicy.from_settings(self.config.get_retention_settings())
+        service = RetentionService(self.store, policy, logger=self.logger)
+        return service.run(dry_run=dry_run)
+
+    def collect_stats(self, group_by: Sequence[str] = GROUP_FIELDS) -> List[Dict[str, Any]]:
+        """
+        フック実行時間の記録をグループ別に集計
+
+        Args:
+            group_by: 集計の単位（'hook', 'tool', 'rule' の組み合わせ）
+
+        Returns:
+            グループ毎のパーセンタイル（summarize() の戻り値）
+        """
+        settings = MetricsSettings.from_settings(self.config.get_metrics_settings())
+        return summarize(HookMetricsLog(Path(settings.file), settings.max_bytes).read(), group_by)
+
+    def run_with_args(self, action: str, quiet: bool = False, dry_run: bool = False,
+                      group_by: Optional[str] = None) -> int:
+        """コマンドライン引数で非対話実行（オーケストレータの責務）"""
+        if not self.can_handle_action(action):
+            if not quiet:
+                self.print_error(f'不正なアクション: {action}')
+                self.print_info(f'有効なアクション: {", ".join(self.ACTIONS)}')
+            return 1
+
+        if action == 'hook_stats':
+            return self._run_stats(quiet, group_by)
+
+        try:
+            result = self.collect_garbage(dry_run=dry_run)
+        except Exception as e:
+            if not quiet:
+                self.print_error(f'整理に失敗しました: {e}')
+            return 1
+        finally:
+            self.store.close()
+
+        if quiet:
+            print(f"{'Would remove' if dry_run else 'Removed'} {result.total} items")
+        else:
+            self._print_result(result)
+        return 0
+
+    def _run_stats(self, quiet: bool, group_by: Optional[str]) -> int:
+        """hook_stats アクションの実行"""
+        fields = [name.strip() for name in (group_by or ','.join(GROUP_FIELDS)).split(',') if name.strip()]
+        invalid = [name for name in fields if name not in GROUP_FIELDS]
+        if invalid:
+            if not quiet:
+                self.print_error(f'不正な集計単位: {", ".join(invalid)}')
+                self.print_info(f'有効な集計単位: {", ".join(GROUP_FIELDS)}')
+            return 1
+
+        summaries = self.collect_stats(fields)
+        if quiet:
+            # 簡潔出力（1グループ1行、タブ区切り）
+            for summary in summaries:
+                total = summary['total']
+                print('\t'.join([*(str(summary[name]) for name in fields), str(summary['count']),
+                                  *(f"{total[f'p{p}']:.2f}" for p in PERCENTILES)]))
+        else:
+            self._print_stats(summaries, fields)
+        return 0
+
+    def _print_stats(self, summaries: List[Dict[str, Any]], fields: Sequence[str]) -> None:
+        """集計結果を表示（所要時間はミリ秒）"""
+        if not summaries:
+            self.print_info("フック実行時間の記録がありません")
+            return
+
+        table = Table(title="フック実行時間 (ms)")
+        for name in fields:
+            table.add_column(name, style="cyan")
+        table.add_column("phase", style="yellow")
+        table.add_column("count", justify="right")
+        for p in PERCENTILES:
+            table.add_column(f"p{p}", justify="right", style="magenta")
+
+        for summary in summaries:
+            keys = [str(summary[name]) for name in fields]
+            rows = [('total', summary['total'])] + sorted(summary['phases'].items())
+            for i, (phase, values) in enumerate(rows):
+                table.add_row(
+                    *(keys if i == 0 else [''] * len(keys)),
+                    phase,
+                    str(summary['count']) if i == 0 else '',
+                    *(f"{values[f'p{p}']:.2f}" for p in PERCENTILES)
+                )
+
+        Console().print(table)
+
+    def _print_result(self, result: RetentionResult) -> None:
+        """整理結果を表示"""
+        counts = result.to_dict()
+        for key, label in self.RESULT_LABELS.items():
+            print(f"  {label}: {counts[key]}")
+
+        if result.dry_run:
+            self.print_info(f"整理対象: {result.total}件（dry-run のため変更していません）")
+        else:
+            self.print_success(f"{result.total}件を整理しました")
@@ -1,12 +1,21 @@
 """フック処理の基底クラス"""
 
-import json
 import sys
-import logging
+from contextlib import nullcontext
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, TextIO
 from datetime import datetime
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from domain.hooks.hook_context import HookContext
+from infrastructure.transcript.transcript_reader import TranscriptReader, UsageState
+from infrastructure.markers.marker_store import MarkerStore, MarkerKey
+from infrastructure.markers.retention import RetentionService, RetentionPolicy
+from infrastructure.capture.raw_input_capture import RawInputCapture, RawCaptureSettings
+from infrastructure.metrics.hook_metrics import PhaseTimer, HookMetricsLog, MetricsSettings
+from shared.utils.hook_logging import configure_hook_logging, get_hook_logger
+from shared.utils import json_codec
 
 
 class BaseHook(ABC):
@@ -23,79 +32,225 @@ class BaseHook(ABC):
         self.debug = debug
         self.log_file = log_file or Path("/tmp/claude_hooks_debug.log")
         self._setup_logging()
+        self.transcript_reader = TranscriptReader(logger=self.logger)
+        self.marker_store = MarkerStore(logger=self.logger)
+        self._raw_capture: Optional[RawInputCapture] = None
+        self._metrics_log: Optional[HookMetricsLog] = None
+        self._metrics_loaded = False
+        self._timer: Optional[PhaseTimer] = None
+        self._context: Optional[HookContext] = None
+        self._output_stream: Optional[TextIO] = None
 
     def _setup_logging(self):
-        """ロギングの設定"""
-        # ログはファイルのみに出力（デバッグ用に一時的にDEBUGレベル）
-        logging.basicConfig(
-            level=logging.DEBUG,
-            format='[%(asctime)s] %(levelname)s: %(message)s',
-            handlers=[logging.FileHandler(self.log_file)]
-        )
-        
-        self.logger = logging.getLogger(self.__class__.__name__)
+        """ロギングの設定（出力先・レベルは get_logging_settings() に従う）"""
+        configure_hook_logging(self.get_logging_settings(), self.log_file)
+        self.logger = get_hook_logger(self.__class__.__name__)
+
+    def get_logging_settings(self) -> Dict[str, Any]:
+        """
+        ロギング設定を取得
 
-    def log_debug(self, message: str):
-        """デバッグログ出力"""
-        self.logger.debug(message)
+        Returns:
+            configure_hook_logging に渡す設定（空の場合はデフォルト値）
+        """
+        return {}
+
+    def get_context(self, input_data: Dict[str, Any]) -> HookContext:
+        """
+        入力データに対応するリクエストスコープのコンテキストを取得
 
-    def log_info(self, message: str):
-        """情報ログ出力"""
-        self.logger.info(message)
+        同一の入力データに対しては同じコンテキストを返すため、
+        1回の呼び出し内でtranscript読み取りやマーカー読み込みが共有される。
 
-    def log_error(self, message: str):
-        """エラーログ出力"""
-        self.logger.error(message)
+        Args:
+            input_data: 入力データ
+
+        Returns:
+            フックコンテキスト
+        """
+        if self._context is None or self._context.input_data is not input_data:
+            self._context = HookContext(input_data)
+        return self._context
+
+    def get_usage_state(self, input_data: Dict[str, Any]) -> UsageState:
+        """
+        transcriptのトークン数の状態を取得（呼び出し内でメモ化）
+
+        Args:
+            input_data: 入力データ（transcript_pathを含む）
+
+        Returns:
+            トークン数の状態（取得できない場合は空の状態）
+        """
+        return self.get_context(input_data).get_usage_state(self._get_usage_state)
+
+    def get_context_size(self, input_data: Dict[str, Any]) -> Optional[int]:
+        """
+        現在のコンテキストサイズを取得（呼び出し内でメモ化）
+
+        Args:
+            input_data: 入力データ（transcript_pathを含む）
+
+        Returns:
+            トークン数（取得できない場合None）
+        """
+        return self.get_usage_state(input_data).context_tokens
+
+    def get_cumulative_tokens(self, input_data: Dict[str, Any]) -> Optional[int]:
+        """
+        コンパクションで減少しない累積トークン数を取得（マーカーへの記録用）
 
-    def _save_raw_json(self, raw_json: str):
-        """生のJSONテキストを一時ファイルに保存"""
+        Args:
+            input_data: 入力データ（transcript_pathを含む）
+
+        Returns:
+            累積トークン数（取得できない場合None）
+        """
+        state = self.get_usage_state(input_data)
+        return state.cumulative_tokens if state.usage else None
+
+    def tokens_since_marker(self, input_data: Dict[str, Any], marker_data: Dict[str, Any]) -> Optional[int]:
+        """
+        マーカー作成時からのトークン増加量（コンパクションで減少しない）
+
+        マーカーに記録した累積トークン数との差を返すため、コンパクション直後でも
+        負の値や見かけ上の大きな変化にならない。累積トークン数を持たない旧形式の
+        マーカーと、累積トークン数がマーカーより小さい場合（チェックポイントの削除・
+        transcriptの置き換えで累積トークン数が数え直された場合）はコンテキストサイズの
+        増加量（減少時は0）を返す。
+
+        Args:
+            input_data: 入力データ（transcript_pathを含む）
+            marker_data: マーカーデータ
+
+        Returns:
+            増加トークン数（transcriptから取得できない場合None）
+        """
+        state = self.get_usage_state(input_data)
+        if not state.usage:
+            return None
+        baseline = marker_data.get('cumulative_tokens')
+        if baseline is None or state.cumulative_tokens < baseline:
+            return max(0, state.context_tokens - (marker_data.get('tokens') or 0))
+        return state.cumulative_tokens - baseline
+
+    def read_marker(self, input_data: Dict[str, Any], marker: MarkerKey) -> Optional[Dict[str, Any]]:
+        """
+        マーカーデータを読み取り（呼び出し内でメモ化）
+
+        Args:
+            input_data: 入力データ
+            marker: マーカーの識別子
+
+        Returns:
+            マーカーデータ（存在しない場合None）
+        """
+        return self.get_context(input_data).get_marker(marker, self._read_marker_data)
+
+    def _forget_marker(self, marker: MarkerKey) -> None:
+        """現在のコンテキストからマーカーのキャッシュを破棄"""
+        if self._context is not None:
+            self._context.forget_marker(marker)
+
+    def log_debug(self, message: str, *args):
+        """デバッグログ出力（argsは %-形式で出力時にのみ展開）"""
+        self.logger.debug(message, *args)
+
+    def log_info(self, message: str, *args):
+        """情報ログ出力（argsは %-形式で出力時にのみ展開）"""
+        self.logger.info(message, *args)
+
+    def log_warning(self, message: str, *args):
+        """警告ログ出力（argsは %-形式で出力時にのみ展開）"""
+        self.logger.warning(message, *args)
+
+    def log_error(self, message: str, *args):
+        """エラーログ出力（argsは %-形式で出力時にのみ展開）"""
+        self.logger.error(message, *args)
+
+    def get_raw_capture_settings(self) -> Dict[str, Any]:
+        """
+        フック入力（生JSON）の保存設定を取得
+
+        Returns:
+            RawCaptureSettings に渡す設定（空の場合はデフォルト値）
+        """
+        return {}
+
+    @property
+    def raw_capture(self) -> RawInputCapture:
+        """フック入力の保存（サブクラスの設定読み込み後に初期化）"""
+        if self._raw_capture is None:
+            self._raw_capture = RawInputCapture(
+                RawCaptureSettings.from_settings(self.get_raw_capture_settings()),
+                logger=self.logger
+            )
+        return self._raw_capture
+
+    def get_metrics_settings(self) -> Dict[str, Any]:
+        """
+        実行時間計測の設定を取得
+
+        Returns:
+            MetricsSettings に渡す設定（空の場合はデフォルト値）
+        """
+        return {}
+
+    @property
+    def metrics_log(self) -> Optional[HookMetricsLog]:
+        """実行時間の記録先（計測が無効の場合None、サブクラスの設定読み込み後に初期化）"""
+        if not self._metrics_loaded:
+            settings = MetricsSettings.from_settings(self.get_metrics_settings())
+            self._metrics_log = HookMetricsLog(Path(settings.file), settings.max_bytes) if settings.enabled else None
+            self._metrics_loaded = True
+        return self._metrics_log
+
+    def _phase(self, name: str):
+        """現在の呼び出しのフェーズの所要時間を計測（run()の外・計測無効時は何もしない）"""
+        return self._timer.phase(name) if self._timer is not None else nullcontext()
+
+    def _record_metrics(self, input_data: Dict[str, Any], context: Optional[HookContext]) -> None:
+        """呼び出しの所要時間をツール名・マッチした規約名と共に記録"""
+        timer, self._timer = self._timer, None
+        if timer is None:
+            return
         try:
-            import os
-            from datetime import datetime
-            
-            # ディレクトリ作成
-            output_dir = "/tmp/claude"
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # タイムスタンプ付きファイル名
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-            filename = f"base_hook_{timestamp}.json"
-            filepath = os.path.join(output_dir, filename)
-            
-            # 生JSONを保存
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(raw_json)
-            
-            self.log_debug(f"Raw JSON saved to: {filepath}")
-            
+            timer.tags['tool'] = input_data.get('tool_name')
+            if context is not None and context.matched_rule:
+                timer.tags['rule'] = context.matched_rule.get('rule_name')
+            self.metrics_log.append(timer.to_record(self.__class__.__name__))
         except Exception as e:
-            self.log_error(f"Failed to save raw JSON: {e}")
+            self.log_error("Failed to record metrics: %s", e)
 
-    def read_input(self) -> Dict[str, Any]:
+    def read_input(self, input_stream: Optional[TextIO] = None) -> Dict[str, Any]:
         """
         標準入力からJSON入力を読み取る
         
+        Args:
+            input_stream: 入力ストリーム（省略時は標準入力）
+        
         Returns:
             入力データの辞書
         """
         try:
-            input_data = sys.stdin.read()
-            self.log_debug(f"Input JSON length: {len(input_data)}")
-            self.log_debug(f"Raw input data: {input_data[:500]}...")
+            input_data = (input_stream or sys.stdin).read()
+            self.log_debug("Input JSON length: %s", len(input_data))
+            self.log_debug("Raw input data: %s...", input_data[:500])
             
-            # 生のJSONテキストを保存
-            self._save_raw_json(input_data)
+            # 生のJSONテキストを保存（保存方法は設定のモードに従う）
+            self.raw_capture.capture(input_data)
             
             if not input_data:
                 self.log_error("No input data received")
                 return {}
             
-            return json.loads(input_data)
-        except json.JSONDecodeError as e:
-            self.log_error(f"JSON decode error: {e}")
+            return json_codec.loads(input_data)
+        except json_codec.JSONDecodeError as e:
+            self.log_error("JSON decode error: %s", e)
+            self.raw_capture.capture_error()
             return {}
         except Exception as e:
-            self.log_error(f"Unexpected error reading input: {e}")
+            self.log_error("Unexpected error reading input: %s", e)
             return {}
 
     def output_response(self, decision: str, reason: str = "") -> bool:
@@ -121,66 +276,78 @@ class BaseHook(ABC):
                 }
             }
 
-            json_output = json.dumps(response, ensure_ascii=False)
-            print(json_output)
+            if self._timer is not None:
+                self._timer.tags['decision'] = decision
+
+            json_output = json_codec.dumps_compact(response)
+            print(json_output, file=self._output_stream)
 
-            self.log_debug(f"Output response: {json_output}")
+            self.log_debug("Output response: %s", json_output)
             return True
         except Exception as e:
-            self.log_error(f"Failed to output response: {e}")
+            self.log_error("Failed to output response: %s", e)
             return False
 
-    def get_session_marker_path(self, session_id: str) -> Path:
+    def get_session_marker_key(self, session_id: str) -> MarkerKey:
         """
-        セッションマーカーファイルのパスを取得
+        セッションマーカーの識別子を取得
         
         Args:
             session_id: セッションID
             
         Returns:
-            マーカーファイルのパス
+            マーカーの識別子
         """
-        temp_dir = Path("/tmp")
-        marker_name = f"claude_hook_{self.__class__.__name__}_session_{session_id}"
-        return temp_dir / marker_name
+        return MarkerKey(self.__class__.__name__, session_id, 'session')
 
-    def get_command_marker_path(self, session_id: str, command: str) -> Path:
+    def get_command_marker_key(self, session_id: str, command: str) -> MarkerKey:
         """
-        コマンド用マーカーファイルのパスを取得
+        コマンド用マーカーの識別子を取得
+        
+        コマンドマーカーはフック間で共有する（フック名は空文字列）。
         
         Args:
             session_id: セッションID
             command: 実行コマンド
             
         Returns:
-            コマンドマーカーファイルのパス
+            マーカーの識別子
         """
         import hashlib
         
-        temp_dir = Path("/tmp")
-        # コマンドのハッシュ値を生成（ファイル名として使用）
+        # コマンドのハッシュ値をキーとして使用
         command_hash = hashlib.md5(command.encode()).hexdigest()[:8]
-        marker_name = f"claude_cmd_{session_id}_{command_hash}"
-        return temp_dir / marker_name
+        return MarkerKey('', session_id, 'command', command_hash)
 
-    def get_rule_marker_path(self, session_id: str, rule_name: str) -> Path:
+    def get_rule_marker_key(self, session_id: str, rule_name: str) -> MarkerKey:
         """
-        規約名別マーカーファイルのパスを取得
+        規約名別マーカーの識別子を取得
         
         Args:
             session_id: セッションID
             rule_name: 規約名（例: "Presenter層編集規約"）
             
         Returns:
-            規約別マーカーファイルのパス
+            マーカーの識別子
         """
         import hashlib
         
-        temp_dir = Path("/tmp")
-        # 規約名のハッシュ値を生成（ファイル名として使用）
+        # 規約名のハッシュ値をキーとして使用
         rule_hash = hashlib.md5(rule_name.encode()).hexdigest()[:8]
-        marker_name = f"claude_rule_{self.__class__.__name__}_{session_id}_{rule_hash}"
-        return temp_dir / marker_name
+        return MarkerKey(self.__class__.__name__, session_id, 'rule', rule_hash)
+
+    def _marker_exists(self, marker: MarkerKey) -> bool:
+        """マーカーが存在するか確認（ストアのエラー時はFalse）"""
+        try:
+            return self.marker_store.exists(marker)
+        except Exception as e:
+            self.log_error("Failed to check marker %s: %s", marker, e)
+            return False
+
+    def _write_marker(self, marker: MarkerKey, marker_data: Dict[str, Any]) -> None:
+        """マーカーを保存し、現在のコンテキストのキャッシュを破棄"""
+        self.marker_store.put(marker, marker_data)
+        self._forget_marker(marker)
 
     def is_rule_processed(self, session_id: str, rule_name: str) -> bool:
         """
@@ -193,10 +360,10 @@ class BaseHook(ABC):
         Returns:
             処理済みの場合True
         """
-        marker_path = self.get_rule_marker_path(session_id, rule_name)
-        return marker_path.exists()
+        return self._marker_exists(self.get_rule_marker_key(session_id, rule_name))
 
-    def mark_rule_processed(self, session_id: str, rule_name: str, context_tokens: int = 0) -> bool:
+    def mark_rule_processed(self, session_id: str, rule_name: str, context_tokens: int = 0,
+                            cumulative_tokens: Optional[int] = None) -> bool:
         """
         規約を処理済みとしてマーク
         
@@ -204,12 +371,13 @@ class BaseHook(ABC):
             session_id: セッションID
             rule_name: 規約名
             context_tokens: 現在のコンテキストサイズ
+            cumulative_tokens: 現在の累積トークン数（閾値判定の基準）
             
         Returns:
             マーク成功の場合True
         """
         try:
-            marker_path = self.get_rule_marker_path(session_id, rule_name)
+            marker = self.get_rule_marker_key(session_id, rule_name)
             
             # コンテキスト情報を含むマーカーデータを作成
             marker_data = {
@@ -218,15 +386,14 @@ class BaseHook(ABC):
                 'session_id': session_id,
                 'rule_name': rule_name
             }
+            if cumulative_tokens is not None:
+                marker_data['cumulative_tokens'] = cumulative_tokens
             
-            with open(marker_path, 'w') as f:
-                import json
-                json.dump(marker_data, f)
-                
-            self.log_debug(f"Created rule marker: {marker_path} for rule '{rule_name}' ({context_tokens} tokens)")
+            self._write_marker(marker, marker_data)
+            self.log_debug("Created rule marker: %s for rule '%s' (%s tokens)", marker, rule_name, context_tokens)
             return True
         except Exception as e:
-            self.log_error(f"Failed to create rule marker: {e}")
+            self.log_error("Failed to create rule marker: %s", e)
             return False
 
     def is_command_processed(self, session_id: str, command: str) -> bool:
@@ -240,10 +407,10 @@ class BaseHook(ABC):
         Returns:
             処理済みの場合True
         """
-        marker_path = self.get_command_marker_path(session_id, command)
-        return marker_path.exists()
+        return self._marker_exists(self.get_command_marker_key(session_id, command))
 
-    def mark_command_processed(self, session_id: str, command: str, context_tokens: int = 0) -> bool:
+    def mark_command_processed(self, session_id: str, command: str, context_tokens: int = 0,
+                               cumulative_tokens: Optional[int] = None) -> bool:
         """
         コマンドを処理済みとしてマーク
         
@@ -251,12 +418,13 @@ class BaseHook(ABC):
             session_id: セッションID
             command: 実行コマンド
             context_tokens: 現在のコンテキストサイズ
+            cumulative_tokens: 現在の累積トークン数（閾値判定の基準）
             
         Returns:
             マーク成功の場合True
         """
         try:
-            marker_path = self.get_command_marker_path(session_id, command)
+            marker = self.get_command_marker_key(session_id, command)
             
             # コンテキスト情報を含むマーカーデータを作成
             marker_data = {
@@ -265,15 +433,14 @@ class BaseHook(ABC):
                 'session_id': session_id,
                 'command': command
             }
+            if cumulative_tokens is not None:
+                marker_data['cumulative_tokens'] = cumulative_tokens
             
-            with open(marker_path, 'w') as f:
-                import json
-                json.dump(marker_data, f)
-                
-            self.log_debug(f"Created command marker: {marker_path} ({context_tokens} tokens)")
+            self._write_marker(marker, marker_data)
+            self.log_debug("Created command marker: %s (%s tokens)", marker, context_tokens)
             return True
         except Exception as e:
-            self.log_error(f"Failed to create command marker: {e}")
+            self.log_error("Failed to create command marker: %s", e)
             return False
 
     def is_session_processed(self, session_id: str) -> bool:
@@ -286,8 +453,7 @@ class BaseHook(ABC):
         Returns:
             処理済みの場合True
         """
-        marker_path = self.get_session_marker_path(session_id)
-        return marker_path.exists()
+        return self._marker_exists(self.get_session_marker_key(session_id))
     
     def is_session_processed_context_aware(self, session_id: str, input_data: Dict[str, Any]) -> bool:
         """
@@ -300,132 +466,100 @@ class BaseHook(ABC):
         Returns:
             処理済みでスキップすべき場合True
         """
-        marker_path = self.get_session_marker_path(session_id)
-        
-        if not marker_path.exists():
-            return False
+        marker = self.get_session_marker_key(session_id)
         
         try:
-            # マーカーファイルから前回の情報を読み取り
-            marker_data = self._read_marker_data(marker_path)
+            # マーカーから前回の情報を読み取り
+            marker_data = self.read_marker(input_data, marker)
             if not marker_data:
                 return False
             
-            # transcript解析で現在のコンテキストサイズを取得
-            current_tokens = self._get_current_context_size(input_data.get('transcript_path'))
-            if current_tokens is None:
+            # transcript解析でマーカー作成時からの増加量を取得（呼び出し内で共有）
+            token_increase = self.tokens_since_marker(input_data, marker_data)
+            if token_increase is None:
                 # transcript解析失敗時は単純にマーカ存在チェックのみ
                 return self.is_session_processed(session_id)
             
-            # コンテキストベース判定
-            last_tokens = marker_data.get('tokens', 0)
-            token_increase = current_tokens - last_tokens
-            
             # 設定から閾値を取得
             marker_settings = getattr(self, 'marker_settings', {'valid_until_token_increase': 50000})
             threshold = marker_settings.get('valid_until_token_increase', 50000)
             
             if token_increase < threshold:
-                self.log_debug(f"Within context threshold: {token_increase}/{threshold} tokens increase")
+                self.log_debug("Within context threshold: %s/%s tokens increase", token_increase, threshold)
                 return True
             else:
-                # 閾値を超えた場合は古いマーカーをリネーム（履歴保持）
-                self._rename_expired_marker(marker_path)
-                self.log_debug(f"Context threshold exceeded: {token_increase}/{threshold} tokens, marker renamed")
+                # 閾値を超えた場合は古いマーカーを期限切れにする（履歴保持）
+                self._expire_marker(marker)
+                self.log_debug("Context threshold exceeded: %s/%s tokens, marker expired", token_increase, threshold)
                 return False
                 
         except Exception as e:
-            self.log_error(f"Error in context-aware session check: {e}")
+            self.log_error("Error in context-aware session check: %s", e)
             # エラー時は単純にマーカ存在チェックのみ
             return self.is_session_processed(session_id)
     
-    def _read_marker_data(self, marker_path: Path) -> Optional[Dict[str, Any]]:
-        """マーカーファイルからデータを読み取り"""
+    def _read_marker_data(self, marker: MarkerKey) -> Optional[Dict[str, Any]]:
+        """マーカーストアからデータを読み取り"""
         try:
-            if marker_path.exists():
-                with open(marker_path, 'r') as f:
-                    import json
-                    return json.load(f)
-        except Exception:
-            pass
+            return self.marker_store.get(marker)
+        except Exception as e:
+            self.log_error("Failed to read marker %s: %s", marker, e)
         return None
     
-    def _get_current_context_size(self, transcript_path: Optional[str]) -> Optional[int]:
-        """transcriptから現在のコンテキストサイズを取得"""
-        if not transcript_path or not Path(transcript_path).exists():
-            return None
+    def _get_usage_state(self, transcript_path: Optional[str]) -> UsageState:
+        """transcriptからトークン数の状態を取得（前回からの追記分のみ解析し、他のフックと結果を共有）"""
+        if not transcript_path:
+            return UsageState()
             
         try:
-            import json
-            last_usage = None
-            
-            with open(transcript_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        entry = json.loads(line.strip())
-                        if entry.get('type') == 'assistant' and entry.get('message', {}).get('usage'):
-                            last_usage = entry['message']['usage']
-                    except json.JSONDecodeError:
-                        continue
-            
-            if last_usage:
-                total_tokens = (
-                    last_usage.get('input_tokens', 0) +
-                    last_usage.get('output_tokens', 0) +
-                    last_usage.get('cache_creation_input_tokens', 0) +
-                    last_usage.get('cache_read_input_tokens', 0)
-                )
-                return total_tokens
-                
+            with self._phase('transcript_read'):
+                return self.transcript_reader.get_usage_state(transcript_path, usage_cache=self.marker_store)
         except Exception as e:
-            self.log_error(f"Error reading transcript: {e}")
+            self.log_error("Error reading transcript: %s", e)
             
-        return None
-
+        return UsageState()
 
+    def _get_current_context_size(self, transcript_path: Optional[str]) -> Optional[int]:
+        """transcriptから現在のコンテキストサイズを取得（メモ化しない）"""
+        return self._get_usage_state(transcript_path).context_tokens
 
-    def _rename_expired_marker(self, marker_path: Path) -> bool:
+    def _expire_marker(self, marker: MarkerKey) -> bool:
         """
-        期限切れマーカーファイルをリネーム（履歴保持）
+        期限切れマーカーを履歴に移動
         
         Args:
-            marker_path: リネーム対象のマーカーファイルパス
+            marker: 対象マーカーの識別子
             
         Returns:
-            リネーム成功の場合True
+            移動成功の場合True
         """
         try:
-            if marker_path.exists():
-                # タイムスタンプ付きの履歴ファイル名を生成
-                from datetime import datetime
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                expired_name = f"{marker_path.name}.expired_{timestamp}"
-                expired_path = marker_path.parent / expired_name
-                
-                # マーカーファイルをリネーム
-                marker_path.rename(expired_path)
-                self.log_info(f"🗃️ Renamed expired marker: {marker_path} -> {expired_path}")
+            if self.marker_store.expire(marker):
+                self._forget_marker(marker)
+                self.log_info("🗃️ Expired marker moved to history: %s", marker)
                 return True
             else:
-                self.log_info(f"⚠️ Marker file does not exist, skipping rename: {marker_path}")
+                self.log_info("⚠️ Marker does not exist, skipping expiry: %s", marker)
                 return False
         except Exception as e:
-            self.log_error(f"Failed to rename expired marker: {e}")
+            self.log_error("Failed to expire marker: %s", e)
             return False
 
-    def mark_session_processed(self, session_id: str, context_tokens: int = 0) -> bool:
+    def mark_session_processed(self, session_id: str, context_tokens: int = 0,
+                               cumulative_tokens: Optional[int] = None) -> bool:
         """
         セッションを処理済みとしてマーク（コンテキスト情報付き）
         
         Args:
             session_id: セッションID
             context_tokens: 現在のコンテキストサイズ
+            cumulative_tokens: 現在の累積トークン数（閾値判定の基準）
             
         Returns:
             マーク成功の場合True
         """
         try:
-            marker_path = self.get_session_marker_path(session_id)
+            marker = self.get_session_marker_key(session_id)
             
             # コンテキスト情報を含むマーカーデータを作成
             marker_data = {
@@ -433,15 +567,14 @@ class BaseHook(ABC):
                 'tokens': context_tokens,
                 'session_id': session_id
             }
+            if cumulative_tokens is not None:
+                marker_data['cumulative_tokens'] = cumulative_tokens
             
-            with open(marker_path, 'w') as f:
-                import json
-                json.dump(marker_data, f)
-                
-            self.log_debug(f"Created session marker with context: {marker_path} ({context_tokens} tokens)")
+            self._write_marker(marker, marker_data)
+            self.log_debug("Created session marker with context: %s (%s tokens)", marker, context_tokens)
             return True
         except Exception as e:
-            self.log_error(f"Failed to create session marker: {e}")
+            self.log_error("Failed to create session marker: %s", e)
             return False
 
     @abstractmethod
@@ -470,65 +603,130 @@ class BaseHook(ABC):
         """
         pass
 
-    def run(self) -> int:
+    def get_watched_files(self) -> List[Path]:
+        """
+        フックの判定に影響する設定・ルールファイルの一覧を取得
+        
+        常駐プロセスで再利用する際、これらの更新を検知してインスタンスを作り直す。
+        
+        Returns:
+            監視対象ファイルのパスリスト
+        """
+        return []
+
+    def get_retention_settings(self) -> Dict[str, Any]:
+        """
+        マーカー・一時ファイルの保持期間設定を取得
+
+        Returns:
+            RetentionPolicy に渡す設定（空の場合はデフォルト値）
+        """
+        return {}
+
+    def _run_retention(self) -> None:
+        """期限切れマーカー・一時ファイルを一定間隔で少量ずつ整理"""
+        try:
+            service = RetentionService(
+                self.marker_store,
+                RetentionPolicy.from_settings(self.get_retention_settings()),
+                logger=self.logger
+            )
+            result = service.run_if_due()
+            if result and result.total:
+                self.log_info("Retention cleaned up: %s", result.to_dict())
+        except Exception as e:
+            self.log_error("Retention failed: %s", e)
+
+    def run(self, input_stream: Optional[TextIO] = None,
+            output_stream: Optional[TextIO] = None) -> int:
         """
         フックのメインエントリーポイント
         
+        Args:
+            input_stream: 入力ストリーム（省略時は標準入力）
+            output_stream: 出力ストリーム（省略時は標準出力）
+        
         Returns:
             終了コード（0: 成功、1: エラー）
         """
-        self.log_info(f"{'='*10} {self.__class__.__name__} Started {'='*10}")
+        self.log_info("========== %s Started ==========", self.__class__.__name__)
+        self._output_stream = output_stream
+        self._timer = PhaseTimer() if self.metrics_log is not None else None
+        input_data: Dict[str, Any] = {}
         
         try:
             # 入力を読み取る
-            input_data = self.read_input()
+            with self._phase('read_input'):
+                input_data = self.read_input(input_stream)
+            self.get_context(input_data)
 
             if not input_data:
                 self.log_debug("No input data, exiting")
                 # Claude Code v2では明示的にallowを返す必要がある
-                self.output_response('approve', '')
+                with self._phase('output'):
+                    self.output_response('approve', '')
                 return 0
             
             # セッションIDを取得
             session_id = input_data.get('session_id', '')
             if session_id:
-                self.log_debug(f"Session ID: {session_id}")
+                self.log_debug("Session ID: %s", session_id)
                 
                 # 既に処理済みかをコンテキストベースで確認
-                if self.is_session_processed_context_aware(session_id, input_data):
+                with self._phase('marker_check'):
+                    processed = self.is_session_processed_context_aware(session_id, input_data)
+                if processed:
                     self.log_debug("Session already processed and within context threshold, skipping")
                     # Claude Code v2では明示的にallowを返す必要がある
-                    self.output_response('approve', '')
+                    with self._phase('output'):
+                        self.output_response('approve', '')
                     return 0
             
             # 処理対象かチェック
-            if not self.should_process(input_data):
+            with self._phase('should_process'):
+                target = self.should_process(input_data)
+            if not target:
                 self.log_debug("Not a target for processing, skipping")
                 # Claude Code v2では明示的にallowを返す必要がある
-                self.output_response('approve', '')
+                with self._phase('output'):
+                    self.output_response('approve', '')
                 return 0
             
             # フック処理を実行（終了コード方式）
             # 注意: process() メソッドは sys.exit() で終了するため、
             # 通常はここに到達しない
-            result = self.process(input_data)
+            with self._phase('process'):
+                result = self.process(input_data)
             
             # ここに到達した場合は従来の形式（後方互換性）
             # 処理が正常終了した場合のみマーカーを作成
             if session_id:
-                # transcriptから現在のコンテキストサイズを取得
-                current_tokens = self._get_current_context_size(input_data.get('transcript_path'))
-                self.mark_session_processed(session_id, current_tokens or 0)
-                self.log_debug(f"Created session marker after successful processing with {current_tokens or 0} tokens")
-            
-            if self.output_response(result['decision'], result.get('reason', '')):
-                self.log_info(f"Successfully processed with decision: {result['decision']}")
+                with self._phase('marker_write'):
+                    # transcriptから現在のコンテキストサイズを取得（呼び出し内で共有）
+                    current_tokens = self.get_context_size(input_data)
+                    self.mark_session_processed(session_id, current_tokens or 0,
+                                                self.get_cumulative_tokens(input_data))
+                self.log_debug("Created session marker after successful processing with %s tokens", current_tokens or 0)
+            
+            with self._phase('output'):
+                output_ok = self.output_response(result['decision'], result.get('reason', ''))
+            if output_ok:
+                self.log_info("Successfully processed with decision: %s", result['decision'])
                 return 0
             else:
                 return 1
                 
         except Exception as e:
-            self.log_error(f"Unexpected error in run: {e}")
+            self.log_error("Unexpected error in run: %s", e)
+            self.raw_capture.capture_error()
+            if self._timer is not None:
+                self._timer.tags['error'] = type(e).__name__
             return 1
         finally:
-            self.log_info(f"{'='*10} {self.__class__.__name__} Ended {'='*10}")
\ No newline at end of file
+            self.raw_capture.reset()
+            context, self._context = self._context, None
+            self._output_stream = None
+            with self._phase('retention'):
+                self._run_retention()
+            self._record_metrics(input_data, context)
+            self.log_info("========== %s Ended ==========", self.__class__.__name__)
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""フック呼び出し単位のコンテキスト"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Callable, Hashable
+
+
+@dataclass
+class HookContext:
+    """1回のフック呼び出しの間だけ有効なリクエストスコープの状態
+
+    transcriptから求めたトークン数、読み込み済みマーカー、マッチした規約を
+    保持し、同一呼び出し内の各処理（run / should_process / process）で共有する。
+    """
+    input_data: Dict[str, Any]
+    markers: Dict[Hashable, Optional[Dict[str, Any]]] = field(default_factory=dict)
+    matched_rule: Optional[Dict[str, Any]] = None
+    rule_resolved: bool = False
+    _usage_state: Any = field(default=None, init=False, repr=False)
+    _usage_state_loaded: bool = field(default=False, init=False, repr=False)
+
+    @property
+    def session_id(self) -> str:
+        """セッションID"""
+        return self.input_data.get('session_id', '')
+
+    @property
+    def transcript_path(self) -> Optional[str]:
+        """transcriptファイルのパス"""
+        return self.input_data.get('transcript_path')
+
+    def get_usage_state(self, loader: Callable[[Optional[str]], Any]) -> Any:
+        """
+        transcriptのトークン数の状態を取得（初回のみloaderで算出）
+
+        Args:
+            loader: transcriptパスからトークン数の状態（UsageState）を求める関数
+
+        Returns:
+            トークン数の状態
+        """
+        if not self._usage_state_loaded:
+            self._usage_state = loader(self.transcript_path)
+            self._usage_state_loaded = True
+        return self._usage_state
+
+    def get_marker(self, marker: Hashable,
+                   loader: Callable[[Hashable], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """
+        マーカーデータを取得（初回のみloaderで読み込み）
+
+        Args:
+            marker: マーカーの識別子
+            loader: マーカーを読み込む関数
+
+        Returns:
+            マーカーデータ（存在しない場合None）
+        """
+        if marker not in self.markers:
+            self.markers[marker] = loader(marker)
+        return self.markers[marker]
+
+    def forget_marker(self, marker: Hashable) -> None:
+        """
+        マーカーのキャッシュを破棄（作成・期限切れ処理後に呼び出す）
+
+        Args:
+            marker: マーカーの識別子
+        """
+        self.markers.pop(marker, None)
+
+    def set_matched_rule(self, rule_info: Optional[Dict[str, Any]]) -> None:
+        """
+        マッチした規約を記録
+
+        Args:
+            rule_info: 規約情報（マッチしなかった場合None）
+        """
+        self.matched_rule = rule_info
+        self.rule_resolved = True
@@ -2,14 +2,14 @@
 
 import sys
 import os
+import logging
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, List
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from domain.hooks.base_hook import BaseHook
-from domain.services.file_convention_matcher import FileConventionMatcher
-from domain.services.command_convention_matcher import CommandConventionMatcher
 from infrastructure.config.config_manager import ConfigManager
+from shared.utils.hook_logging import get_hook_logger
 
 
 class ImplementationDesignHook(BaseHook):
@@ -17,51 +17,58 @@ class ImplementationDesignHook(BaseHook):
 
     def __init__(self, *args, **kwargs):
         """初期化"""
+        # ロギング設定を読み込むため、BaseHookの初期化より前に設定を読み込む
+        self.config = ConfigManager()
         # デバッグモードを一時的に有効化
         super().__init__(debug=True)
-        self.matcher = FileConventionMatcher(debug=True)  # デバッグモードを有効化
-        self.command_matcher = CommandConventionMatcher(debug=True)  # コマンド規約マッチャー
-        self.config = ConfigManager()
+        # 規約マッチャーは対象ツールの呼び出し時に初めて読み込む（起動時間短縮）
+        self._matcher = None
+        self._command_matcher = None
         self.transcript_path = None
         
         # 設定ファイルから閾値を読み込み
         self.thresholds = self.config.get_context_thresholds()
         self.marker_settings = self.config.get_marker_settings()
         
-        # ImplementationDesignHook専用のログファイル設定
+        # ImplementationDesignHook専用のロガー設定
         self._setup_implementation_design_log()
         
         # デバッグログを簡素化（ファイルログのみ）
         # self.log_debug(f"Context thresholds loaded: {self.thresholds}")
         # self.log_debug(f"Marker settings loaded: {self.marker_settings}")
 
+    @property
+    def matcher(self):
+        """ファイル規約マッチャー（初回参照時に読み込み）"""
+        if self._matcher is None:
+            from domain.services.file_convention_matcher import FileConventionMatcher
+            self._matcher = FileConventionMatcher(debug=True)  # デバッグモードを有効化
+        return self._matcher
+
+    @matcher.setter
+    def matcher(self, matcher):
+        self._matcher = matcher
+
+    @property
+    def command_matcher(self):
+        """コマンド規約マッチャー（初回参照時に読み込み）"""
+        if self._command_matcher is None:
+            from domain.services.command_convention_matcher import CommandConventionMatcher
+            self._command_matcher = CommandConventionMatcher(debug=True)
+        return self._command_matcher
+
+    @command_matcher.setter
+    def command_matcher(self, matcher):
+        self._command_matcher = matcher
+
     def _setup_implementation_design_log(self):
-        """ImplementationDesignHook専用のログファイル設定"""
-        import logging
-        from pathlib import Path
-        
-        # 専用ログファイルパス
-        log_file = Path("/tmp/implementation_design_hook.log")
-        
-        # 専用ロガーを作成
-        self.impl_logger = logging.getLogger(f"{self.__class__.__name__}_impl")
-        self.impl_logger.setLevel(logging.DEBUG)
-        
-        # 既存のハンドラを削除
-        for handler in self.impl_logger.handlers[:]:
-            self.impl_logger.removeHandler(handler)
-        
-        # ファイルハンドラを追加
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.DEBUG)
-        formatter = logging.Formatter('[%(asctime)s] %(name)s %(levelname)s: %(message)s')
-        file_handler.setFormatter(formatter)
-        self.impl_logger.addHandler(file_handler)
-        
+        """ImplementationDesignHook専用のロガー設定（出力先はフック共通）"""
+        self.impl_logger = get_hook_logger(f"{self.__class__.__name__}_impl")
+
         # 初期ログ
         self.impl_logger.info("=== ImplementationDesignHook initialized ===")
-        self.impl_logger.info(f"Context thresholds: {self.thresholds}")
-        self.impl_logger.info(f"Marker settings: {self.marker_settings}")
+        self.impl_logger.info("Context thresholds: %s", self.thresholds)
+        self.impl_logger.info("Marker settings: %s", self.marker_settings)
 
     def normalize_file_path(self, file_path: str, cwd: str) -> str:
         """
@@ -76,13 +83,13 @@ class ImplementationDesignHook(BaseHook):
         """
         if os.path.isabs(file_path):
             normalized = os.path.normpath(file_path)
-            self.log_debug(f"File path is already absolute: {normalized}")
+            self.log_debug("File path is already absolute: %s", normalized)
             return normalized
         
         # 相対パスの場合、cwdと結合
         absolute_path = os.path.join(cwd, file_path)
         normalized = os.path.normpath(absolute_path)
-        self.log_debug(f"Converted relative path '{file_path}' to absolute: '{normalized}'")
+        self.log_debug("Converted relative path '%s' to absolute: '%s'", file_path, normalized)
         return normalized
 
     def should_process(self, input_data: Dict[str, Any]) -> bool:
@@ -95,128 +102,120 @@ class ImplementationDesignHook(BaseHook):
         Returns:
             処理対象の場合True
         """
-        self.log_info(f"🚀 should_process() called")
-        self.log_info(f"📋 Input data keys: {input_data.keys()}")
-        self.impl_logger.info(f"SHOULD_PROCESS START: tool_name={input_data.get('tool_name', 'N/A')}, session_id={input_data.get('session_id', 'N/A')}")
+        self.log_info("🚀 should_process() called")
+        self.log_info("📋 Input data keys: %s", input_data.keys())
+        self.impl_logger.info("SHOULD_PROCESS START: tool_name=%s, session_id=%s", input_data.get('tool_name', 'N/A'), input_data.get('session_id', 'N/A'))
         
         # ツール名を取得
         tool_name = input_data.get('tool_name', '')
         tool_input = input_data.get('tool_input', {})
         
-        self.log_info(f"🔧 Tool name: {tool_name}")
-        self.log_info(f"📝 Tool input keys: {tool_input.keys()}")
-        self.impl_logger.info(f"TOOL DETECTION: tool_name='{tool_name}', tool_input_keys={list(tool_input.keys())}")
+        self.log_info("🔧 Tool name: %s", tool_name)
+        self.log_info("📝 Tool input keys: %s", tool_input.keys())
+        self.impl_logger.info("TOOL DETECTION: tool_name='%s', tool_input_keys=%s", tool_name, list(tool_input.keys()))
         
         # コマンド実行ツールの場合（Bash or serena execute_shell_command）
         if tool_name == 'Bash' or tool_name == 'mcp__serena__execute_shell_command':
             command = tool_input.get('command', '')
-            self.log_info(f"💻 Command tool ({tool_name}): {command}")
-            self.impl_logger.info(f"COMMAND TOOL DETECTED: tool_name='{tool_name}', command='{command}'")
+            self.log_info("💻 Command tool (%s): %s", tool_name, command)
+            self.impl_logger.info("COMMAND TOOL DETECTED: tool_name='%s', command='%s'", tool_name, command)
             if command:
-                self.log_info(f"✅ Command tool detected - returning True")
-                self.impl_logger.info(f"COMMAND TOOL APPROVED: Proceeding with command processing")
+                self.log_info("✅ Command tool detected - returning True")
+                self.impl_logger.info("COMMAND TOOL APPROVED: Proceeding with command processing")
                 return True
             else:
-                self.impl_logger.warning(f"COMMAND TOOL REJECTED: Empty command")
+                self.impl_logger.warning("COMMAND TOOL REJECTED: Empty command")
         
         # ファイル編集/作成ツールの場合 (mcp__serena__create_text_file も含む)
         file_tools = ['Edit', 'Write', 'MultiEdit', 'mcp__serena__create_text_file', 'mcp__serena__replace_regex', 'mcp__filesystem__write_file', 'mcp__filesystem__edit_file']
         if tool_name in file_tools or 'edit' in tool_name.lower() or 'write' in tool_name.lower() or 'create' in tool_name.lower():
-            self.impl_logger.info(f"FILE OPERATION TOOL DETECTED: tool_name='{tool_name}'")
+            self.impl_logger.info("FILE OPERATION TOOL DETECTED: tool_name='%s'", tool_name)
         
         # ファイル編集ツールの場合
         file_path = tool_input.get('file_path', '') or tool_input.get('relative_path', '')
-        self.log_info(f"📁 Extracted file_path: {file_path}")
-        self.impl_logger.info(f"FILE TOOL DETECTED: tool_name='{tool_name}', file_path='{file_path}'")
+        self.log_info("📁 Extracted file_path: %s", file_path)
+        self.impl_logger.info("FILE TOOL DETECTED: tool_name='%s', file_path='%s'", tool_name, file_path)
         
         if not file_path:
-            self.log_info(f"❌ No file_path found in tool_input - returning False")
-            self.impl_logger.info(f"FILE TOOL REJECTED: No file_path found")
+            self.log_info("❌ No file_path found in tool_input - returning False")
+            self.impl_logger.info("FILE TOOL REJECTED: No file_path found")
             return False
         
         # cwdから動的に絶対パスを構築
         cwd = input_data.get('cwd', os.getcwd())
         absolute_path = self.normalize_file_path(file_path, cwd)
         
-        self.log_info(f"🔍 Processing file path: {absolute_path}")
+        self.log_info("🔍 Processing file path: %s", absolute_path)
         
         # transcript_pathを保存（あとで使用）
         self.transcript_path = input_data.get('transcript_path')
         # Transcript path debug log removed
         
-        # FileConventionMatcherで規約に該当するか確認（絶対パスを使用）
-        rule_info = self.matcher.get_confirmation_message(absolute_path)
+        # FileConventionMatcherで規約に該当するか確認（絶対パスを使用、process()と共有）
+        rule_info = self._match_file_rule(input_data, absolute_path)
         
         # Pattern matching debug removed
         # Target file debug removed
         # Rule matching result debug removed
         
         if rule_info:
-            self.log_info(f"✅ RULE MATCHED: {rule_info['rule_name']} - Severity: {rule_info['severity']}")
-            self.impl_logger.info(f"FILE RULE MATCHED: {rule_info['rule_name']} (severity: {rule_info['severity']}, threshold: {rule_info.get('token_threshold', 'default')})")
+            self.log_info("✅ RULE MATCHED: %s - Severity: %s", rule_info['rule_name'], rule_info['severity'])
+            self.impl_logger.info("FILE RULE MATCHED: %s (severity: %s, threshold: %s)", rule_info['rule_name'], rule_info['severity'], rule_info.get('token_threshold', 'default'))
             
             # 規約別のセッション・トークンチェック
             session_id = input_data.get('session_id', '')
             rule_name = rule_info['rule_name']
-            self.impl_logger.info(f"RULE MATCHED CHECK: session_id='{session_id}', rule_name='{rule_name}'")
+            self.impl_logger.info("RULE MATCHED CHECK: session_id='%s', rule_name='%s'", session_id, rule_name)
             
             if session_id:
                 # 規約別マーカーでトークン閾値チェック
-                is_processed = self.is_rule_processed(session_id, rule_name)
-                self.impl_logger.info(f"MARKER CHECK: is_rule_processed={is_processed}")
+                marker = self.get_rule_marker_key(session_id, rule_name)
+                marker_data = self.read_marker(input_data, marker)
+                is_processed = marker_data is not None
+                self.impl_logger.info("MARKER CHECK: is_rule_processed=%s", is_processed)
                 if is_processed:
                     # 規約固有の閾値設定を取得
                     threshold = self._get_rule_threshold(rule_info)
                     
-                    # マーカーファイルから前回のトークン数を取得
-                    marker_path = self.get_rule_marker_path(session_id, rule_name)
-                    if marker_path.exists():
+                    # マーカーデータから前回のトークン数を取得
+                    if marker_data:
                         try:
-                            import json
-                            with open(marker_path, 'r') as f:
-                                marker_data = json.load(f)
-                                last_tokens = marker_data.get('tokens', 0)
-                            
-                            # 現在のトークン数を取得
-                            current_tokens = self._get_current_context_size(input_data.get('transcript_path'))
-                            if current_tokens is not None:
-                                token_increase = current_tokens - last_tokens
-                                
-                                if abs(token_increase) < threshold:
-                                    self.log_info(f"✅ Rule '{rule_name}' within individual token threshold: {token_increase}/{threshold}, skipping")
-                                    self.impl_logger.info(f"INDIVIDUAL TOKEN THRESHOLD SKIP: Rule '{rule_name}' increase {token_increase} < threshold {threshold}, skipping processing")
+                            # マーカー作成時からのトークン増加量を取得（呼び出し内で共有、コンパクションで減少しない）
+                            token_increase = self.tokens_since_marker(input_data, marker_data)
+                            if token_increase is not None:
+                                if token_increase < threshold:
+                                    self.log_info("✅ Rule '%s' within individual token threshold: %s/%s, skipping", rule_name, token_increase, threshold)
+                                    self.impl_logger.info("INDIVIDUAL TOKEN THRESHOLD SKIP: Rule '%s' increase %s < threshold %s, skipping processing", rule_name, token_increase, threshold)
                                     return False
                                 else:
-                                    self.log_info(f"🚨 Rule '{rule_name}' individual token threshold exceeded: {token_increase} >= {threshold}, processing")
-                                    self.impl_logger.info(f"INDIVIDUAL TOKEN THRESHOLD EXCEEDED: Rule '{rule_name}' increase {token_increase} >= threshold {threshold}, proceeding with processing")
-                                    # 古いマーカーをリネーム
-                                    self._rename_expired_marker(marker_path)
+                                    self.log_info("🚨 Rule '%s' individual token threshold exceeded: %s >= %s, processing", rule_name, token_increase, threshold)
+                                    self.impl_logger.info("INDIVIDUAL TOKEN THRESHOLD EXCEEDED: Rule '%s' increase %s >= threshold %s, proceeding with processing", rule_name, token_increase, threshold)
+                                    # 古いマーカーを期限切れにする
+                                    self._expire_marker(marker)
                         except Exception as e:
-                            self.log_error(f"Error checking individual token threshold: {e}")
+                            self.log_error("Error checking individual token threshold: %s", e)
                     else:
-                        self.log_info(f"⚠️ Marker file not found for rule '{rule_name}', proceeding with processing")
+                        self.log_info("⚠️ Marker not found for rule '%s', proceeding with processing", rule_name)
             
             return True
         else:
-            self.log_info(f"❌ NO RULES MATCHED for file: {absolute_path}")
-            self.log_info(f"🔍 Available patterns check:")
-            
-            # デバッグ: 使用可能な規約パターンを表示
-            try:
-                self.log_info("Available rule patterns:")
-                # FileConventionMatcherの内部状態をデバッグ出力
-                if hasattr(self.matcher, 'rules'):
+            self.log_info("❌ NO RULES MATCHED for file: %s", absolute_path)
+
+            # デバッグ: 使用可能な規約パターンを表示（全パターンを再評価するためDEBUG時のみ）
+            if self.logger.isEnabledFor(logging.DEBUG):
+                try:
+                    self.log_debug("Available rule patterns:")
                     for rule in self.matcher.rules:
-                        self.log_info(f"  - {rule.name}: {rule.patterns}")
+                        self.log_debug("  - %s: %s", rule.name, rule.patterns)
                         # 各パターンでマッチテスト
                         for pattern in rule.patterns:
                             match_result = self.matcher.matches_pattern(absolute_path, [pattern])
-                            self.log_info(f"    Pattern '{pattern}' -> Match: {match_result}")
-            except Exception as e:
-                self.log_error(f"Error debugging rules: {e}")
+                            self.log_debug("    Pattern '%s' -> Match: %s", pattern, match_result)
+                except Exception as e:
+                    self.log_error("Error debugging rules: %s", e)
         
-        self.log_info(f"🔚 should_process() finished - returning False")
-        self.impl_logger.info(f"SHOULD_PROCESS END: Returning False - No rules matched")
+        self.log_info("🔚 should_process() finished - returning False")
+        self.impl_logger.info("SHOULD_PROCESS END: Returning False - No rules matched")
         return False
 
     def _get_rule_threshold(self, rule_info: Dict[str, Any]) -> int:
@@ -232,8 +231,8 @@ class ImplementationDesignHook(BaseHook):
         # 規約固有の閾値が設定されている場合はそれを優先
         if rule_info.get('token_threshold') is not None:
             threshold = rule_info['token_threshold']
-            self.log_debug(f"Using rule-specific threshold for '{rule_info['rule_name']}': {threshold}")
-            self.impl_logger.debug(f"RULE THRESHOLD: Using rule-specific threshold for '{rule_info['rule_name']}': {threshold}")
+            self.log_debug("Using rule-specific threshold for '%s': %s", rule_info['rule_name'], threshold)
+            self.impl_logger.debug("RULE THRESHOLD: Using rule-specific threshold for '%s': %s", rule_info['rule_name'], threshold)
             return threshold
         
         # フォールバック：severity別のデフォルト閾値を使用
@@ -245,8 +244,24 @@ class ImplementationDesignHook(BaseHook):
         })
         
         threshold = rule_thresholds.get(severity, 30000)
-        self.log_debug(f"Using default threshold for severity '{severity}': {threshold}")
+        self.log_debug("Using default threshold for severity '%s': %s", severity, threshold)
         return threshold
+
+    def _match_file_rule(self, input_data: Dict[str, Any], absolute_path: str) -> Optional[Dict[str, Any]]:
+        """
+        ファイルパスに該当する規約情報を取得（呼び出し内でメモ化）
+        
+        Args:
+            input_data: 入力データ
+            absolute_path: 正規化済みの絶対パス
+            
+        Returns:
+            規約情報（該当なしの場合None）
+        """
+        context = self.get_context(input_data)
+        if not context.rule_resolved:
+            context.set_matched_rule(self.matcher.get_confirmation_message(absolute_path))
+        return context.matched_rule
     
     def _get_command_threshold(self, rule_info: Dict[str, Any]) -> int:
         """
@@ -261,13 +276,13 @@ class ImplementationDesignHook(BaseHook):
         # コマンド固有の閾値が設定されている場合はそれを優先
         if rule_info.get('token_threshold') is not None:
             threshold = rule_info['token_threshold']
-            self.log_debug(f"Using command-specific threshold for '{rule_info['rule_name']}': {threshold}")
-            self.impl_logger.debug(f"COMMAND THRESHOLD: Using command-specific threshold for '{rule_info['rule_name']}': {threshold}")
+            self.log_debug("Using command-specific threshold for '%s': %s", rule_info['rule_name'], threshold)
+            self.impl_logger.debug("COMMAND THRESHOLD: Using command-specific threshold for '%s': %s", rule_info['rule_name'], threshold)
             return threshold
         
         # フォールバック：デフォルトのコマンド閾値を使用
         command_threshold = self.config.get_context_thresholds().get('command_threshold', 30000)
-        self.log_debug(f"Using default command threshold: {command_threshold}")
+        self.log_debug("Using default command threshold: %s", command_threshold)
         return command_threshold
     
     def _normalize_rule_name(self, rule_name: str) -> str:
@@ -293,7 +308,7 @@ class ImplementationDesignHook(BaseHook):
             hash_value = hashlib.md5(rule_name.encode()).hexdigest()[:8]
             normalized = f"{normalized[:12]}_{hash_value}"
         
-        self.log_debug(f"Normalized rule name: '{rule_name}' -> '{normalized}'")
+        self.log_debug("Normalized rule name: '%s' -> '%s'", rule_name, normalized)
         return normalized
 
     def process(self, input_data: Dict[str, Any]) -> Dict[str, str]:
@@ -323,8 +338,8 @@ class ImplementationDesignHook(BaseHook):
         
         # Processing file path debug removed
         
-        # 規約情報を取得（絶対パスを使用）
-        rule_info = self.matcher.get_confirmation_message(absolute_path)
+        # 規約情報を取得（should_process()でマッチ済みならそれを再利用）
+        rule_info = self._match_file_rule(input_data, absolute_path)
         
         if not rule_info:
             # 規約に該当しない場合は許可
@@ -337,29 +352,51 @@ class ImplementationDesignHook(BaseHook):
         rule_name = rule_info['rule_name']
         
         # 規約名別マーカーをチェック
-        if session_id and self.is_rule_processed(session_id, rule_name):
-            self.log_debug(f"Rule '{rule_name}' already processed in this session, skipping")
+        if session_id and self.read_marker(input_data, self.get_rule_marker_key(session_id, rule_name)) is not None:
+            self.log_debug("Rule '%s' already processed in this session, skipping", rule_name)
             return {'decision': 'approve', 'reason': ''}
         
         # 規約名別マーカーを作成（ブロック前に）
         if session_id:
-            current_tokens = self._get_current_context_size(input_data.get('transcript_path'))
-            self.mark_rule_processed(session_id, rule_name, current_tokens or 0)
-            self.log_debug(f"Created rule marker for '{rule_name}' before blocking with {current_tokens or 0} tokens")
+            current_tokens = self.get_context_size(input_data)
+            self.mark_rule_processed(session_id, rule_name, current_tokens or 0,
+                                     self.get_cumulative_tokens(input_data))
+            self.log_debug("Created rule marker for '%s' before blocking with %s tokens", rule_name, current_tokens or 0)
         
         # JSON応答でブロック（sys.exit使わない）
-        self.impl_logger.info(f"FILE RULE BLOCKING: Rule '{rule_name}' (severity: {severity}) blocking file edit: {absolute_path}")
+        self.impl_logger.info("FILE RULE BLOCKING: Rule '%s' (severity: %s) blocking file edit: %s", rule_name, severity, absolute_path)
         return {
             'decision': 'block',
             'reason': message
         }
-    def run(self) -> int:
+
+    def get_logging_settings(self) -> Dict[str, Any]:
+        """設定ファイルのロギング設定を使用"""
+        return self.config.get_logging_settings()
+
+    def get_metrics_settings(self) -> Dict[str, Any]:
+        """設定ファイルの実行時間計測設定を使用"""
+        return self.config.get_metrics_settings()
+
+    def get_raw_capture_settings(self) -> Dict[str, Any]:
+        """設定ファイルの生JSON保存設定を使用"""
+        return self.config.get_raw_capture_settings()
+
+    def get_retention_settings(self) -> Dict[str, Any]:
+        """設定ファイルの保持期間設定を使用"""
+        return self.config.get_retention_settings()
+
+    def get_watched_files(self) -> List[Path]:
+        """規約ルールファイルと設定ファイルを監視対象とする"""
+        return [self.matcher.rules_file, self.command_matcher.rules_file, self.config.config_path]
+
+    def run(self, input_stream=None, output_stream=None) -> int:
         """
         BaseHookのrun()を呼び出してコンテクスト制御を有効化
         規約名別マーカーとコンテクスト制御を併用
         """
         # BaseHookのrun()を呼び出してコンテクスト制御を有効化
-        return super().run()
+        return super().run(input_stream, output_stream)
         
 
     def _process_command(self, tool_input: Dict[str, Any], session_id: str, input_data: Dict[str, Any]) -> Dict[str, str]:
@@ -379,66 +416,64 @@ class ImplementationDesignHook(BaseHook):
             self.log_debug("No command found in tool_input")
             return {'decision': 'approve', 'reason': ''}
         
-        self.log_info(f"🔍 Checking command: {command}")
+        self.log_info("🔍 Checking command: %s", command)
         
         # コマンド規約チェック（先に実行してrule_infoを取得）
-        rule_info = self.command_matcher.get_confirmation_message(command)
+        context = self.get_context(input_data)
+        if not context.rule_resolved:
+            context.set_matched_rule(self.command_matcher.get_confirmation_message(command))
+        rule_info = context.matched_rule
         
         if not rule_info:
-            self.log_info(f"❌ No command rules matched for: {command}")
-            self.impl_logger.info(f"COMMAND NO RULE MATCHED: {command}")
+            self.log_info("❌ No command rules matched for: %s", command)
+            self.impl_logger.info("COMMAND NO RULE MATCHED: %s", command)
             return {'decision': 'approve', 'reason': ''}
         
         # コマンド規約マッチしたログ
-        self.impl_logger.info(f"COMMAND RULE MATCHED: {rule_info['rule_name']} (severity: {rule_info['severity']}, threshold: {rule_info.get('token_threshold', 'default')}) for command: {command}")
+        self.impl_logger.info("COMMAND RULE MATCHED: %s (severity: %s, threshold: %s) for command: %s (matched: %s)", rule_info['rule_name'], rule_info['severity'], rule_info.get('token_threshold', 'default'), command, rule_info.get('matched_command', command))
         
         # セッション内で同じコマンドが既に処理済みかチェック
-        if session_id and self.is_command_processed(session_id, command):
+        marker = self.get_command_marker_key(session_id, command) if session_id else None
+        marker_data = self.read_marker(input_data, marker) if marker else None
+        if marker_data is not None:
             # 規約固有の閾値を取得（コマンド版）
             command_threshold = self._get_command_threshold(rule_info)
             
-            # コマンドマーカーファイルから前回のトークン数を取得
-            marker_path = self.get_command_marker_path(session_id, command)
-            if marker_path.exists():
+            # コマンドマーカーデータから前回のトークン数を取得
+            if marker_data:
                 try:
-                    import json
-                    with open(marker_path, 'r') as f:
-                        marker_data = json.load(f)
-                        last_tokens = marker_data.get('tokens', 0)
-                    
-                    # 現在のトークン数を取得
-                    current_tokens = self._get_current_context_size(input_data.get('transcript_path'))
-                    if current_tokens is not None:
-                        token_increase = current_tokens - last_tokens
-                        
-                        if abs(token_increase) < command_threshold:
-                            self.log_info(f"✅ Command '{command}' within individual token threshold: {token_increase}/{command_threshold}, skipping")
-                            self.impl_logger.info(f"INDIVIDUAL COMMAND TOKEN THRESHOLD SKIP: '{command}' increase {token_increase} < threshold {command_threshold}, skipping processing")
+                    # マーカー作成時からのトークン増加量を取得（呼び出し内で共有、コンパクションで減少しない）
+                    token_increase = self.tokens_since_marker(input_data, marker_data)
+                    if token_increase is not None:
+                        if token_increase < command_threshold:
+                            self.log_info("✅ Command '%s' within individual token threshold: %s/%s, skipping", command, token_increase, command_threshold)
+                            self.impl_logger.info("INDIVIDUAL COMMAND TOKEN THRESHOLD SKIP: '%s' increase %s < threshold %s, skipping processing", command, token_increase, command_threshold)
                             return {'decision': 'approve', 'reason': ''}
                         else:
-                            self.log_info(f"🚨 Command '{command}' individual token threshold exceeded: {token_increase} >= {command_threshold}, processing")
-                            self.impl_logger.info(f"INDIVIDUAL COMMAND TOKEN THRESHOLD EXCEEDED: '{command}' increase {token_increase} >= threshold {command_threshold}, proceeding with processing")
-                            # 古いマーカーをリネーム
-                            self._rename_expired_marker(marker_path)
+                            self.log_info("🚨 Command '%s' individual token threshold exceeded: %s >= %s, processing", command, token_increase, command_threshold)
+                            self.impl_logger.info("INDIVIDUAL COMMAND TOKEN THRESHOLD EXCEEDED: '%s' increase %s >= threshold %s, proceeding with processing", command, token_increase, command_threshold)
+                            # 古いマーカーを期限切れにする
+                            self._expire_marker(marker)
                 except Exception as e:
-                    self.log_error(f"Error checking command individual token threshold: {e}")
+                    self.log_error("Error checking command individual token threshold: %s", e)
             else:
-                self.log_info(f"⚠️ Command marker file not found for '{command}', proceeding with processing")
+                self.log_info("⚠️ Command marker not found for '%s', proceeding with processing", command)
         
         # セッション内でコマンドを処理済みとしてマーク
         if session_id:
-            current_tokens = self._get_current_context_size(input_data.get('transcript_path'))
-            self.mark_command_processed(session_id, command, current_tokens or 0)
-            self.log_info(f"📝 Marked command as processed: {command}")
+            current_tokens = self.get_context_size(input_data)
+            self.mark_command_processed(session_id, command, current_tokens or 0,
+                                        self.get_cumulative_tokens(input_data))
+            self.log_info("📝 Marked command as processed: %s", command)
         
         # severityに応じて処理を分岐
         severity = rule_info['severity']
         message = rule_info['message']
         
-        self.log_info(f"🚨 Command rule matched - Severity: {severity}, Rule: {rule_info['rule_name']}")
+        self.log_info("🚨 Command rule matched - Severity: %s, Rule: %s", severity, rule_info['rule_name'])
         
         # JSON応答でブロック（ファイル編集と同じ方式に統一）
-        self.impl_logger.info(f"COMMAND RULE BLOCKING: Rule '{rule_info['rule_name']}' (severity: {severity}) blocking command: {command}")
+        self.impl_logger.info("COMMAND RULE BLOCKING: Rule '%s' (severity: %s) blocking command: %s", rule_info['rule_name'], severity, command)
         return {
             'decision': 'block',
             'reason': message
@@ -447,30 +482,7 @@ class ImplementationDesignHook(BaseHook):
 
 def main():
     """メインエントリーポイント"""
-    # ログをファイルのみに出力（stderrには出力しない）
-    import logging
-    import os
-
-    # スクリプトが存在するディレクトリを動的に検知
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    scripts_root = os.path.join(script_dir, '..', '..', '..')  # src/domain/hooks -> scripts
-    scripts_root = os.path.normpath(scripts_root)
-    log_dir = os.path.join(scripts_root, 'log')
-
-    # logディレクトリが存在しない場合は作成
-    os.makedirs(log_dir, exist_ok=True)
-
-    log_file_path = os.path.join(log_dir, 'hook_debug.log')
-
-    logging.basicConfig(
-        level=logging.ERROR,  # ERRORレベル以上のみ
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file_path)
-            # StreamHandlerを削除してstderr出力を抑制
-        ]
-    )
-    
+    # ログの出力先・レベルは config.json5 の convention_hooks.logging に従う（stderrには出力しない）
     hook = ImplementationDesignHook(debug=False)  # デバッグモード無効
     # BaseHookのrun()メソッドを呼び出してマーカーフロー機能を有効化
     sys.exit(hook.run())
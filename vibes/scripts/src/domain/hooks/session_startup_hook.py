@@ -4,10 +4,11 @@ import sys
 import os
 import yaml
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from domain.hooks.base_hook import BaseHook
+from infrastructure.markers.marker_store import MarkerKey
 
 
 class SessionStartupHook(BaseHook):
@@ -17,8 +18,13 @@ class SessionStartupHook(BaseHook):
         """初期化"""
         super().__init__(debug=True)
         self.config = self._load_config()
-        self.session_marker_prefix = self.config.get('debug', {}).get('marker_path', 'claude_session_startup_')
+        if 'marker_path' in (self.config.get('debug') or {}):
+            # マーカーは MarkerStore（SQLite）に保存するため、ファイルのパスの指定は使われない
+            self.log_warning("debug.marker_path is deprecated and ignored: session startup markers "
+                             "are stored in the marker database (%s)", self.marker_store.db_path)
         
+    CONFIG_FILE = Path(__file__).parent.parent.parent.parent / "rules" / "session_startup_settings.yaml"
+
     def _load_config(self) -> Dict[str, Any]:
         """
         設定ファイルを読み込む
@@ -26,34 +32,36 @@ class SessionStartupHook(BaseHook):
         Returns:
             設定データの辞書
         """
-        config_file = Path(__file__).parent.parent.parent.parent / "rules" / "session_startup_settings.yaml"
+        config_file = self.CONFIG_FILE
         
         try:
             if config_file.exists():
                 with open(config_file, 'r', encoding='utf-8') as f:
                     data = yaml.safe_load(f)
-                    self.log_info(f"✅ Loaded session startup config: {config_file}")
+                    self.log_info("✅ Loaded session startup config: %s", config_file)
                     return data.get('session_startup', {})
             else:
-                self.log_error(f"❌ Config file not found: {config_file}")
+                self.log_error("❌ Config file not found: %s", config_file)
                 return {}
         except Exception as e:
-            self.log_error(f"❌ Failed to load config: {e}")
+            self.log_error("❌ Failed to load config: %s", e)
             return {}
         
-    def get_session_startup_marker_path(self, session_id: str) -> Path:
+    def get_watched_files(self) -> List[Path]:
+        """セッション開始設定ファイルを監視対象とする"""
+        return [self.CONFIG_FILE]
+
+    def get_session_startup_marker_key(self, session_id: str) -> MarkerKey:
         """
-        セッション開始確認マーカーファイルのパスを取得
+        セッション開始確認マーカーの識別子を取得
         
         Args:
             session_id: セッションID
             
         Returns:
-            マーカーファイルのパス
+            マーカーの識別子
         """
-        temp_dir = Path("/tmp")
-        marker_name = f"{self.session_marker_prefix}{session_id}"
-        return temp_dir / marker_name
+        return MarkerKey(self.__class__.__name__, session_id, 'startup')
 
     def is_session_startup_processed(self, session_id: str, input_data: Dict[str, Any] = None) -> bool:
         """
@@ -69,10 +77,14 @@ class SessionStartupHook(BaseHook):
         if not session_id:
             return False
             
-        marker_path = self.get_session_startup_marker_path(session_id)
-        exists = marker_path.exists()
+        marker = self.get_session_startup_marker_key(session_id)
+        if input_data is not None:
+            marker_data = self.read_marker(input_data, marker)
+        else:
+            marker_data = self._read_marker_data(marker)
+        exists = marker_data is not None
         
-        self.log_info(f"📋 Session startup marker check: {marker_path} -> {'EXISTS' if exists else 'NOT_EXISTS'}")
+        self.log_info("📋 Session startup marker check: %s -> %s", marker, 'EXISTS' if exists else 'NOT_EXISTS')
         
         if not exists:
             return False
@@ -80,27 +92,20 @@ class SessionStartupHook(BaseHook):
         # トークン閾値チェック
         threshold = self.config.get('behavior', {}).get('token_threshold', 50000)
         if input_data and input_data.get('transcript_path'):
-            current_tokens = super()._get_current_context_size(input_data.get('transcript_path'))
-            if current_tokens is not None:
-                # マーカーファイルから前回のトークン数を取得
+            # マーカー作成時からのトークン増加量（コンパクションで減少しない）
+            token_increase = self.tokens_since_marker(input_data, marker_data)
+            if token_increase is not None:
                 try:
-                    import json
-                    with open(marker_path, 'r') as f:
-                        marker_data = json.load(f)
-                        last_tokens = marker_data.get('tokens', 0)
-                    
-                    token_increase = current_tokens - last_tokens
-                    
-                    if abs(token_increase) >= threshold:
-                        self.log_info(f"🚨 Session startup token threshold exceeded: {token_increase} >= {threshold}")
-                        # 閾値超過時は履歴ファイルを作成してから削除（ImplementationDesignHookと同様）
-                        super()._rename_expired_marker(marker_path)
+                    if token_increase >= threshold:
+                        self.log_info("🚨 Session startup token threshold exceeded: %s >= %s", token_increase, threshold)
+                        # 閾値超過時はマーカーを履歴に移動（ImplementationDesignHookと同様）
+                        self._expire_marker(marker)
                         return False
                     else:
-                        self.log_info(f"✅ Session startup within token threshold: {token_increase}/{threshold}")
+                        self.log_info("✅ Session startup within token threshold: %s/%s", token_increase, threshold)
                         
                 except Exception as e:
-                    self.log_error(f"Error checking token threshold: {e}")
+                    self.log_error("Error checking token threshold: %s", e)
             
         return True  # マーカー存在かつ閾値内の場合はスキップ
 
@@ -120,16 +125,18 @@ class SessionStartupHook(BaseHook):
             マーク成功の場合True
         """
         try:
-            marker_path = self.get_session_startup_marker_path(session_id)
+            marker = self.get_session_startup_marker_key(session_id)
             
             # 個別token_thresholdによる制御のため、マーカーリネーム処理は削除
             
             # 現在のトークン数を取得
             current_tokens = 0
+            cumulative_tokens = None
             if input_data:
-                current_tokens = super()._get_current_context_size(input_data.get('transcript_path')) or 0
+                current_tokens = self.get_context_size(input_data) or 0
+                cumulative_tokens = self.get_cumulative_tokens(input_data)
             
-            # セッション開始時の情報をマーカーファイルに記録
+            # セッション開始時の情報をマーカーに記録
             from datetime import datetime
             marker_data = {
                 'timestamp': datetime.now().isoformat(),
@@ -137,15 +144,15 @@ class SessionStartupHook(BaseHook):
                 'hook_type': 'session_startup',
                 'tokens': current_tokens
             }
+            if cumulative_tokens is not None:
+                marker_data['cumulative_tokens'] = cumulative_tokens
             
-            with open(marker_path, 'w') as f:
-                import json
-                json.dump(marker_data, f)
+            self._write_marker(marker, marker_data)
                 
-            self.log_info(f"✅ Created session startup marker with {current_tokens} tokens: {marker_path}")
+            self.log_info("✅ Created session startup marker with %s tokens: %s", current_tokens, marker)
             return True
         except Exception as e:
-            self.log_error(f"Failed to create session startup marker: {e}")
+            self.log_error("Failed to create session startup marker: %s", e)
             return False
 
     def should_process(self, input_data: Dict[str, Any]) -> bool:
@@ -158,7 +165,7 @@ class SessionStartupHook(BaseHook):
         Returns:
             処理対象の場合True
         """
-        self.log_info(f"📋 SessionStartupHook - Input data keys: {input_data.keys()}")
+        self.log_info("📋 SessionStartupHook - Input data keys: %s", input_data.keys())
         
         # 設定で無効化されている場合はスキップ
         if not self.config.get('enabled', True):
@@ -171,15 +178,15 @@ class SessionStartupHook(BaseHook):
             self.log_info("❌ No session_id found, skipping")
             return False
         
-        self.log_info(f"🔍 Session ID: {session_id}")
+        self.log_info("🔍 Session ID: %s", session_id)
         
         # once_per_sessionが有効で既に処理済みの場合はスキップ
         if self.config.get('behavior', {}).get('once_per_session', True):
             if self.is_session_startup_processed(session_id, input_data):
-                self.log_info(f"✅ Session startup already processed for: {session_id}")
+                self.log_info("✅ Session startup already processed for: %s", session_id)
                 return False
         
-        self.log_info(f"🚀 New session detected, requires startup processing: {session_id}")
+        self.log_info("🚀 New session detected, requires startup processing: %s", session_id)
         return True
 
     def process(self, input_data: Dict[str, Any]) -> Dict[str, str]:
@@ -194,13 +201,13 @@ class SessionStartupHook(BaseHook):
         """
         session_id = input_data.get('session_id', '')
         
-        self.log_info(f"🎯 Processing session startup for: {session_id}")
+        self.log_info("🎯 Processing session startup for: %s", session_id)
         
         # 設定ファイルからメッセージを構築（実行回数に応じて変更）
         message = self._build_message(session_id)
         
         # ImplementationDesignHookと同様のJSON応答方式でブロッキング
-        self.log_info(f"📋 SESSION STARTUP BLOCKING: Session '{session_id}' requires startup confirmation")
+        self.log_info("📋 SESSION STARTUP BLOCKING: Session '%s' requires startup confirmation", session_id)
         
         # ブロッキング前にマーカーファイルを作成（ImplementationDesignHookと同じタイミング）
         self.mark_session_startup_processed(session_id, input_data)
@@ -221,15 +228,14 @@ class SessionStartupHook(BaseHook):
         Returns:
             実行回数（1から開始）
         """
-        count = 0
-        marker_base = self.get_session_startup_marker_path(session_id)
-        temp_dir = marker_base.parent
-        marker_prefix = marker_base.name
+        marker = self.get_session_startup_marker_key(session_id)
         
-        # 現在のマーカーファイルと.expired_履歴ファイルをカウント
-        for file_path in temp_dir.glob(f"{marker_prefix}*"):
-            if file_path.name.startswith(marker_prefix):
-                count += 1
+        # 現在のマーカーと期限切れ回数（マーカーと共に保持しているカウンタ）を合算
+        try:
+            count = int(self.marker_store.exists(marker)) + self.marker_store.get_expired_count(marker)
+        except Exception as e:
+            self.log_error("Failed to count session startup markers: %s", e)
+            count = 0
         
         # 実行前の状態では、次回実行予定の回数を返す
         # 現在のマーカーファイルが存在する場合は次回が2回目以降
@@ -263,22 +269,14 @@ class SessionStartupHook(BaseHook):
         # メッセージを構築
         message = title + "\n\n" + main_text
         
-        self.log_info(f"🎯 Built message for execution #{execution_count}: {title[:50]}...")
+        self.log_info("🎯 Built message for execution #%s: %s...", execution_count, title[:50])
         
         return message
 
 
 def main():
     """メインエントリーポイント"""
-    import logging
-    logging.basicConfig(
-        level=logging.DEBUG,  # ERROR → DEBUG に変更
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('/tmp/session_startup_hook.log')
-        ]
-    )
-    
+    # ログはフック共通の出力先に出力（BaseHookで設定）
     hook = SessionStartupHook(debug=False)
     sys.exit(hook.run())
 
@@ -1,13 +1,16 @@
 """コマンド実行規約マッチングサービス"""
 
-import yaml
+import re
 import fnmatch
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Pattern, Tuple
 from dataclasses import dataclass
 
 from .base_convention_matcher import BaseConventionMatcher
+from .shell_command_splitter import split_simple_commands
+from .rule_cache import RuleCache
 
 
 @dataclass
@@ -20,16 +23,146 @@ class ConventionRule:
     token_threshold: Optional[int] = None  # 規約別トークン闾値
 
 
+# パターン中でワイルドカードとして扱われる文字
+_WILDCARD_CHARS = re.compile(r'[*?\[]')
+
+
+@lru_cache(maxsize=1024)
+def compile_command_pattern(pattern: str) -> Pattern:
+    """
+    fnmatch形式のパターンをコンパイル（キャッシュ付き）
+
+    Args:
+        pattern: コマンドパターン
+
+    Returns:
+        コンパイル済み正規表現
+    """
+    return re.compile(fnmatch.translate(pattern))
+
+
+class CommandRuleIndex:
+    """先頭トークンをキーにしたコマンドパターンの索引
+
+    各パターンのワイルドカード以前のリテラル部分から、マッチし得るコマンドの
+    先頭トークンを求めて登録する。
+
+    - リテラル部分に空白を含む（例: "git push*"）: 先頭トークンの完全一致で索引
+    - ワイルドカードを含まない（例: "make"）: 先頭トークンの完全一致で索引
+    - 空白を含まないリテラル接頭辞（例: "git*"）: 先頭トークンの接頭辞で索引
+    - 接頭辞が空（例: "*deploy*"）: 常に評価する
+    """
+
+    def __init__(self, rules: List[ConventionRule]):
+        """
+        初期化
+
+        Args:
+            rules: ルールリスト（定義順）
+        """
+        self.exact: Dict[str, List[Tuple[int, Pattern]]] = {}
+        self.prefix: Dict[str, List[Tuple[int, Pattern]]] = {}
+        self.generic: List[Tuple[int, Pattern]] = []
+        self.invalid: List[Tuple[str, str, Exception]] = []
+
+        for index, rule in enumerate(rules):
+            for pattern in rule.patterns:
+                try:
+                    entry = (index, compile_command_pattern(pattern))
+                except (re.error, TypeError) as e:
+                    self.invalid.append((rule.name, pattern, e))
+                    continue
+                self._add(pattern, entry)
+
+        self.prefix_lengths = sorted({len(key) for key in self.prefix})
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        """
+        キャッシュ保存用に組み込み型のみで表現した索引を返す
+
+        Returns:
+            索引のスナップショット（パターンは変換済みの正規表現文字列）
+        """
+        def dump(entries):
+            return [(index, compiled.pattern) for index, compiled in entries]
+
+        return {
+            'exact': {token: dump(entries) for token, entries in self.exact.items()},
+            'prefix': {prefix: dump(entries) for prefix, entries in self.prefix.items()},
+            'generic': dump(self.generic)
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> 'CommandRuleIndex':
+        """
+        スナップショットから索引を復元
+
+        Args:
+            snapshot: to_snapshot() の戻り値
+
+        Returns:
+            復元した索引
+        """
+        def load(entries):
+            return [(index, re.compile(source)) for index, source in entries]
+
+        index = cls([])
+        index.exact = {token: load(entries) for token, entries in snapshot['exact'].items()}
+        index.prefix = {prefix: load(entries) for prefix, entries in snapshot['prefix'].items()}
+        index.generic = load(snapshot['generic'])
+        index.prefix_lengths = sorted({len(key) for key in index.prefix})
+        return index
+
+    def _add(self, pattern: str, entry: Tuple[int, Pattern]) -> None:
+        """パターンを索引に登録"""
+        wildcard = _WILDCARD_CHARS.search(pattern)
+        literal = pattern if wildcard is None else pattern[:wildcard.start()]
+
+        if ' ' in literal:
+            self.exact.setdefault(literal.split(' ', 1)[0], []).append(entry)
+        elif wildcard is None:
+            self.exact.setdefault(literal, []).append(entry)
+        elif literal:
+            self.prefix.setdefault(literal, []).append(entry)
+        else:
+            self.generic.append(entry)
+
+    def candidates(self, token: str) -> List[Tuple[int, Pattern]]:
+        """
+        先頭トークンに対して評価が必要なパターンをルール定義順で返す
+
+        Args:
+            token: コマンドの先頭トークン
+
+        Returns:
+            (ルール番号, コンパイル済みパターン) のリスト
+        """
+        found = list(self.exact.get(token, ()))
+        for length in self.prefix_lengths:
+            if length > len(token):
+                break
+            found.extend(self.prefix.get(token[:length], ()))
+        if self.generic:
+            found.extend(self.generic)
+        found.sort(key=lambda entry: entry[0])
+        return found
+
+
 class CommandConventionMatcher(BaseConventionMatcher):
     """コマンド実行と規約のマッチングを行うサービス"""
 
-    def __init__(self, rules_file: Optional[Path] = None, debug: bool = False):
+    # ルールキャッシュの種別名
+    CACHE_KIND = 'command'
+
+    def __init__(self, rules_file: Optional[Path] = None, debug: bool = False,
+                 cache_dir: Optional[Path] = None):
         """
         初期化
         
         Args:
             rules_file: ルール定義ファイルのパス
             debug: デバッグモードフラグ
+            cache_dir: コンパイル済みルールキャッシュの保存先
         """
         if rules_file is None:
             # デフォルトパスを使用
@@ -38,63 +171,122 @@ class CommandConventionMatcher(BaseConventionMatcher):
         self.rules_file = Path(rules_file)
         self.debug = debug
         self._setup_logging()
-        self.rules = self._load_rules()
+        self.rule_cache = RuleCache(cache_dir, self.logger)
+        self._load()
         
     def _setup_logging(self):
-        """ロギングの設定"""
-        log_file = Path("/tmp/command_convention_matcher.log")
+        """ロギングの設定（出力先・レベルはフック共通の設定に従う）"""
+        # shared.utils.hook_logging.HOT_PATH_LOGGER 配下のロガー
+        self.logger = logging.getLogger(f"claude_hooks.{self.__class__.__name__}")
+
+    def _load(self, use_cache: bool = True):
+        """
+        ルールと索引を準備
         
-        # ロガーを作成
-        self.logger = logging.getLogger(self.__class__.__name__)
-        self.logger.setLevel(logging.DEBUG)
+        ルールファイルが前回から変わっていなければコンパイル済みキャッシュを使い、
+        YAMLの解析を行わない。
         
-        # 既存のハンドラを削除
-        for handler in self.logger.handlers[:]:
-            self.logger.removeHandler(handler)
+        Args:
+            use_cache: キャッシュを使用するか
+        """
+        key = self.rule_cache.source_key(self.rules_file)
+        if use_cache:
+            payload = self.rule_cache.load(self.rules_file, self.CACHE_KIND)
+            if payload is not None:
+                self.rules = [ConventionRule(*fields) for fields in payload['rules']]
+                self._index = CommandRuleIndex.from_snapshot(payload['index'])
+                self.logger.debug("Loaded %d command rules from cache", len(self.rules))
+                return
         
-        # ファイルハンドラを追加
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.DEBUG)
-        formatter = logging.Formatter('[%(asctime)s] %(name)s %(levelname)s: %(message)s')
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
+        try:
+            self.rules = self._parse_rules_file()
+        except Exception as e:
+            error_msg = f"コマンド規約ルールファイルの読み込みエラー: {e}"
+            self.logger.error(error_msg)
+            print(error_msg)
+            self.rules = []
+            key = None  # 読み込みに失敗した結果はキャッシュしない
+        self._index = self._build_index(self.rules)
+        
+        payload = {
+            'rules': [
+                (rule.name, rule.patterns, rule.severity, rule.message, rule.token_threshold)
+                for rule in self.rules
+            ],
+            'index': self._index.to_snapshot()
+        }
+        self.rule_cache.save(self.rules_file, self.CACHE_KIND, payload, key)
 
-    def _load_rules(self) -> List[ConventionRule]:
-        """ルールファイルを読み込む"""
-        self.logger.info(f"Loading command rules from: {self.rules_file}")
+    def _parse_rules_file(self) -> List[ConventionRule]:
+        """ルールファイル（YAML）を解析する"""
+        self.logger.info("Loading command rules from: %s", self.rules_file)
         
         if not self.rules_file.exists():
-            self.logger.error(f"Command rules file not found: {self.rules_file}")
+            self.logger.error("Command rules file not found: %s", self.rules_file)
             return []
         
-        try:
-            with open(self.rules_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+        # キャッシュ利用時に読み込まずに済むよう遅延インポート
+        import yaml
+        
+        with open(self.rules_file, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f)
+        
+        rules = []
+        for rule_data in data.get('rules', []):
+            rule = ConventionRule(
+                name=rule_data['name'],
+                patterns=rule_data['patterns'],
+                severity=rule_data.get('severity', 'warn'),
+                message=rule_data['message'],
+                token_threshold=rule_data.get('token_threshold')
+            )
+            rules.append(rule)
+            self.logger.debug("Loaded command rule: %s with patterns: %s", rule.name, rule.patterns)
+        
+        self.logger.info("Successfully loaded %s command rules", len(rules))
+        return rules
+
+    def _build_index(self, rules: List[ConventionRule]) -> CommandRuleIndex:
+        """
+        ルールの索引を構築
+        
+        Args:
+            rules: ルールリスト
             
-            rules = []
-            for rule_data in data.get('rules', []):
-                rule = ConventionRule(
-                    name=rule_data['name'],
-                    patterns=rule_data['patterns'],
-                    severity=rule_data.get('severity', 'warn'),
-                    message=rule_data['message'],
-                    token_threshold=rule_data.get('token_threshold')
-                )
-                rules.append(rule)
-                self.logger.debug(f"Loaded command rule: {rule.name} with patterns: {rule.patterns}")
+        Returns:
+            先頭トークンをキーにした索引
+        """
+        index = CommandRuleIndex(rules)
+        for rule_name, pattern, error in index.invalid:
+            self.logger.warning("Invalid command pattern skipped in rule '%s': %s - %s", rule_name, pattern, error)
+        return index
+
+    @staticmethod
+    def _split_command(command: str) -> Tuple[str, str]:
+        """
+        コマンドを正規化（余分な空白を除去）して先頭トークンと共に返す
+        
+        Args:
+            command: コマンド文字列
             
-            self.logger.info(f"Successfully loaded {len(rules)} command rules")
-            return rules
-        except Exception as e:
-            error_msg = f"コマンド規約ルールファイルの読み込みエラー: {e}"
-            self.logger.error(error_msg)
-            print(error_msg)
-            return []
+        Returns:
+            (正規化したコマンド, 先頭トークン)
+        """
+        tokens = command.split()
+        return ' '.join(tokens), (tokens[0] if tokens else '')
+
+    @staticmethod
+    def _matches_compiled(normalized_command: str, token: str, compiled: Pattern) -> bool:
+        """コマンド全体または先頭トークンがパターンにマッチするか"""
+        if compiled.match(normalized_command):
+            return True
+        # 部分マッチも考慮（コマンドの先頭部分）
+        return bool(token) and compiled.match(token) is not None
 
     def matches_pattern(self, command: str, patterns: List[str]) -> bool:
         """
         コマンドがパターンにマッチするか確認
-        fnmatchを使用してワイルドカードパターンをサポート
+        fnmatch形式のワイルドカードパターンをサポート
         
         Args:
             command: チェック対象のコマンド
@@ -103,55 +295,87 @@ class CommandConventionMatcher(BaseConventionMatcher):
         Returns:
             マッチする場合True
         """
-        # コマンドを正規化（余分な空白を除去）
-        normalized_command = ' '.join(command.split())
-        self.logger.info(f"🔍 COMMAND PATTERN MATCH: Checking command: {normalized_command}")
+        normalized_command, token = self._split_command(command)
         
         for pattern in patterns:
-            self.logger.info(f"  🎯 Testing pattern: {pattern}")
-            
             try:
-                # fnmatchでワイルドカードパターンマッチング
-                if fnmatch.fnmatch(normalized_command, pattern):
-                    self.logger.info(f"  ✅ Pattern matched: {pattern}")
-                    return True
-                
-                # 部分マッチも考慮（コマンドの先頭部分）
-                if fnmatch.fnmatch(normalized_command.split()[0], pattern):
-                    self.logger.info(f"  ✅ Command prefix matched: {pattern}")
-                    return True
-                        
-                self.logger.info(f"  ❌ Pattern not matched: {pattern}")
-                
-            except Exception as e:
+                compiled = compile_command_pattern(pattern)
+            except (re.error, TypeError) as e:
                 # 無効なパターンをスキップ
-                self.logger.info(f"  ⚠️ Invalid pattern skipped: {pattern} - {e}")
+                self.logger.debug("Invalid pattern skipped: %s - %s", pattern, e)
                 continue
+            if self._matches_compiled(normalized_command, token, compiled):
+                return True
         
-        self.logger.info(f"🚫 No patterns matched for command: {normalized_command}")
         return False
 
-    def check_command(self, command: str) -> Optional[ConventionRule]:
+    def _first_matching_rule(self, command: str, limit: int) -> Optional[int]:
         """
-        コマンドに該当する規約を返す
+        単純コマンドに最初にマッチするルール番号を返す
+        
+        Args:
+            command: 正規化済みのコマンド
+            limit: これ以上のルール番号は評価しない
+            
+        Returns:
+            ルール番号（limit未満でマッチしなければNone）
+        """
+        normalized_command, token = self._split_command(command)
+        for rule_index, compiled in self._index.candidates(token):
+            if rule_index >= limit:
+                break
+            if self._matches_compiled(normalized_command, token, compiled):
+                return rule_index
+        return None
+
+    def match_command(self, command: str) -> Optional[Tuple[ConventionRule, str]]:
+        """
+        コマンドに該当する規約と、規約に該当した単純コマンドを返す
+        
+        複合コマンドは単純コマンド（&&, ||, ;, |, サブシェル等で区切られた各コマンド、
+        先頭の環境変数代入は除去）に分割して評価し、最後にコマンド全体も評価する。
+        複数の単純コマンドがマッチした場合はルール定義順で最も前のルールを採用する。
         
         Args:
             command: チェック対象のコマンド
             
         Returns:
-            該当する規約ルール（なければNone）
+            (規約ルール, 該当した単純コマンド)（なければNone）
         """
-        self.logger.info(f"📋 CHECK COMMAND: {command}")
-        self.logger.info(f"📊 Total command rules loaded: {len(self.rules)}")
+        normalized_command = ' '.join(command.split())
+        simple_commands = split_simple_commands(command)
+        if normalized_command not in simple_commands:
+            simple_commands += (normalized_command,)
         
-        for rule in self.rules:
-            self.logger.info(f"🔎 Testing rule: {rule.name}")
-            if self.matches_pattern(command, rule.patterns):
-                self.logger.info(f"✅ COMMAND MATCHED RULE: {rule.name} (severity: {rule.severity})")
-                return rule
+        best_index = len(self.rules)
+        matched_command = None
+        for simple_command in simple_commands:
+            rule_index = self._first_matching_rule(simple_command, best_index)
+            if rule_index is not None:
+                best_index, matched_command = rule_index, simple_command
+                if best_index == 0:
+                    break
         
-        self.logger.info(f"❌ NO RULES MATCHED FOR COMMAND: {command}")
-        return None
+        if matched_command is None:
+            self.logger.debug("No rules matched for command: %s", command)
+            return None
+        
+        rule = self.rules[best_index]
+        self.logger.debug("Command matched rule: %s (severity: %s) via: %s", rule.name, rule.severity, matched_command)
+        return rule, matched_command
+
+    def check_command(self, command: str) -> Optional[ConventionRule]:
+        """
+        コマンドに該当する規約を返す（ルール定義順で最初にマッチしたもの）
+        
+        Args:
+            command: チェック対象のコマンド
+            
+        Returns:
+            該当する規約ルール（なければNone）
+        """
+        result = self.match_command(command)
+        return result[0] if result else None
 
     def get_confirmation_message(self, command: str) -> Optional[Dict[str, Any]]:
         """
@@ -163,13 +387,18 @@ class CommandConventionMatcher(BaseConventionMatcher):
         Returns:
             確認メッセージ情報（なければNone）
         """
-        rule = self.check_command(command)
-        if not rule:
+        result = self.match_command(command)
+        if not result:
             return None
+        rule, matched_command = result
+        
+        matched_line = ''
+        if matched_command != ' '.join(command.split()):
+            matched_line = f"\n該当箇所: {matched_command}"
         
         formatted_message = f"""⚠️  {rule.message}
 
-実行コマンド: {command}
+実行コマンド: {command}{matched_line}
 
 続行しますか？"""
         
@@ -178,12 +407,13 @@ class CommandConventionMatcher(BaseConventionMatcher):
             'severity': rule.severity,
             'message': formatted_message,
             'command': command,
+            'matched_command': matched_command,
             'token_threshold': rule.token_threshold
         }
 
     def reload_rules(self):
-        """ルールをリロード"""
-        self.rules = self._load_rules()
+        """ルールをリロード（キャッシュを使わずにYAMLを解析し直す）"""
+        self._load(use_cache=False)
 
     def list_rules(self) -> List[Dict[str, Any]]:
         """
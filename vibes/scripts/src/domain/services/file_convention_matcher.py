@@ -1,12 +1,14 @@
 """ファイル編集規約マッチングサービス"""
 
-import yaml
-import fnmatch
+import re
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Pattern
 from dataclasses import dataclass
 
+from .rule_cache import RuleCache
+
 
 @dataclass
 class ConventionRule:
@@ -18,16 +20,119 @@ class ConventionRule:
     token_threshold: Optional[int] = None  # 規約別トークン閾値
 
 
+def _translate_segment(segment: str) -> str:
+    """パスセグメント1つ分のglobを正規表現に変換（'/'は跨がない）"""
+    result = []
+    i, n = 0, len(segment)
+    while i < n:
+        c = segment[i]
+        i += 1
+        if c == '*':
+            while i < n and segment[i] == '*':
+                i += 1
+            result.append('[^/]*')
+        elif c == '?':
+            result.append('[^/]')
+        elif c == '[':
+            j = i
+            if j < n and segment[j] in '!^':
+                j += 1
+            if j < n and segment[j] == ']':
+                j += 1
+            while j < n and segment[j] != ']':
+                j += 1
+            if j >= n:
+                result.append('\\[')
+            else:
+                body = segment[i:j].replace('\\', '\\\\')
+                i = j + 1
+                if body[0] in '!^':
+                    body = '^' + body[1:]
+                result.append(f'(?!/)[{body}]')
+        else:
+            result.append(re.escape(c))
+    return ''.join(result)
+
+
+def translate_glob(pattern: str) -> str:
+    """
+    globパターンを正規表現文字列に変換
+
+    - '*' '?' '[...]' は1セグメント内のみにマッチ
+    - セグメント全体が '**' の場合は0個以上のセグメントにマッチ（globstar）
+    - '/' で始まるパターンはパス全体に、それ以外はパス末尾側のセグメント列にマッチ
+
+    変換結果は先頭が '/' で始まる絶対パス形式の文字列に対して fullmatch で使用する。
+
+    Args:
+        pattern: globパターン
+
+    Returns:
+        正規表現文字列
+
+    Raises:
+        ValueError: 空のパターンの場合
+    """
+    if not pattern or pattern == '/':
+        raise ValueError(f"Invalid pattern: {pattern!r}")
+
+    absolute = pattern.startswith('/')
+    segments = pattern.strip('/').split('/')
+    parts = []
+    for index, segment in enumerate(segments):
+        is_last = index == len(segments) - 1
+        if segment == '**':
+            parts.append('.*' if is_last else '(?:[^/]+/)*')
+        else:
+            parts.append(_translate_segment(segment) + ('' if is_last else '/'))
+
+    body = ''.join(parts)
+    return '/' + body if absolute else '(?:.*/)?' + body
+
+
+@lru_cache(maxsize=1024)
+def compile_glob(pattern: str) -> Pattern:
+    """
+    globパターンをコンパイル（キャッシュ付き）
+
+    Args:
+        pattern: globパターン
+
+    Returns:
+        コンパイル済み正規表現
+    """
+    return re.compile(translate_glob(pattern))
+
+
+def to_match_subject(file_path: str) -> str:
+    """
+    マッチング対象の文字列に正規化（POSIX形式・'/'始まり）
+
+    Args:
+        file_path: ファイルパス
+
+    Returns:
+        正規化されたパス文字列
+    """
+    normalized = Path(file_path).as_posix()
+    return normalized if normalized.startswith('/') else '/' + normalized
+
+
 class FileConventionMatcher:
     """ファイルパスと編集規約のマッチングを行うサービス"""
 
-    def __init__(self, rules_file: Optional[Path] = None, debug: bool = False):
+    # ルールキャッシュの種別名
+    CACHE_KIND = 'file'
+
+    def __init__(self, rules_file: Optional[Path] = None, debug: bool = False,
+                 cache_dir: Optional[Path] = None):
         """
         初期化
         
         Args:
             rules_file: ルール定義ファイルのパス
             debug: デバッグモードフラグ
+            cache_dir: コンパイル済みルールキャッシュの保存先
         """
         if rules_file is None:
             # デフォルトパスを使用
@@ -36,71 +141,115 @@ class FileConventionMatcher:
         self.rules_file = Path(rules_file)
         self.debug = debug
         self._setup_logging()
-        self.rules = self._load_rules()
+        self.rule_cache = RuleCache(cache_dir, self.logger)
+        self._load()
         
     def _setup_logging(self):
-        """ロギングの設定"""
-        log_file = Path("/tmp/file_convention_matcher.log")
-        
-        # ロガーを作成
-        self.logger = logging.getLogger(self.__class__.__name__)
-        # デバッグ用に一時的にDEBUGレベル
-        self.logger.setLevel(logging.DEBUG)
-        
-        # 既存のハンドラを削除
-        for handler in self.logger.handlers[:]:
-            self.logger.removeHandler(handler)
-        
-        # ファイルハンドラを追加
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.DEBUG)
-        formatter = logging.Formatter('[%(asctime)s] %(name)s %(levelname)s: %(message)s')
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
-        
-        # デバッグモード時のみコンソール出力（本来は不要だが一時的にコメントアウト）
-        # if self.debug:
-        #     console_handler = logging.StreamHandler()
-        #     console_handler.setLevel(logging.DEBUG)
-        #     console_handler.setFormatter(formatter)
-        #     self.logger.addHandler(console_handler)
-
-    def _load_rules(self) -> List[ConventionRule]:
-        """ルールファイルを読み込む"""
-        self.logger.info(f"Loading rules from: {self.rules_file}")
+        """ロギングの設定（出力先・レベルはフック共通の設定に従う）"""
+        # shared.utils.hook_logging.HOT_PATH_LOGGER 配下のロガー
+        self.logger = logging.getLogger(f"claude_hooks.{self.__class__.__name__}")
+
+    def _load(self, use_cache: bool = True):
+        """
+        ルールと照合用の正規表現を準備
         
-        if not self.rules_file.exists():
-            self.logger.error(f"Rules file not found: {self.rules_file}")
-            return []
+        ルールファイルが前回から変わっていなければコンパイル済みキャッシュを使い、
+        YAMLの解析を行わない。
+        
+        Args:
+            use_cache: キャッシュを使用するか
+        """
+        key = self.rule_cache.source_key(self.rules_file)
+        if use_cache:
+            payload = self.rule_cache.load(self.rules_file, self.CACHE_KIND)
+            if payload is not None:
+                self.rules = [ConventionRule(*fields) for fields in payload['rules']]
+                self._rules_regex = re.compile(payload['regex']) if payload['regex'] is not None else None
+                self.logger.debug("Loaded %d rules from cache", len(self.rules))
+                return
         
         try:
-            with open(self.rules_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-            
-            rules = []
-            for rule_data in data.get('rules', []):
-                rule = ConventionRule(
-                    name=rule_data['name'],
-                    patterns=rule_data['patterns'],
-                    severity=rule_data.get('severity', 'warn'),
-                    message=rule_data['message'],
-                    token_threshold=rule_data.get('token_threshold')
-                )
-                rules.append(rule)
-                self.logger.debug(f"Loaded rule: {rule.name} with patterns: {rule.patterns}")
-            
-            self.logger.info(f"Successfully loaded {len(rules)} rules")
-            return rules
+            self.rules = self._parse_rules_file()
         except Exception as e:
             error_msg = f"ルールファイルの読み込みエラー: {e}"
             self.logger.error(error_msg)
             print(error_msg)
+            self.rules = []
+            key = None  # 読み込みに失敗した結果はキャッシュしない
+        self._rules_regex = self._compile_rules(self.rules)
+        
+        payload = {
+            'rules': [
+                (rule.name, rule.patterns, rule.severity, rule.message, rule.token_threshold)
+                for rule in self.rules
+            ],
+            'regex': self._rules_regex.pattern if self._rules_regex is not None else None
+        }
+        self.rule_cache.save(self.rules_file, self.CACHE_KIND, payload, key)
+
+    def _parse_rules_file(self) -> List[ConventionRule]:
+        """ルールファイル（YAML）を解析する"""
+        self.logger.info("Loading rules from: %s", self.rules_file)
+        
+        if not self.rules_file.exists():
+            self.logger.error("Rules file not found: %s", self.rules_file)
             return []
+        
+        # キャッシュ利用時に読み込まずに済むよう遅延インポート
+        import yaml
+        
+        with open(self.rules_file, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f)
+        
+        rules = []
+        for rule_data in data.get('rules', []):
+            rule = ConventionRule(
+                name=rule_data['name'],
+                patterns=rule_data['patterns'],
+                severity=rule_data.get('severity', 'warn'),
+                message=rule_data['message'],
+                token_threshold=rule_data.get('token_threshold')
+            )
+            rules.append(rule)
+            self.logger.debug("Loaded rule: %s with patterns: %s", rule.name, rule.patterns)
+        
+        self.logger.info("Successfully loaded %s rules", len(rules))
+        return rules
+
+    def _compile_rules(self, rules: List[ConventionRule]) -> Optional[Pattern]:
+        """
+        全ルールのパターンを1つの正規表現にまとめてコンパイル
+        
+        ルール毎に名前付きグループ (r0, r1, ...) を割り当て、ルール定義順に
+        選択肢を並べることで、先頭から評価した場合と同じ「最初にマッチしたルール」を
+        1回のマッチングで得られるようにする。
+        
+        Args:
+            rules: ルールリスト
+            
+        Returns:
+            コンパイル済み正規表現（有効なパターンがない場合None）
+        """
+        alternatives = []
+        for index, rule in enumerate(rules):
+            regexes = []
+            for pattern in rule.patterns:
+                try:
+                    regexes.append(compile_glob(pattern).pattern)
+                except (ValueError, re.error) as e:
+                    # 無効なパターンをスキップ
+                    self.logger.warning("Invalid pattern skipped in rule '%s': %s - %s", rule.name, pattern, e)
+            if regexes:
+                alternatives.append(f"(?P<r{index}>{'|'.join(regexes)})")
+        
+        if not alternatives:
+            return None
+        return re.compile('|'.join(alternatives))
 
     def matches_pattern(self, file_path: str, patterns: List[str]) -> bool:
         """
         ファイルパスがパターンにマッチするか確認
-        pathlib.Path.match()を使用して**パターンを正しくサポート
+        '**' は0個以上のディレクトリにマッチする（globstar）
         
         Args:
             file_path: チェック対象のファイルパス
@@ -109,39 +258,21 @@ class FileConventionMatcher:
         Returns:
             マッチする場合True
         """
-        # 正規化されたパスに変換
-        normalized_path = str(Path(file_path).as_posix())
-        self.logger.info(f"🔍 PATTERN MATCH DEBUG: Checking file path: {normalized_path}")
+        subject = to_match_subject(file_path)
         
         for pattern in patterns:
-            self.logger.info(f"  🎯 Testing pattern: {pattern}")
-            
             try:
-                # pathlib.Path.match()は**をサポート
-                if Path(normalized_path).match(pattern):
-                    self.logger.info(f"  ✅ Pattern matched: {pattern}")
+                if compile_glob(pattern).fullmatch(subject):
                     return True
-                
-                # 絶対パターンの場合も対応（/で始まるパターン）
-                if pattern.startswith('/'):
-                    if Path('/' + normalized_path).match(pattern):
-                        self.logger.info(f"  ✅ Absolute pattern matched: {pattern}")
-                        return True
-                        
-                self.logger.info(f"  ❌ Pattern not matched: {pattern}")
-                
-            except ValueError as e:
+            except (ValueError, re.error) as e:
                 # 無効なパターンをスキップ
-                self.logger.info(f"  ⚠️ Invalid pattern skipped: {pattern} - {e}")
-                continue
+                self.logger.debug("Invalid pattern skipped: %s - %s", pattern, e)
         
-        
-        self.logger.info(f"🚫 No patterns matched for: {normalized_path}")
         return False
 
     def check_file(self, file_path: str) -> Optional[ConventionRule]:
         """
-        ファイルパスに該当する規約を返す
+        ファイルパスに該当する規約を返す（ルール定義順で最初にマッチしたもの）
         
         Args:
             file_path: チェック対象のファイルパス
@@ -149,17 +280,17 @@ class FileConventionMatcher:
         Returns:
             該当する規約ルール（なければNone）
         """
-        self.logger.info(f"📋 CHECK FILE: {file_path}")
-        self.logger.info(f"📊 Total rules loaded: {len(self.rules)}")
+        if self._rules_regex is None:
+            return None
         
-        for rule in self.rules:
-            self.logger.info(f"🔎 Testing rule: {rule.name}")
-            if self.matches_pattern(file_path, rule.patterns):
-                self.logger.info(f"✅ FILE MATCHED RULE: {rule.name} (severity: {rule.severity})")
-                return rule
+        match = self._rules_regex.fullmatch(to_match_subject(file_path))
+        if not match:
+            self.logger.debug("No rules matched for file: %s", file_path)
+            return None
         
-        self.logger.info(f"❌ NO RULES MATCHED FOR FILE: {file_path}")
-        return None
+        rule = self.rules[int(match.lastgroup[1:])]
+        self.logger.debug("File matched rule: %s (severity: %s)", rule.name, rule.severity)
+        return rule
 
     def get_confirmation_message(self, file_path: str) -> Optional[Dict[str, Any]]:
         """
@@ -186,8 +317,8 @@ class FileConventionMatcher:
         }
 
     def reload_rules(self):
-        """ルールをリロード"""
-        self.rules = self._load_rules()
+        """ルールをリロード（キャッシュを使わずにYAMLを解析し直す）"""
+        self._load(use_cache=False)
 
     def list_rules(self) -> List[Dict[str, Any]]:
         """
@@ -1,8 +1,10 @@
 """Claude Code Hooks管理サービス"""
 
-import json
-from typing import Dict, List, Optional
+import os
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
+from shared.utils import json_codec
+from domain.services.hook_routing import HookRoutingTable
 
 
 class HookManager:
@@ -26,6 +28,8 @@ class HookManager:
         self.claude_dir = claude_dir or Path.cwd() / ".claude"
         self.settings_file = self.claude_dir / "settings.json"
         self.settings_local_file = self.claude_dir / "settings.local.json"
+        self._routing_table: Optional[HookRoutingTable] = None
+        self._routing_key: Optional[Tuple] = None
 
     def load_settings(self, local: bool = False) -> Dict:
         """
@@ -44,10 +48,37 @@ class HookManager:
         
         try:
             with open(settings_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
+                return json_codec.load(f)
+        except json_codec.JSONDecodeError:
             return {"hooks": {}}
 
+    def _settings_key(self) -> Tuple:
+        """設定ファイル（プロジェクト・ローカル）の (mtime_ns, サイズ)（ファイルが無い場合None）"""
+        key = []
+        for settings_file in (self.settings_file, self.settings_local_file):
+            try:
+                stat = os.stat(settings_file)
+                key.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                key.append(None)
+        return tuple(key)
+
+    def get_routing_table(self) -> HookRoutingTable:
+        """
+        プロジェクト設定とローカル設定をまとめたルーティングテーブルを取得
+
+        設定ファイルの mtime・サイズが変わるまでは構築済みのテーブルを返す。
+        フックはプロジェクト設定、ローカル設定の順に実行する。
+
+        Returns:
+            HookRoutingTable
+        """
+        key = self._settings_key()
+        if self._routing_table is None or key != self._routing_key:
+            self._routing_table = HookRoutingTable.compile([self.load_settings(), self.load_settings(local=True)])
+            self._routing_key = key
+        return self._routing_table
+
     def save_settings(self, settings: Dict, local: bool = False) -> Dict:
         """
         設定ファイルを保存する
@@ -67,7 +98,8 @@ class HookManager:
             
             # 設定を保存
             with open(settings_file, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, indent=2, ensure_ascii=False)
+                json_codec.dump(settings, f, indent=2, ensure_ascii=False)
+            self._routing_table = None
             
             return {'success': True, 'file': str(settings_file)}
         except Exception as e:
@@ -263,8 +295,8 @@ class HookManager:
         
         try:
             with open(source_file, 'r', encoding='utf-8') as f:
-                source_settings = json.load(f)
-        except json.JSONDecodeError as e:
+                source_settings = json_codec.load(f)
+        except json_codec.JSONDecodeError as e:
             return {'success': False, 'error': f'JSONの解析に失敗しました: {e}'}
         
         if 'hooks' not in source_settings:
@@ -0,0 +1,126 @@
+"""フックのルーティングテーブル
+
+settings.json と settings.local.json のフック設定を1つにまとめ、
+(イベント, ツール名) から実行するフックのリストを引けるようにする。
+マッチャーは構築時に1度だけ解析し（'|' 区切りの完全一致は集合、ワイルドカードは正規表現）、
+ツール名毎の結果はメモ化するため、2回目以降の参照は辞書の検索のみになる。
+"""
+
+import re
+import fnmatch
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class CompiledMatcher:
+    """解析済みのマッチャー（ツール名のパターン）"""
+
+    def __init__(self, matcher: str):
+        """
+        マッチャーを解析
+
+        Args:
+            matcher: マッチャー（空文字列は全てのツール、'|' 区切りはOR、'*' 等はワイルドカード）
+        """
+        self.matcher = matcher
+        self.match_all = not matcher
+        self.names = set()
+        wildcards = []
+        patterns = [pattern.strip() for pattern in matcher.split('|')] if '|' in matcher else [matcher]
+        for pattern in patterns:
+            if '*' in pattern:
+                wildcards.append(fnmatch.translate(pattern))
+            else:
+                self.names.add(pattern)
+        self.wildcard = re.compile('|'.join(wildcards)) if wildcards else None
+
+    def matches(self, tool_name: str) -> bool:
+        """
+        ツール名がマッチャーに一致するか
+
+        Args:
+            tool_name: ツール名
+
+        Returns:
+            一致する場合True
+        """
+        if self.match_all or tool_name in self.names:
+            return True
+        return self.wildcard is not None and self.wildcard.match(tool_name) is not None
+
+
+class HookRoutingTable:
+    """(イベント, ツール名) -> フックのリスト"""
+
+    def __init__(self, entries: Dict[str, List[Tuple[CompiledMatcher, List[Dict[str, Any]]]]]):
+        """
+        初期化
+
+        Args:
+            entries: イベント毎の (解析済みマッチャー, フック設定のリスト) のリスト（設定の順）
+        """
+        self._entries = entries
+        self._routes: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+
+    @classmethod
+    def compile(cls, settings_list: List[Dict[str, Any]]) -> 'HookRoutingTable':
+        """
+        設定からルーティングテーブルを構築
+
+        Args:
+            settings_list: 設定内容のリスト（先の設定のフックを先に実行する）
+
+        Returns:
+            HookRoutingTable
+        """
+        entries: Dict[str, List[Tuple[CompiledMatcher, List[Dict[str, Any]]]]] = {}
+        for settings in settings_list:
+            hooks = settings.get('hooks') if isinstance(settings, dict) else None
+            if not isinstance(hooks, dict):
+                continue
+            for event, matcher_entries in hooks.items():
+                for matcher_entry in matcher_entries or []:
+                    if not isinstance(matcher_entry, dict):
+                        continue
+                    entries.setdefault(event, []).append((
+                        CompiledMatcher(matcher_entry.get('matcher') or ''),
+                        list(matcher_entry.get('hooks') or [])
+                    ))
+        return cls(entries)
+
+    def route(self, event: str, tool_name: str) -> List[Dict[str, Any]]:
+        """
+        イベント・ツール名に該当するフックを取得
+
+        Args:
+            event: イベント名
+            tool_name: ツール名
+
+        Returns:
+            フック設定のリスト（設定の順。呼び出し側で変更しないこと）
+        """
+        key = (event, tool_name)
+        hooks = self._routes.get(key)
+        if hooks is None:
+            hooks = [
+                hook
+                for matcher, matcher_hooks in self._entries.get(event, [])
+                if matcher.matches(tool_name)
+                for hook in matcher_hooks
+            ]
+            self._routes[key] = hooks
+        return hooks
+
+    def hooks(self, event: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        登録されている全てのフック設定
+
+        Args:
+            event: 対象のイベント名（省略時は全イベント）
+
+        Yields:
+            フック設定
+        """
+        events = [event] if event else list(self._entries)
+        for name in events:
+            for _, matcher_hooks in self._entries.get(name, []):
+                yield from matcher_hooks
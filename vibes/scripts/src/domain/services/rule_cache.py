@@ -0,0 +1,123 @@
+"""規約ルールのコンパイル済みキャッシュ
+
+規約YAMLの解析結果とマッチャーの索引構造を marshal 形式で保存し、
+YAMLが更新されるまでは PyYAML を使わずに読み込めるようにする。
+キャッシュはルールファイルのパス・mtime・サイズをキーとし、
+いずれかが変わると自動的に作り直される。
+"""
+
+import os
+import marshal
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Optional
+
+
+# キャッシュ形式のバージョン（保存内容の構造を変えたら上げる）
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_CACHE_DIR = Path("/tmp/claude_rule_cache")
+
+
+class RuleCache:
+    """ルールファイル単位のコンパイル済みキャッシュ"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, logger: Optional[logging.Logger] = None):
+        """
+        初期化
+
+        Args:
+            cache_dir: キャッシュの保存先ディレクトリ
+            logger: ロガー
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+
+    def get_cache_path(self, rules_file: Path, kind: str) -> Path:
+        """
+        キャッシュファイルのパスを取得
+
+        Args:
+            rules_file: ルールファイルのパス
+            kind: マッチャーの種類（'file' / 'command'）
+
+        Returns:
+            キャッシュファイルのパス
+        """
+        digest = hashlib.md5(str(Path(rules_file).resolve()).encode()).hexdigest()[:16]
+        return self.cache_dir / f"{kind}_{digest}.marshal"
+
+    @staticmethod
+    def source_key(rules_file: Path) -> Optional[list]:
+        """
+        ルールファイルの識別情報を取得
+
+        Args:
+            rules_file: ルールファイルのパス
+
+        Returns:
+            [パス, mtime_ns, サイズ]（ファイルが無い場合None）
+        """
+        try:
+            stat = os.stat(rules_file)
+        except OSError:
+            return None
+        return [str(Path(rules_file).resolve()), stat.st_mtime_ns, stat.st_size]
+
+    def load(self, rules_file: Path, kind: str) -> Optional[Any]:
+        """
+        キャッシュを読み込む
+
+        Args:
+            rules_file: ルールファイルのパス
+            kind: マッチャーの種類
+
+        Returns:
+            保存されたデータ（キャッシュが無い・古い・壊れている場合None）
+        """
+        key = self.source_key(rules_file)
+        if key is None:
+            return None
+
+        try:
+            with open(self.get_cache_path(rules_file, kind), 'rb') as f:
+                entry = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        if not isinstance(entry, dict):
+            return None
+        if entry.get('version') != CACHE_FORMAT_VERSION or entry.get('source') != key:
+            return None
+        return entry.get('payload')
+
+    def save(self, rules_file: Path, kind: str, payload: Any, key: Optional[list]) -> None:
+        """
+        キャッシュを保存（一時ファイル経由で置き換え）
+
+        解析中にルールファイルが更新された場合に古い内容を新しいキーで
+        保存しないよう、keyには解析前に取得した source_key を渡す。
+
+        Args:
+            rules_file: ルールファイルのパス
+            kind: マッチャーの種類
+            payload: 保存するデータ（marshal可能な組み込み型のみ）
+            key: 解析前に取得した source_key
+        """
+        if key is None:
+            return
+
+        cache_path = self.get_cache_path(rules_file, kind)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                marshal.dump({'version': CACHE_FORMAT_VERSION, 'source': key, 'payload': payload}, f)
+            os.replace(tmp_path, cache_path)
+        except (OSError, ValueError) as e:
+            self.logger.warning("Failed to save rule cache for %s: %s", rules_file, e)
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
@@ -0,0 +1,123 @@
+"""シェルコマンド分割サービス
+
+`cd app && git push` や `FOO=1 docker compose up | tee log` のような複合コマンドを
+単純コマンドの列に分割する。完全なシェル構文解析は行わず、規約マッチングに
+必要な範囲（制御演算子・パイプ・サブシェル・クォート・環境変数代入）のみを扱う。
+"""
+
+import re
+from functools import lru_cache
+from typing import List, Tuple
+
+
+# 先頭の環境変数代入（NAME=value）。値はクォートを含み得る
+_ENV_ASSIGNMENT = re.compile(
+    r"""[A-Za-z_][A-Za-z0-9_]*=(?:'[^']*'|"(?:[^"\\]|\\.)*"|\\.|[^\s'"\\])*\s+"""
+)
+
+# リダイレクトの一部として扱う '&' / '|' の直前文字（2>&1, >| など）
+_REDIRECT_CHARS = '<>'
+
+
+def strip_env_assignments(command: str) -> str:
+    """
+    単純コマンド先頭の環境変数代入を除去
+
+    Args:
+        command: 単純コマンド
+
+    Returns:
+        代入部分を除いたコマンド（代入のみの場合は空文字列）
+    """
+    command = command.strip()
+    while True:
+        match = _ENV_ASSIGNMENT.match(command + ' ')
+        if not match:
+            return command
+        command = command[match.end():].lstrip()
+
+
+def _split(command: str) -> List[str]:
+    """制御演算子・パイプ・サブシェルの位置でコマンドを区切る"""
+    segments = []
+    current = []
+    quote = None
+    i, n = 0, len(command)
+
+    def flush():
+        segments.append(''.join(current))
+        current.clear()
+
+    while i < n:
+        c = command[i]
+
+        if quote:
+            current.append(c)
+            if c == '\\' and quote == '"' and i + 1 < n:
+                current.append(command[i + 1])
+                i += 1
+            elif c == quote:
+                quote = None
+            i += 1
+            continue
+
+        if c == '\\' and i + 1 < n:
+            current.append(command[i:i + 2])
+            i += 2
+            continue
+
+        if c in ('"', "'"):
+            quote = c
+            current.append(c)
+        elif c in ';\n()`':
+            flush()
+        elif c == '$' and i + 1 < n and command[i + 1] == '(':
+            # コマンド置換 $( ... )
+            flush()
+            i += 1
+        elif c == '&':
+            previous = command[i - 1] if i > 0 else ''
+            following = command[i + 1] if i + 1 < n else ''
+            if previous in _REDIRECT_CHARS or following == '>':
+                current.append(c)
+            else:
+                flush()
+                if following == '&':
+                    i += 1
+        elif c == '|':
+            previous = command[i - 1] if i > 0 else ''
+            if previous in _REDIRECT_CHARS:
+                current.append(c)
+            else:
+                flush()
+                if i + 1 < n and command[i + 1] in '|&':
+                    i += 1
+        else:
+            current.append(c)
+        i += 1
+
+    flush()
+    return segments
+
+
+@lru_cache(maxsize=256)
+def split_simple_commands(command: str) -> Tuple[str, ...]:
+    """
+    複合コマンドを単純コマンドに分割（キャッシュ付き）
+
+    `&&` `||` `;` `|` `&` 改行、サブシェル `( )`、コマンド置換 `$( )` と
+    バッククォートの位置で分割し、各コマンド先頭の環境変数代入を除去する。
+    クォート内の演算子は分割しない。
+
+    Args:
+        command: コマンド文字列
+
+    Returns:
+        空白を正規化した単純コマンドのタプル（出現順、空のものは除外）
+    """
+    simple_commands = []
+    for segment in _split(command):
+        normalized = ' '.join(strip_env_assignments(segment).split())
+        if normalized:
+            simple_commands.append(normalized)
+    return tuple(simple_commands)
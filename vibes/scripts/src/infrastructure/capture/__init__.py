@@ -0,0 +1,5 @@
+"""フック入力の保存パッケージ"""
+
+from .raw_input_capture import RawInputCapture, RawInputRing, RawCaptureSettings
+
+__all__ = ['RawInputCapture', 'RawInputRing', 'RawCaptureSettings']
@@ -0,0 +1,292 @@
+"""フック入力（生JSON）の保存
+
+従来は呼び出し毎に /tmp/claude/base_hook_<timestamp>.json を作成していたが、
+Write/Edit の入力はファイル本文全体を含むため、ホットパスのI/Oが倍増する。
+保存方法を設定で選択できるようにする。
+
+- off: 保存しない
+- sampled: sample_rate の割合の呼び出しのみファイルに保存
+- ring: 事前確保した1つのファイル（mmap）に直近 ring_slots 件を上書き保存
+- on_error: 入力をメモリに保持し、処理が失敗した場合のみファイルに保存
+- all: 従来どおり毎回ファイルに保存
+"""
+
+import os
+import mmap
+import time
+import struct
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+CAPTURE_MODES = ('off', 'sampled', 'ring', 'on_error', 'all')
+
+DEFAULT_CAPTURE_DIR = Path("/tmp/claude")
+
+# リングファイルのヘッダ: マジック, バージョン, スロット数, スロットサイズ, 次の書き込み番号
+_HEADER = struct.Struct('<4sIIIQ')
+_MAGIC = b'CRIR'
+_RING_VERSION = 1
+
+# スロットのヘッダ: 書き込み番号, 時刻, 元のバイト数, 保存したバイト数
+_SLOT_HEADER = struct.Struct('<QdII')
+
+
+@contextmanager
+def _flock(fd: int):
+    """ファイル単位の排他ロック（fcntlが無い環境では何もしない）"""
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+@dataclass
+class RawCaptureSettings:
+    """生JSON保存の設定"""
+    mode: str = 'ring'
+    sample_rate: float = 0.01
+    ring_slots: int = 64
+    ring_slot_bytes: int = 64 * 1024
+    capture_dir: str = str(DEFAULT_CAPTURE_DIR)
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> 'RawCaptureSettings':
+        """
+        設定（config.json5 の convention_hooks.raw_input_capture）から生成
+
+        Args:
+            settings: 設定の辞書（未知のキーは無視）
+
+        Returns:
+            保存設定
+        """
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (settings or {}).items() if k in names})
+
+
+class RawInputRing:
+    """事前確保したファイルをmmapしたリングバッファ
+
+    ファイルはヘッダと固定長スロットの列からなり、書き込みは
+    スロットへのメモリコピーのみでファイルの作成・拡張は行わない。
+    スロットに収まらない入力は先頭 slot_bytes 分のみ保存する。
+    複数プロセスからの書き込みは書き込み番号の更新をflockで排他する。
+    """
+
+    def __init__(self, path: Path, slots: int = 64, slot_bytes: int = 64 * 1024):
+        """
+        初期化
+
+        Args:
+            path: リングファイルのパス
+            slots: スロット数
+            slot_bytes: 1スロットに保存する最大バイト数
+        """
+        self.path = Path(path)
+        self.slots = max(1, int(slots))
+        self.slot_bytes = max(1, int(slot_bytes))
+        self.slot_size = _SLOT_HEADER.size + self.slot_bytes
+        self.file_size = _HEADER.size + self.slots * self.slot_size
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    def _open(self) -> mmap.mmap:
+        """リングファイルを開き、形式が異なる場合は作り直す"""
+        if self._map is not None:
+            return self._map
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            with _flock(fd):
+                if os.fstat(fd).st_size != self.file_size or not self._header_matches(fd):
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, self.file_size)
+                    os.pwrite(fd, _HEADER.pack(_MAGIC, _RING_VERSION, self.slots, self.slot_bytes, 0), 0)
+            self._map = mmap.mmap(fd, self.file_size)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+        return self._map
+
+    def _header_matches(self, fd: int) -> bool:
+        """ヘッダの形式が現在の設定と一致するか"""
+        header = os.pread(fd, _HEADER.size, 0)
+        if len(header) != _HEADER.size:
+            return False
+        magic, version, slots, slot_bytes, _ = _HEADER.unpack(header)
+        return (magic, version, slots, slot_bytes) == (_MAGIC, _RING_VERSION, self.slots, self.slot_bytes)
+
+    def append(self, data: bytes) -> int:
+        """
+        入力を次のスロットに書き込む
+
+        Args:
+            data: 入力のバイト列
+
+        Returns:
+            書き込み番号
+        """
+        ring = self._open()
+        with self._lock, _flock(self._fd):
+            seq = _HEADER.unpack_from(ring, 0)[4]
+            _HEADER.pack_into(ring, 0, _MAGIC, _RING_VERSION, self.slots, self.slot_bytes, seq + 1)
+
+        stored = data[:self.slot_bytes]
+        offset = _HEADER.size + (seq % self.slots) * self.slot_size
+        # ヘッダを無効化してから本文を書き、最後にヘッダを書いて読み取り側が不完全なスロットを扱わないようにする
+        _SLOT_HEADER.pack_into(ring, offset, 0, 0.0, 0, 0)
+        body = offset + _SLOT_HEADER.size
+        ring[body:body + len(stored)] = stored
+        _SLOT_HEADER.pack_into(ring, offset, seq + 1, time.time(), len(data), len(stored))
+        return seq
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        保存されている入力を古い順に取得
+
+        Returns:
+            'seq', 'timestamp', 'size', 'truncated', 'data' を含む辞書のリスト
+        """
+        ring = self._open()
+        entries = []
+        for slot in range(self.slots):
+            offset = _HEADER.size + slot * self.slot_size
+            seq, timestamp, size, stored = _SLOT_HEADER.unpack_from(ring, offset)
+            if not seq:
+                continue
+            body = offset + _SLOT_HEADER.size
+            entries.append({
+                'seq': seq - 1,
+                'timestamp': datetime.fromtimestamp(timestamp).isoformat(),
+                'size': size,
+                'truncated': stored < size,
+                'data': ring[body:body + stored].decode('utf-8', errors='replace')
+            })
+        entries.sort(key=lambda entry: entry['seq'])
+        return entries
+
+    def close(self) -> None:
+        """mmapとファイルを閉じる"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class RawInputCapture:
+    """設定されたモードに従ってフック入力を保存"""
+
+    RING_FILE_NAME = "raw_input_ring.bin"
+
+    def __init__(self, settings: Optional[RawCaptureSettings] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        初期化
+
+        Args:
+            settings: 保存設定（省略時はデフォルト値）
+            logger: ロガー
+        """
+        self.settings = settings or RawCaptureSettings()
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        if self.settings.mode not in CAPTURE_MODES:
+            self.logger.warning("Unknown raw input capture mode '%s', using 'ring'", self.settings.mode)
+            self.settings.mode = 'ring'
+        self.capture_dir = Path(self.settings.capture_dir)
+        self._ring: Optional[RawInputRing] = None
+        self._pending: Optional[str] = None
+
+    @property
+    def ring(self) -> RawInputRing:
+        """リングバッファ（初回アクセス時に開く）"""
+        if self._ring is None:
+            self._ring = RawInputRing(self.capture_dir / self.RING_FILE_NAME,
+                                      self.settings.ring_slots, self.settings.ring_slot_bytes)
+        return self._ring
+
+    def _sampled(self) -> bool:
+        """sample_rate の割合でTrue（randomは sampled モードでのみ読み込む）"""
+        import random
+        return random.random() < self.settings.sample_rate
+
+    def capture(self, raw_json: str) -> None:
+        """
+        入力を保存（失敗してもフック処理は継続する）
+
+        Args:
+            raw_json: 生のJSONテキスト
+        """
+        mode = self.settings.mode
+        try:
+            if mode == 'ring':
+                self.ring.append(raw_json.encode('utf-8', errors='replace'))
+            elif mode == 'on_error':
+                self._pending = raw_json
+            elif mode == 'all' or (mode == 'sampled' and self._sampled()):
+                self.write_file(raw_json)
+        except Exception as e:
+            self.logger.error("Failed to capture raw input: %s", e)
+
+    def capture_error(self) -> Optional[Path]:
+        """
+        処理失敗時に保持している入力をファイルに保存（on_error モード）
+
+        Returns:
+            保存したファイルのパス（保存しなかった場合None）
+        """
+        raw_json, self._pending = self._pending, None
+        if raw_json is None:
+            return None
+        try:
+            return self.write_file(raw_json)
+        except Exception as e:
+            self.logger.error("Failed to capture raw input: %s", e)
+            return None
+
+    def reset(self) -> None:
+        """呼び出し毎の保持内容を破棄"""
+        self._pending = None
+
+    def write_file(self, raw_json: str) -> Path:
+        """
+        入力をタイムスタンプ付きファイルに保存
+
+        Args:
+            raw_json: 生のJSONテキスト
+
+        Returns:
+            保存したファイルのパス
+        """
+        self.capture_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        filepath = self.capture_dir / f"base_hook_{timestamp}.json"
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(raw_json)
+        self.logger.debug("Raw JSON saved to: %s", filepath)
+        return filepath
+
+    def close(self) -> None:
+        """リングバッファを閉じる"""
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
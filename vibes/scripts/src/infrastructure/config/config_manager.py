@@ -1,13 +1,34 @@
 """設定管理モジュール"""
 
 import os
-import json
-try:
-    import json5
-except ImportError:
-    json5 = None
+import sys
+import marshal
+import hashlib
 from pathlib import Path
 from typing import Any, Dict, Optional
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from shared.utils import json_codec
+
+
+# 解析済み設定のキャッシュ保存先
+# json5は純Python実装で config.json5 の解析に数十msかかるため、フックの起動毎に
+# 解析し直さないよう、設定ファイルのパス・mtime・サイズをキーに marshal 形式で保存する
+DEFAULT_CACHE_DIR = Path("/tmp/claude_config_cache")
+
+# キャッシュ形式のバージョン（保存内容の構造を変えたら上げる）
+CACHE_FORMAT_VERSION = 1
+
+
+def _parse(path: Path, content: str) -> Any:
+    """設定ファイルの内容を解析（json5は.json5ファイルの解析時のみ読み込む）"""
+    if path.suffix == '.json5':
+        try:
+            import json5
+        except ImportError:
+            return json_codec.loads(content)
+        return json5.loads(content)
+    return json_codec.loads(content)
 
 
 class ConfigManager:
@@ -17,11 +38,12 @@ class ConfigManager:
     パスは相対パス（main.pyからの相対）と絶対パスの両方をサポート。
     """
 
-    def __init__(self, config_path: Optional[Path] = None):
+    def __init__(self, config_path: Optional[Path] = None, cache_dir: Optional[Path] = None):
         """初期化
         
         Args:
             config_path: 設定ファイルパス（省略時はデフォルト）
+            cache_dir: 解析済み設定のキャッシュ保存先（省略時はデフォルト）
         """
         # main.pyの位置を基準とする（scripts/ディレクトリ）
         # __file__ は src/infrastructure/config/config_manager.py
@@ -30,6 +52,7 @@ class ConfigManager:
         self.base_dir = Path(__file__).parent.parent.parent.parent  # scripts/
         self.config_path = config_path or (self.base_dir / "config.json5")
         self.secrets_path = self.base_dir / "secrets.json5"
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
         self._config: Optional[Dict[str, Any]] = None
         self._secrets: Optional[Dict[str, Any]] = None
 
@@ -41,14 +64,16 @@ class ConfigManager:
         return self._config
 
     def _load_config(self) -> Dict[str, Any]:
-        """設定ファイルを読み込み"""
+        """設定ファイルを読み込み（変更が無ければ解析済みキャッシュを使用）"""
         try:
+            key = self._source_key()
+            cached = self._load_cache(key)
+            if cached is not None:
+                return cached
             with open(self.config_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                if self.config_path.suffix == '.json5' and json5:
-                    return json5.loads(content)
-                else:
-                    return json.loads(content)
+                config = _parse(self.config_path, f.read())
+            self._save_cache(key, config)
+            return config
         except FileNotFoundError:
             print(f"⚠️ 設定ファイルが見つかりません: {self.config_path}")
             return self._get_default_config()
@@ -56,6 +81,58 @@ class ConfigManager:
             print(f"❌ 設定ファイル読み込みエラー: {e}")
             return self._get_default_config()
 
+    def _source_key(self) -> list:
+        """設定ファイルの識別情報 [パス, mtime_ns, サイズ]（ファイルが無い場合FileNotFoundError）"""
+        stat = os.stat(self.config_path)
+        return [str(Path(self.config_path).resolve()), stat.st_mtime_ns, stat.st_size]
+
+    def _cache_path(self, key: list) -> Path:
+        """解析済み設定のキャッシュファイルのパス"""
+        return self.cache_dir / f"config_{hashlib.md5(key[0].encode()).hexdigest()[:16]}.marshal"
+
+    def _load_cache(self, key: list) -> Optional[Dict[str, Any]]:
+        """
+        解析済み設定のキャッシュを読み込む
+
+        Args:
+            key: 解析前に取得した設定ファイルの識別情報
+
+        Returns:
+            設定（キャッシュが無い・古い・壊れている場合None）
+        """
+        try:
+            with open(self._cache_path(key), 'rb') as f:
+                entry = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not isinstance(entry, dict):
+            return None
+        if entry.get('version') != CACHE_FORMAT_VERSION or entry.get('source') != key:
+            return None
+        config = entry.get('config')
+        return config if isinstance(config, dict) else None
+
+    def _save_cache(self, key: list, config: Any) -> None:
+        """
+        解析済み設定のキャッシュを保存（一時ファイル経由で置き換え、失敗は無視）
+
+        Args:
+            key: 解析前に取得した設定ファイルの識別情報
+            config: 解析した設定
+        """
+        cache_path = self._cache_path(key)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                marshal.dump({'version': CACHE_FORMAT_VERSION, 'source': key, 'config': config}, f)
+            os.replace(tmp_path, cache_path)
+        except (OSError, ValueError):
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
     def _get_default_config(self) -> Dict[str, Any]:
         """デフォルト設定を返す"""
         return {
@@ -165,6 +242,26 @@ class ConfigManager:
             "enabled": True
         })
     
+    def get_logging_settings(self) -> Dict[str, Any]:
+        """フックのロギング設定を取得"""
+        return self.config.get("convention_hooks", {}).get("logging", {})
+
+    def get_metrics_settings(self) -> Dict[str, Any]:
+        """フック実行時間の計測設定を取得"""
+        return self.config.get("convention_hooks", {}).get("metrics", {})
+
+    def get_raw_capture_settings(self) -> Dict[str, Any]:
+        """フック入力（生JSON）の保存設定を取得"""
+        return self.config.get("convention_hooks", {}).get("raw_input_capture", {})
+
+    def get_retention_settings(self) -> Dict[str, Any]:
+        """マーカー・一時ファイルの保持期間設定を取得"""
+        return self.config.get("convention_hooks", {}).get("retention", {})
+
+    def get_hook_execution_settings(self) -> Dict[str, Any]:
+        """コマンドフックの実行設定（同時実行・全体の期限・Pythonワーカー）を取得"""
+        return self.config.get("convention_hooks", {}).get("hook_execution", {})
+
     def get_display_level_config(self, level: str) -> Dict[str, bool]:
         """表示レベル設定を取得"""
         return self.config.get("convention_hooks", {}).get("display_levels", {}).get(level, {})
@@ -174,11 +271,7 @@ class ConfigManager:
         if self.secrets_path.exists():
             try:
                 with open(self.secrets_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    if self.secrets_path.suffix == '.json5' and json5:
-                        return json5.loads(content)
-                    else:
-                        return json.loads(content)
+                    return _parse(self.secrets_path, f.read())
             except Exception:
                 pass
         return {}
@@ -1,5 +1,6 @@
 """フック実行インフラストラクチャモジュール"""
 
 from .hook_executor import HookExecutor
+from .hook_daemon import HookDaemon
 
-__all__ = ['HookExecutor']
\ No newline at end of file
+__all__ = ['HookExecutor', 'HookDaemon']
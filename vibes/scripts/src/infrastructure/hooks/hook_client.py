@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""常駐フックデーモン用の軽量クライアント
+
+Claude Codeのフックコマンドとして登録して使用する:
+
+    python3 vibes/scripts/src/infrastructure/hooks/hook_client.py implementation_design
+
+標準入力のJSONをそのままデーモンへ転送し、判定結果を標準出力に書き出す。
+デーモンが起動していない（接続できない）場合は同一プロセス内でフックを実行する。
+要求の送信後に応答が得られない場合（タイムアウト等）は、デーモンがフックを実行済みの
+可能性があるため再実行せず、エラー（終了コード1、標準出力なし）とする。
+起動時のコストを抑えるため、このモジュールは json / pathlib 等もインポートしない。
+
+プロトコル（1接続1リクエスト）:
+    要求: "<フック名>\n" + 標準入力の生データ（送信後に書き込み側をshutdown）
+    応答: "<終了コード>\n" + 標準出力に書く文字列
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import socket
+from typing import Optional, Tuple
+
+
+# フック名 -> (モジュール名, クラス名)
+HOOK_REGISTRY = {
+    'implementation_design': ('domain.hooks.implementation_design_hook', 'ImplementationDesignHook'),
+    'session_startup': ('domain.hooks.session_startup_hook', 'SessionStartupHook'),
+}
+
+# デーモン応答待ちのタイムアウト（秒）
+DEFAULT_TIMEOUT = 10.0
+
+# 要求の送信後にデーモンから応答が得られなかった場合の終了コード（ブロックしないエラー）
+DAEMON_ERROR_EXIT_CODE = 1
+
+
+def get_socket_path() -> str:
+    """
+    デーモンのUnixドメインソケットのパスを取得
+
+    環境変数 CLAUDE_HOOK_DAEMON_SOCKET で上書き可能。
+
+    Returns:
+        ソケットファイルのパス
+    """
+    override = os.environ.get('CLAUDE_HOOK_DAEMON_SOCKET')
+    if override:
+        return override
+    return f"/tmp/claude_hook_daemon_{os.getuid()}.sock"
+
+
+def _recv_all(sock: socket.socket) -> bytes:
+    """接続が閉じられるまでのデータを受信"""
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+def request_daemon(hook_name: str, raw_input: str, socket_path: Optional[str] = None,
+                   timeout: float = DEFAULT_TIMEOUT) -> Optional[Tuple[int, str]]:
+    """
+    デーモンにフック実行を依頼
+
+    Args:
+        hook_name: フック名（HOOK_REGISTRYのキー）
+        raw_input: 標準入力から読み取った生のJSON文字列
+        socket_path: ソケットファイルのパス（省略時はデフォルト）
+        timeout: 応答待ちタイムアウト（秒）
+
+    Returns:
+        (終了コード, 出力文字列)。デーモンに接続できない場合None
+        （送信後に応答が得られない場合は DAEMON_ERROR_EXIT_CODE と空の出力）
+    """
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    except OSError:
+        return None
+    with sock:
+        try:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path or get_socket_path()))
+        except OSError:
+            return None
+        # 接続後はデーモンがフックを実行している可能性があるため、失敗してもNoneを返さない
+        try:
+            sock.sendall(hook_name.encode('utf-8') + b'\n' + raw_input.encode('utf-8'))
+            sock.shutdown(socket.SHUT_WR)
+            response = _recv_all(sock)
+        except OSError as e:
+            return _daemon_error(f"no response from hook daemon: {e}")
+
+    header, separator, output = response.partition(b'\n')
+    try:
+        exit_code = int(header) if separator else None
+    except ValueError:
+        exit_code = None
+    if exit_code is None:
+        return _daemon_error("invalid response from hook daemon")
+    return exit_code, output.decode('utf-8')
+
+
+def _daemon_error(message: str) -> Tuple[int, str]:
+    """デーモンの応答が得られなかったことを標準エラー出力に書き、エラーの結果を返す"""
+    sys.stderr.write(f"hook_client: {message}\n")
+    return DAEMON_ERROR_EXIT_CODE, ''
+
+
+def run_in_process(hook_name: str, raw_input: str) -> Tuple[int, str]:
+    """
+    フックを同一プロセス内で実行（デーモン未起動時のフォールバック）
+
+    Args:
+        hook_name: フック名
+        raw_input: 生のJSON文字列
+
+    Returns:
+        (終了コード, 出力文字列)
+    """
+    import io
+    import importlib
+
+    src_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if src_dir not in sys.path:
+        sys.path.insert(0, src_dir)
+
+    module_name, class_name = HOOK_REGISTRY[hook_name]
+    hook_class = getattr(importlib.import_module(module_name), class_name)
+    output = io.StringIO()
+    exit_code = hook_class(debug=False).run(io.StringIO(raw_input), output)
+    return exit_code, output.getvalue()
+
+
+def main(argv=None) -> int:
+    """メインエントリーポイント"""
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 1 or args[0] not in HOOK_REGISTRY:
+        sys.stderr.write(f"usage: hook_client.py {{{'|'.join(HOOK_REGISTRY)}}}\n")
+        return 2
+
+    hook_name = args[0]
+    raw_input = sys.stdin.read()
+
+    result = request_daemon(hook_name, raw_input)
+    if result is None:
+        result = run_in_process(hook_name, raw_input)
+
+    exit_code, output = result
+    sys.stdout.write(output)
+    sys.stdout.flush()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
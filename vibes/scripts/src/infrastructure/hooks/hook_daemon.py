@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""常駐フックデーモン
+
+ImplementationDesignHook / SessionStartupHook のインスタンスを常駐プロセス内で
+保持し、Unixドメインソケット経由で hook_client.py からの要求を処理する。
+インタプリタ起動・モジュールインポート・規約YAMLの解析をツール呼び出し毎に
+行わずに済むため、PreToolUseフックの応答時間を短縮できる。
+
+起動:
+    python3 vibes/scripts/src/infrastructure/hooks/hook_daemon.py
+
+プロトコルは hook_client.py を参照。
+"""
+
+import io
+import os
+import sys
+import logging
+import functools
+import importlib
+import socketserver
+from pathlib import Path
+from typing import Dict, Any, Optional
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from infrastructure.hooks.hook_client import HOOK_REGISTRY, get_socket_path
+from infrastructure.hooks.hook_registry import HookInstance, HookInstanceRegistry
+from shared.utils.hook_logging import configure_hook_logging
+
+
+class HookDaemon:
+    """フックインスタンスを常駐させて要求を処理するデーモン"""
+
+    def __init__(self, socket_path: Optional[Path] = None):
+        """
+        初期化
+
+        Args:
+            socket_path: Unixドメインソケットのパス（省略時はデフォルト）
+        """
+        self.socket_path = Path(socket_path or get_socket_path())
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.registry = HookInstanceRegistry(
+            {hook_name: functools.partial(self._create_hook, hook_name) for hook_name in HOOK_REGISTRY},
+            self.logger
+        )
+        self._server: Optional[socketserver.UnixStreamServer] = None
+
+    def _create_hook(self, hook_name: str) -> Any:
+        """フックインスタンスを生成"""
+        module_name, class_name = HOOK_REGISTRY[hook_name]
+        hook_class = getattr(importlib.import_module(module_name), class_name)
+        return hook_class(debug=False)
+
+    def get_instance(self, hook_name: str) -> HookInstance:
+        """
+        常駐中のフックインスタンスを取得（未生成または設定更新時は生成し直す）
+
+        Args:
+            hook_name: フック名
+
+        Returns:
+            フックインスタンス
+        """
+        return self.registry.get(hook_name)
+
+    def warm_up(self) -> None:
+        """登録済みの全フックを事前に生成"""
+        self.registry.warm_up()
+
+    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        1件の要求を処理
+
+        Args:
+            request: {'hook': フック名, 'input': 生のJSON文字列}
+
+        Returns:
+            {'exit_code': 終了コード, 'output': 出力文字列}
+        """
+        hook_name = request.get('hook')
+        if hook_name not in HOOK_REGISTRY:
+            return {'exit_code': 1, 'output': '', 'error': f'Unknown hook: {hook_name}'}
+
+        instance = self.get_instance(hook_name)
+        output = io.StringIO()
+        # 同一フックインスタンスはリクエストスコープの状態を持つため直列に実行
+        with instance.lock:
+            exit_code = instance.hook.run(io.StringIO(request.get('input', '')), output)
+        return {'exit_code': exit_code, 'output': output.getvalue()}
+
+    def serve_forever(self) -> None:
+        """ソケットを開いて要求の処理を開始"""
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                try:
+                    hook_name = self.rfile.readline().decode('utf-8').strip()
+                    raw_input = self.rfile.read().decode('utf-8')
+                    response = daemon.handle_request({'hook': hook_name, 'input': raw_input})
+                except Exception as e:
+                    daemon.logger.error("Failed to handle hook request: %s", e)
+                    response = {'exit_code': 1, 'output': '', 'error': str(e)}
+                if 'error' in response:
+                    daemon.logger.error("Hook request failed: %s", response['error'])
+                self.wfile.write(f"{response['exit_code']}\n{response['output']}".encode('utf-8'))
+
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+        self.warm_up()
+        old_umask = os.umask(0o177)
+        try:
+            self._server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), Handler)
+        finally:
+            os.umask(old_umask)
+        self._server.daemon_threads = True
+
+        self.logger.info("Hook daemon listening on %s", self.socket_path)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+
+    def shutdown(self) -> None:
+        """要求の処理を停止"""
+        if self._server is not None:
+            self._server.shutdown()
+
+
+def main():
+    """メインエントリーポイント"""
+    # 起動時のエラーもフック共通の出力先に出力（各フックの初期化時に設定を反映）
+    configure_hook_logging()
+
+    daemon = HookDaemon()
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,34 +1,169 @@
 """フック実行エンジン"""
 
+import os
+import sys
+import time
+import shlex
+import signal
+import asyncio
+import contextlib
 import subprocess
-import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
 from domain.services.hook_manager import HookManager
 from domain.hooks.implementation_design_hook import ImplementationDesignHook
+from infrastructure.hooks.hook_registry import HookInstanceRegistry
+from infrastructure.hooks.python_worker_pool import PythonWorkerPool
+from shared.utils import json_codec
+
+
+# フック設定に timeout が無い場合のタイムアウト（秒）
+DEFAULT_HOOK_TIMEOUT = 60
+
+# 判定の優先順位（大きいほど優先。同じ優先度では設定の順で先の結果を採用する）
+DECISION_PRIORITY = {'block': 2, 'warn': 1}
+
+# Claude Code の permissionDecision 形式の判定を block / warn に読み替える
+_DECISION_ALIASES = {'deny': 'block', 'ask': 'warn'}
+
+
+@dataclass
+class ExecutionSettings:
+    """コマンドフックの実行設定"""
+    # 該当する全てのコマンドフックを同時に起動する（Falseで設定順に1つずつ実行）
+    concurrent: bool = True
+    # 全体の期限（秒、直列実行でも適用）。期限を過ぎたフックはプロセスグループごと終了する
+    deadline_seconds: float = 60
+    # 同時に起動する最大数
+    max_workers: int = 8
+    # `python3 <スクリプト>.py` 形式のフックを常駐ワーカーで実行する（Falseで毎回シェルから起動）
+    python_workers: bool = True
+    # 1つのワーカーで実行する最大回数（超えたら起動し直す）
+    worker_max_requests: int = 100
+    # スクリプト毎に待機させておくワーカーの最大数
+    worker_idle: int = 2
+    # これより長く使われていないワーカーは ping で応答を確認してから使う（秒）
+    worker_health_check_seconds: float = 30
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> 'ExecutionSettings':
+        """
+        設定（config.json5 の convention_hooks.hook_execution）から生成
+
+        Args:
+            settings: 設定の辞書（未知のキーは無視）
+
+        Returns:
+            実行設定
+        """
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (settings or {}).items() if k in names})
+
+
+def get_decision(result: Dict[str, Any]) -> str:
+    """
+    フック結果の判定を取得
+
+    Args:
+        result: フック実行結果（decision または hookSpecificOutput.permissionDecision を含む）
+
+    Returns:
+        判定（deny / ask は block / warn に読み替える。無い場合は allow）
+    """
+    decision = result.get('decision')
+    if decision is None:
+        specific = result.get('hookSpecificOutput')
+        if isinstance(specific, dict):
+            decision = specific.get('permissionDecision')
+    decision = str(decision or 'allow')
+    return _DECISION_ALIASES.get(decision, decision)
+
+
+def aggregate_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    複数のフック結果を1つの判定にまとめる
+
+    完了した順ではなく設定の順に評価するため、同時実行しても結果は変わらない。
+    最初の block を採用し、block が無ければ最初の warn、どちらも無ければ allow とする。
+
+    Args:
+        results: フック実行結果のリスト（設定の順）
+
+    Returns:
+        {'decision', 'reason', 'errors'} の辞書（errors は各フックのエラーメッセージ）
+    """
+    chosen: Optional[Dict[str, Any]] = None
+    chosen_priority = 0
+    errors = []
+    for result in results:
+        if result.get('error'):
+            errors.append(result['error'])
+        priority = DECISION_PRIORITY.get(get_decision(result), 0)
+        if priority > chosen_priority:
+            chosen, chosen_priority = result, priority
+
+    if chosen is None:
+        return {'decision': 'allow', 'reason': '', 'errors': errors}
+    return {'decision': get_decision(chosen), 'reason': chosen.get('reason', ''), 'errors': errors}
+
+
+def parse_python_hook(command: str) -> Optional[Tuple[str, str]]:
+    """
+    `python3 <スクリプト>.py` 形式のコマンドを分解
+
+    引数・リダイレクト・パイプなどシェルの機能を含むコマンドは対象外とする。
+
+    Args:
+        command: フックのコマンド
+
+    Returns:
+        (インタプリタ, スクリプトのパス)。対象外の場合はNone
+    """
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if len(argv) != 2 or any(char in command for char in ';|&<>$`'):
+        return None
+    python, script = argv
+    if not os.path.basename(python).startswith('python') or not script.endswith('.py'):
+        return None
+    if not os.path.isfile(script):
+        return None
+    return python, script
 
 
 class HookExecutor:
     """フック実行エンジン"""
 
-    def __init__(self, claude_dir: Optional[Path] = None):
+    def __init__(self, claude_dir: Optional[Path] = None, settings: Optional[ExecutionSettings] = None):
         """
         初期化
         
         Args:
             claude_dir: .claudeディレクトリのパス
+            settings: コマンドフックの実行設定（省略時はデフォルト値）
         """
         self.hook_manager = HookManager(claude_dir)
+        self.settings = settings or ExecutionSettings()
+        self._worker_pool: Optional[PythonWorkerPool] = None
         
-        # 内蔵フックの登録
+        # 内蔵フックの登録（インスタンスは初回実行時に生成し、以降の実行で再利用する）
         self.builtin_hooks = {
             'implementation_design': ImplementationDesignHook
         }
+        self.builtin_registry = HookInstanceRegistry(self.builtin_hooks)
 
     def execute_hook(self, event: str, tool_name: str, tool_input: Dict[str, Any], 
                      session_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        該当するフックを実行
+        該当するフックを実行（execute_hook_async の同期版）
+        
+        実行中のイベントループがあるスレッドから呼ばれた場合は、別スレッドのイベントループで実行する。
         
         Args:
             event: イベント名（PreToolUse, PostToolUse等）
@@ -37,81 +172,66 @@ class HookExecutor:
             session_id: セッションID
             
         Returns:
-            フック実行結果のリスト
+            フック実行結果のリスト（設定の順。内蔵フックの結果は最後）
         """
-        results = []
-        
-        # 設定ファイルからフックを取得
-        hooks_config = self.hook_manager.list_hooks(event)
-        
-        if 'hooks' in hooks_config:
-            event_hooks = hooks_config['hooks'].get(event, [])
-            
-            for matcher_entry in event_hooks:
-                matcher = matcher_entry.get('matcher', '')
-                
-                # マッチャーがツール名と一致するか確認
-                if self._matches_tool(tool_name, matcher):
-                    for hook in matcher_entry.get('hooks', []):
-                        result = self._execute_single_hook(
-                            hook, event, tool_name, tool_input, session_id
-                        )
-                        if result:
-                            results.append(result)
-        
-        # 内蔵フックの実行（実装設計フック等）
-        if event == 'PreToolUse' and (tool_name in ['Edit', 'Write', 'MultiEdit'] or tool_name.startswith('mcp__serena__')):
-            result = self._execute_builtin_hook(
-                'implementation_design', tool_input, session_id
-            )
-            if result:
-                results.append(result)
-        
-        return results
+        coroutine = self.execute_hook_async(event, tool_name, tool_input, session_id)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='hook-loop') as pool:
+            return pool.submit(asyncio.run, coroutine).result()
 
-    def _matches_tool(self, tool_name: str, matcher: str) -> bool:
+    async def execute_hook_async(self, event: str, tool_name: str, tool_input: Dict[str, Any],
+                                 session_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        ツール名がマッチャーパターンに一致するか確認
-        
+        該当するフックを実行（イベントループを止めない）
+
+        コマンドフックは同時実行の場合、最大 max_workers 個ずつ起動する。同時実行・直列実行の
+        どちらでも全体の期限（deadline_seconds）を過ぎたフックは打ち切る。
+        キャンセルされた場合は実行中のフックをプロセスグループごと終了してから CancelledError を送出する。
+
         Args:
+            event: イベント名（PreToolUse, PostToolUse等）
             tool_name: ツール名
-            matcher: マッチャーパターン
-            
+            tool_input: ツールへの入力
+            session_id: セッションID
+
         Returns:
-            一致する場合True
+            フック実行結果のリスト（完了順ではなく設定の順。内蔵フックの結果は最後）
         """
-        if not matcher:  # 空文字列は全てにマッチ
-            return True
+        # 設定ファイル（プロジェクト・ローカル）から該当するフックを取得
+        matched_hooks = self.hook_manager.get_routing_table().route(event, tool_name)
         
-        # パイプ区切りのOR条件
-        if '|' in matcher:
-            patterns = matcher.split('|')
-            return any(self._matches_single_pattern(tool_name, p.strip()) for p in patterns)
+        deadline = time.monotonic() + self.settings.deadline_seconds
+        if self.settings.concurrent and len(matched_hooks) > 1:
+            semaphore = asyncio.Semaphore(max(1, self.settings.max_workers))
+            results = await asyncio.gather(*[
+                self._execute_single_hook(hook, event, tool_name, tool_input, session_id, deadline, semaphore)
+                for hook in matched_hooks
+            ])
+        else:
+            results = []
+            for hook in matched_hooks:
+                results.append(await self._execute_single_hook(hook, event, tool_name, tool_input, session_id,
+                                                               deadline))
+        results = [result for result in results if result]
         
-        return self._matches_single_pattern(tool_name, matcher)
-
-    def _matches_single_pattern(self, tool_name: str, pattern: str) -> bool:
-        """
-        単一パターンとのマッチング
-        
-        Args:
-            tool_name: ツール名
-            pattern: パターン
-            
-        Returns:
-            一致する場合True
-        """
-        # ワイルドカード処理
-        if '*' in pattern:
-            import fnmatch
-            return fnmatch.fnmatch(tool_name, pattern)
+        # 内蔵フックの実行（実装設計フック等。ファイルの読み込みを伴うため別スレッドで実行）
+        if event == 'PreToolUse' and (tool_name in ['Edit', 'Write', 'MultiEdit'] or tool_name.startswith('mcp__serena__')):
+            result = await asyncio.to_thread(
+                self._execute_builtin_hook, 'implementation_design', tool_input, session_id
+            )
+            if result:
+                results.append(result)
         
-        # 完全一致
-        return tool_name == pattern
+        return results
 
-    def _execute_single_hook(self, hook_config: Dict[str, Any], event: str, 
-                            tool_name: str, tool_input: Dict[str, Any], 
-                            session_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    async def _execute_single_hook(self, hook_config: Dict[str, Any], event: str,
+                                   tool_name: str, tool_input: Dict[str, Any],
+                                   session_id: Optional[str] = None,
+                                   deadline: Optional[float] = None,
+                                   semaphore: Optional[asyncio.Semaphore] = None) -> Optional[Dict[str, Any]]:
         """
         単一のフックを実行
         
@@ -121,6 +241,8 @@ class HookExecutor:
             tool_name: ツール名
             tool_input: ツール入力
             session_id: セッションID
+            deadline: 全体の期限（time.monotonic() の値。Noneでフック毎のタイムアウトのみ）
+            semaphore: 同時に起動する数を制限するセマフォ（空きを待つ時間も全体の期限に含む）
             
         Returns:
             フック実行結果
@@ -132,7 +254,7 @@ class HookExecutor:
         if not command:
             return None
         
-        timeout = hook_config.get('timeout', 60)
+        timeout = hook_config.get('timeout', DEFAULT_HOOK_TIMEOUT)
         
         # 入力データを構築
         input_data = {
@@ -144,21 +266,22 @@ class HookExecutor:
         if session_id:
             input_data['session_id'] = session_id
         
+        limited_by_deadline = False
         try:
-            # コマンドを実行
-            result = subprocess.run(
-                command,
-                input=json.dumps(input_data),
-                capture_output=True,
-                text=True,
-                shell=True,
-                timeout=timeout
-            )
+            async with semaphore or contextlib.nullcontext():
+                # 全体の期限が先に来る場合は残り時間で打ち切る
+                if deadline is not None:
+                    remaining = max(0.0, deadline - time.monotonic())
+                    if remaining < timeout:
+                        timeout, limited_by_deadline = remaining, True
+
+                # コマンドを実行
+                stdout = await self._run_hook_command(command, json_codec.dumps(input_data), timeout)
             
-            if result.stdout:
+            if stdout:
                 try:
-                    return json.loads(result.stdout)
-                except json.JSONDecodeError:
+                    return json_codec.loads(stdout)
+                except json_codec.JSONDecodeError:
                     return {
                         'decision': 'allow',
                         'reason': '',
@@ -168,10 +291,14 @@ class HookExecutor:
             return {'decision': 'allow', 'reason': ''}
             
         except subprocess.TimeoutExpired:
+            if limited_by_deadline:
+                error = f'Hook exceeded the overall deadline of {self.settings.deadline_seconds} seconds'
+            else:
+                error = f'Hook timed out after {timeout} seconds'
             return {
                 'decision': 'allow',
                 'reason': '',
-                'error': f'Hook timed out after {timeout} seconds'
+                'error': error
             }
         except Exception as e:
             return {
@@ -180,6 +307,128 @@ class HookExecutor:
                 'error': str(e)
             }
 
+    @property
+    def worker_pool(self) -> PythonWorkerPool:
+        """Pythonフックのワーカープール（初回参照時に作成）"""
+        if self._worker_pool is None:
+            self._worker_pool = PythonWorkerPool(
+                max_requests=self.settings.worker_max_requests,
+                idle_workers=self.settings.worker_idle,
+                health_check_seconds=self.settings.worker_health_check_seconds
+            )
+        return self._worker_pool
+
+    def start_python_workers(self, event: Optional[str] = None) -> int:
+        """
+        登録済みのPythonフックのワーカーを事前に起動
+
+        フックを繰り返し実行する常駐プロセスから呼び出すと、初回の呼び出しも起動済みのワーカーで実行できる。
+
+        Args:
+            event: 対象のイベント名（省略時は全イベント）
+
+        Returns:
+            ワーカーを起動したスクリプトの数
+        """
+        if not self.settings.python_workers:
+            return 0
+        targets = set()
+        for hook in self.hook_manager.get_routing_table().hooks(event):
+            parsed = parse_python_hook(hook.get('command') or '') if hook.get('type') == 'command' else None
+            if parsed:
+                targets.add(parsed)
+        for python, script in targets:
+            self.worker_pool.prestart(python, script)
+        return len(targets)
+
+    def reload_builtin_hooks(self, hook_name: Optional[str] = None) -> None:
+        """
+        内蔵フックのインスタンスを破棄し、次の実行時に設定・規約ルールを読み込み直す
+
+        監視対象ファイル（規約YAML・config.json5）の更新は自動で検知するため、
+        更新を即座に反映したい場合や、監視対象外の状態をリセットしたい場合に使う。
+
+        Args:
+            hook_name: フック名（省略時は全て）
+        """
+        self.builtin_registry.reload(hook_name)
+
+    def close(self) -> None:
+        """待機中のワーカーを終了し、内蔵フックのインスタンスを破棄"""
+        if self._worker_pool is not None:
+            self._worker_pool.close()
+        self.builtin_registry.reload()
+
+    async def _run_hook_command(self, command: str, input_text: str, timeout: float) -> str:
+        """
+        フックのコマンドを実行（Pythonフックはワーカーで実行し、それ以外はシェルから起動）
+
+        Args:
+            command: フックのコマンド
+            input_text: 標準入力に渡すテキスト
+            timeout: タイムアウト（秒）
+
+        Returns:
+            標準出力
+
+        Raises:
+            subprocess.TimeoutExpired: タイムアウトした場合
+        """
+        parsed = parse_python_hook(command) if self.settings.python_workers else None
+        if parsed:
+            # ワーカーとの通信はブロッキングのため別スレッドで行う
+            # （スレッドはキャンセルできないため、キャンセル時はワーカーを終了して実行を打ち切る）
+            python, script = parsed
+            worker = await asyncio.to_thread(self.worker_pool.acquire, python, script)
+            try:
+                return await asyncio.to_thread(self.worker_pool.execute, worker, python, script, input_text, timeout)
+            except asyncio.CancelledError:
+                worker.kill()
+                raise
+        return await self._run_command(command, input_text, timeout)
+
+    @staticmethod
+    async def _run_command(command: str, input_text: str, timeout: float) -> str:
+        """
+        シェルコマンドを新しいプロセスグループで実行
+
+        タイムアウト・キャンセル時はシェルだけでなく、シェルが起動した子プロセスも
+        プロセスグループごと終了する。
+
+        Args:
+            command: シェルコマンド
+            input_text: 標準入力に渡すテキスト
+            timeout: タイムアウト（秒）
+
+        Returns:
+            標準出力
+
+        Raises:
+            subprocess.TimeoutExpired: タイムアウトした場合
+        """
+        process = await asyncio.create_subprocess_exec(
+            '/bin/sh', '-c', command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(input_text.encode('utf-8')), timeout)
+        except BaseException as e:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            try:
+                await asyncio.wait_for(process.wait(), 1)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            if isinstance(e, asyncio.TimeoutError):
+                raise subprocess.TimeoutExpired(command, timeout) from None
+            raise
+        return stdout.decode('utf-8', errors='replace')
+
     def _execute_builtin_hook(self, hook_name: str, tool_input: Dict[str, Any], 
                              session_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
@@ -193,38 +442,14 @@ class HookExecutor:
         Returns:
             フック実行結果
         """
-        hook_class = self.builtin_hooks.get(hook_name)
-        if not hook_class:
+        if hook_name not in self.builtin_registry.factories:
             return None
         
         try:
-            # フックインスタンスを作成
-            hook = hook_class()
-            
-            # 入力データを構築
-            input_data = {
-                'tool_input': tool_input
-            }
-            
-            if session_id:
-                input_data['session_id'] = session_id
-                
-                # 既に処理済みの場合はスキップ
-                if hook.is_session_processed(session_id):
-                    return None
-            
-            # 処理対象かチェック
-            if not hook.should_process(input_data):
-                return None
-            
-            # フック処理を実行
-            result = hook.process(input_data)
-            
-            # セッションIDがある場合は処理済みとしてマーク
-            if session_id and result.get('decision') in ['block', 'warn']:
-                hook.mark_session_processed(session_id)
-            
-            return result
+            # 保持中のフックインスタンスを取得（同じインスタンスでの実行は直列）
+            instance = self.builtin_registry.get(hook_name)
+            with instance.lock:
+                return self._run_builtin_hook(instance.hook, tool_input, session_id)
             
         except Exception as e:
             return {
@@ -233,6 +458,45 @@ class HookExecutor:
                 'error': f'Builtin hook error: {str(e)}'
             }
 
+    @staticmethod
+    def _run_builtin_hook(hook: Any, tool_input: Dict[str, Any],
+                          session_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        内蔵フックのインスタンスで判定を実行
+
+        Args:
+            hook: フックインスタンス
+            tool_input: ツール入力
+            session_id: セッションID
+
+        Returns:
+            フック実行結果
+        """
+        # 入力データを構築
+        input_data = {
+            'tool_input': tool_input
+        }
+        
+        if session_id:
+            input_data['session_id'] = session_id
+            
+            # 既に処理済みの場合はスキップ
+            if hook.is_session_processed(session_id):
+                return None
+        
+        # 処理対象かチェック
+        if not hook.should_process(input_data):
+            return None
+        
+        # フック処理を実行
+        result = hook.process(input_data)
+        
+        # セッションIDがある場合は処理済みとしてマーク
+        if session_id and result.get('decision') in ['block', 'warn']:
+            hook.mark_session_processed(session_id)
+        
+        return result
+
     def register_hook_via_cli(self, event: str, matcher: str, command: str, 
                              timeout: Optional[int] = None, local: bool = False) -> Dict[str, Any]:
         """
@@ -0,0 +1,125 @@
+"""内蔵フックのインスタンスのレジストリ
+
+フックの生成（設定の読み込み・規約YAMLの解析・ロガーの設定）は呼び出し毎に行うと重いため、
+生成したインスタンスをフック名毎に保持して再利用する。HookDaemon と HookExecutor で共有する。
+
+インスタンスは次の場合に生成し直す:
+- フックが get_watched_files() で返す設定・ルールファイルが更新された場合（自動）
+- reload() が呼ばれた場合（設定を変更した直後など、更新を即座に反映したい場合）
+"""
+
+import os
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class HookInstance:
+    """保持中のフックインスタンスと監視ファイルの状態"""
+
+    def __init__(self, hook: Any):
+        """
+        初期化
+
+        Args:
+            hook: フックインスタンス
+        """
+        self.hook = hook
+        # フックはリクエストスコープの状態を持つため、同じインスタンスでの実行は直列にする
+        self.lock = threading.Lock()
+        self.watched = self._snapshot(hook)
+
+    @staticmethod
+    def _snapshot(hook: Any) -> Dict[str, Optional[Tuple[int, int]]]:
+        """監視対象ファイルの (mtime_ns, size) を記録"""
+        snapshot = {}
+        for path in hook.get_watched_files():
+            try:
+                stat = os.stat(path)
+                snapshot[str(path)] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                snapshot[str(path)] = None
+        return snapshot
+
+    def is_stale(self) -> bool:
+        """監視対象ファイルが更新されていればTrue"""
+        return self._snapshot(self.hook) != self.watched
+
+
+class HookInstanceRegistry:
+    """フック名 -> 保持中のインスタンス（スレッドセーフ）"""
+
+    def __init__(self, factories: Dict[str, Callable[[], Any]], logger: Optional[logging.Logger] = None):
+        """
+        初期化
+
+        Args:
+            factories: フック名 -> インスタンスを生成する関数（クラスも可）
+            logger: ロガー
+        """
+        self.factories = dict(factories)
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self._instances: Dict[str, HookInstance] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def names(self) -> List[str]:
+        """登録されているフック名"""
+        return list(self.factories)
+
+    def get(self, hook_name: str) -> HookInstance:
+        """
+        保持中のインスタンスを取得（未生成または監視ファイルの更新時は生成し直す）
+
+        Args:
+            hook_name: フック名
+
+        Returns:
+            HookInstance
+
+        Raises:
+            KeyError: 登録されていないフック名の場合
+        """
+        factory = self.factories[hook_name]
+        with self._lock:
+            instance = self._instances.get(hook_name)
+            if instance is None or instance.is_stale():
+                if instance is not None:
+                    self.logger.info("Watched files changed, recreating hook: %s", hook_name)
+                instance = HookInstance(factory())
+                self._instances[hook_name] = instance
+            return instance
+
+    def reload(self, hook_name: Optional[str] = None) -> None:
+        """
+        保持中のインスタンスを破棄（次の get() で生成し直す）
+
+        実行中の要求は破棄前のインスタンスで最後まで処理される。
+
+        Args:
+            hook_name: フック名（省略時は全て）
+        """
+        with self._lock:
+            if hook_name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(hook_name, None)
+        self.logger.info("Reloading hook instances: %s", hook_name or 'all')
+
+    def warm_up(self) -> None:
+        """登録済みの全フックを事前に生成"""
+        for hook_name in self.factories:
+            self.get(hook_name)
+
+    def is_loaded(self, hook_name: str) -> bool:
+        """
+        インスタンスを保持しているか
+
+        Args:
+            hook_name: フック名
+
+        Returns:
+            保持している場合True
+        """
+        with self._lock:
+            return hook_name in self._instances
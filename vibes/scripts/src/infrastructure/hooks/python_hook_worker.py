@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Pythonコマンドフックの常駐ワーカー
+
+HookExecutor のワーカープールから起動され、`python3 <スクリプト>` 形式で登録された
+フックスクリプトを同一プロセス内で繰り返し実行する。インタプリタの起動とシェルを
+呼び出し毎に行わず、スクリプトがimportするモジュールも2回目以降は読み込み済みになる。
+
+スクリプトは runpy で `__main__` として実行し、標準入力・標準出力・sys.argv を
+要求毎に差し替え、sys.path は実行後に元に戻す。sys.exit() の終了コードは応答に含める。
+起動時のコストを抑えるため、標準ライブラリ以外はインポートしない。
+
+プロトコル（標準入出力、1行1JSON、UTF-8）:
+    要求: {"id": 1, "script": "/path/to/hook.py", "input": "<標準入力に渡すテキスト>"}
+    応答: {"id": 1, "stdout": "<標準出力>", "exit_code": 0, "error": null}
+    ヘルスチェック: {"id": 2, "op": "ping"} -> {"id": 2, "ok": true}
+"""
+
+import io
+import os
+import sys
+import json
+import runpy
+import traceback
+from typing import Any, Dict, IO
+
+
+def run_script(script: str, input_text: str) -> Dict[str, Any]:
+    """
+    フックスクリプトを `__main__` として実行
+
+    Args:
+        script: スクリプトのパス
+        input_text: 標準入力に渡すテキスト
+
+    Returns:
+        {'stdout', 'exit_code', 'error'} の辞書（error は例外で終了した場合のトレースバック）
+    """
+    saved = sys.stdin, sys.stdout, sys.argv, sys.path[:]
+    stdin = io.TextIOWrapper(io.BytesIO(input_text.encode('utf-8')), encoding='utf-8')
+    stdout = io.TextIOWrapper(io.BytesIO(), encoding='utf-8', write_through=True)
+    sys.stdin, sys.stdout, sys.argv = stdin, stdout, [script]
+    # `python3 <スクリプト>` と同じくスクリプトのディレクトリを先頭に置く
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+    exit_code, error = 0, None
+    try:
+        runpy.run_path(script, run_name='__main__')
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            exit_code = e.code or 0
+        else:
+            # sys.exit("メッセージ") はインタプリタと同じく標準エラー出力に書いて終了コード1
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException:
+        exit_code, error = 1, traceback.format_exc()
+    finally:
+        sys.stdin, sys.stdout, sys.argv, sys.path[:] = saved
+    return {
+        'stdout': stdout.buffer.getvalue().decode('utf-8', errors='replace'),
+        'exit_code': exit_code,
+        'error': error,
+    }
+
+
+def serve(requests: IO[str], responses: IO[str]) -> None:
+    """
+    要求が閉じられるまで1行ずつ処理
+
+    Args:
+        requests: 要求を読み込むストリーム
+        responses: 応答を書き込むストリーム
+    """
+    for line in requests:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        if request.get('op') == 'ping':
+            response = {'ok': True}
+        else:
+            response = run_script(request['script'], request.get('input', ''))
+        response['id'] = request.get('id')
+        responses.write(json.dumps(response, ensure_ascii=False) + '\n')
+        responses.flush()
+
+
+def main() -> None:
+    """標準入出力でプロトコルを処理"""
+    # 要求・応答用に標準入出力を複製し、フックやフックが起動した子プロセスが fd 0 / fd 1 を
+    # 直接読み書きしてもプロトコルの行を消費・混入しないよう、fd 0 は /dev/null、fd 1 は標準エラー出力へ向ける
+    requests = os.fdopen(os.dup(0), 'r', encoding='utf-8')
+    responses = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    os.dup2(2, 1)
+    serve(requests, responses)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,310 @@
+"""Pythonコマンドフックのワーカープール
+
+`python3 <スクリプト>.py` 形式のコマンドフック（register_hook_via_cli が登録する形式）を、
+起動済みのワーカープロセス（python_hook_worker.py）にパイプ経由で実行させる。
+2回目以降の呼び出しはインタプリタとシェルの起動が不要になり、1往復の通信で済む。
+
+ワーカーはスクリプト（とインタプリタ）毎に分けて保持し、別のフックとモジュールの状態を共有しない。
+- 終了しているワーカーは破棄して新しく起動する（自動再起動）
+- 一定時間使われていないワーカーは ping で応答を確認してから使う（ヘルスチェック）
+- max_requests 回実行したワーカーは終了して次回起動し直す（リサイクル）
+- タイムアウトしたワーカーはプロセスグループごと終了する
+- 実行中のワーカーは別スレッドから kill() で打ち切れる（HookExecutor のキャンセル時）
+
+実行中にワーカーが終了した場合は、フックの副作用が重複しないよう再実行せずエラーとする。
+"""
+
+import os
+import sys
+import time
+import select
+import signal
+import threading
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from shared.utils import json_codec
+
+
+WORKER_SCRIPT = Path(__file__).with_name('python_hook_worker.py')
+
+# ヘルスチェックの応答待ち（秒）
+PING_TIMEOUT = 2.0
+
+
+class WorkerError(RuntimeError):
+    """ワーカーとの通信に失敗した（ワーカーの終了・不正な応答）"""
+
+
+class PythonWorker:
+    """ワーカープロセス1つ（同時に1要求のみ処理する）"""
+
+    def __init__(self, python: str = 'python3'):
+        """
+        ワーカーを起動
+
+        Args:
+            python: ワーカーを実行するインタプリタ
+        """
+        self.process = subprocess.Popen(
+            [python, str(WORKER_SCRIPT)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        self.requests = 0
+        self.last_used = time.monotonic()
+        self._next_id = 0
+        self._buffer = b''
+        # 実行中の要求の読み書きと、別スレッドからの kill() によるパイプのクローズを排他にする
+        self._io_lock = threading.Lock()
+
+    @property
+    def pid(self) -> int:
+        """ワーカーのプロセスID"""
+        return self.process.pid
+
+    def is_alive(self) -> bool:
+        """ワーカーが実行中か"""
+        return self.process.poll() is None
+
+    def call(self, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """
+        要求を送信し、応答を待つ
+
+        Args:
+            request: 要求（id は自動で付与）
+            timeout: 応答待ちのタイムアウト（秒）
+
+        Returns:
+            応答
+
+        Raises:
+            subprocess.TimeoutExpired: タイムアウトした場合
+            WorkerError: ワーカーが終了した・応答が不正な場合
+        """
+        with self._io_lock:
+            self._next_id += 1
+            request_id = self._next_id
+            deadline = time.monotonic() + timeout
+            try:
+                self.process.stdin.write(json_codec.dumps_bytes({**request, 'id': request_id}) + b'\n')
+                self.process.stdin.flush()
+            except (BrokenPipeError, ValueError) as e:
+                raise WorkerError(f'Worker {self.pid} is not accepting requests: {e}') from e
+
+            line = self._read_line(deadline, timeout)
+        self.last_used = time.monotonic()
+        try:
+            response = json_codec.loads(line)
+        except json_codec.JSONDecodeError as e:
+            raise WorkerError(f'Invalid response from worker {self.pid}') from e
+        if not isinstance(response, dict) or response.get('id') != request_id:
+            raise WorkerError(f'Unexpected response from worker {self.pid}')
+        return response
+
+    def ping(self, timeout: float = PING_TIMEOUT) -> bool:
+        """
+        ヘルスチェック
+
+        Args:
+            timeout: 応答待ちのタイムアウト（秒）
+
+        Returns:
+            応答があればTrue
+        """
+        try:
+            return self.call({'op': 'ping'}, timeout).get('ok') is True
+        except (subprocess.TimeoutExpired, WorkerError):
+            return False
+
+    def _read_line(self, deadline: float, timeout: float) -> bytes:
+        """期限までに応答1行を読み込む"""
+        fd = self.process.stdout.fileno()
+        while b'\n' not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise subprocess.TimeoutExpired(str(WORKER_SCRIPT), timeout)
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise WorkerError(f'Worker {self.pid} exited')
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b'\n', 1)
+        return line
+
+    def close(self) -> None:
+        """要求の送信を終えてワーカーを終了させる（応答しない場合は強制終了）"""
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.kill()
+            return
+        self.process.stdout.close()
+
+    def kill(self) -> None:
+        """
+        ワーカーをプロセスグループごと強制終了
+
+        実行中の要求を別スレッドから打ち切る場合にも使える（実行中の call() は WorkerError になる）。
+        """
+        if self.process.returncode is None:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+        # 実行中の call() は終了したワーカーのパイプの EOF で戻るため、それを待ってから閉じる
+        with self._io_lock:
+            for stream in (self.process.stdin, self.process.stdout):
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+        self.process.wait()
+
+
+class PythonWorkerPool:
+    """スクリプト毎のワーカーのプール（スレッドセーフ）"""
+
+    def __init__(self, max_requests: int = 100, idle_workers: int = 2,
+                 health_check_seconds: float = 30.0):
+        """
+        初期化
+
+        Args:
+            max_requests: 1つのワーカーで実行する最大回数（超えたら起動し直す）
+            idle_workers: スクリプト毎に待機させておく最大数（同時実行で足りない分は追加で起動する）
+            health_check_seconds: これより長く使われていないワーカーは ping で確認してから使う
+        """
+        self.max_requests = max_requests
+        self.idle_workers = idle_workers
+        self.health_check_seconds = health_check_seconds
+        self._idle: Dict[Tuple[str, str], List[PythonWorker]] = {}
+        self._lock = threading.Lock()
+
+    def run(self, python: str, script: str, input_text: str, timeout: float) -> str:
+        """
+        スクリプトをワーカーで実行
+
+        Args:
+            python: インタプリタ
+            script: スクリプトのパス
+            input_text: 標準入力に渡すテキスト
+            timeout: タイムアウト（秒）
+
+        Returns:
+            標準出力
+
+        Raises:
+            subprocess.TimeoutExpired: タイムアウトした場合（ワーカーは終了する）
+            WorkerError: 実行中にワーカーが終了した場合
+        """
+        return self.execute(self.acquire(python, script), python, script, input_text, timeout)
+
+    def acquire(self, python: str, script: str) -> PythonWorker:
+        """
+        待機中の正常なワーカーを取り出す（無ければ起動する）
+
+        取り出したワーカーは execute() で実行してプールに戻す。実行中に別スレッドから
+        kill() すると、実行を打ち切ってワーカーを破棄できる。
+
+        Args:
+            python: インタプリタ
+            script: スクリプトのパス
+
+        Returns:
+            ワーカー
+        """
+        key = (python, script)
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                worker = idle.pop() if idle else None
+            if worker is None:
+                return PythonWorker(python)
+            if not worker.is_alive():
+                worker.kill()
+                continue
+            if time.monotonic() - worker.last_used >= self.health_check_seconds and not worker.ping():
+                worker.kill()
+                continue
+            return worker
+
+    def execute(self, worker: PythonWorker, python: str, script: str, input_text: str, timeout: float) -> str:
+        """
+        acquire() で取り出したワーカーでスクリプトを実行し、ワーカーをプールに戻す
+
+        Args:
+            worker: ワーカー
+            python: インタプリタ
+            script: スクリプトのパス
+            input_text: 標準入力に渡すテキスト
+            timeout: タイムアウト（秒）
+
+        Returns:
+            標準出力
+
+        Raises:
+            subprocess.TimeoutExpired: タイムアウトした場合（ワーカーは終了する）
+            WorkerError: 実行中にワーカーが終了した場合
+        """
+        try:
+            response = worker.call({'script': script, 'input': input_text}, timeout)
+        except BaseException:
+            worker.kill()
+            raise
+        worker.requests += 1
+        self._release((python, script), worker)
+        return response.get('stdout') or ''
+
+    def prestart(self, python: str, script: str) -> None:
+        """
+        待機数の上限までワーカーを事前に起動
+
+        Args:
+            python: インタプリタ
+            script: スクリプトのパス
+        """
+        key = (python, script)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            while len(idle) < self.idle_workers:
+                idle.append(PythonWorker(python))
+
+    def _release(self, key: Tuple[str, str], worker: PythonWorker) -> None:
+        """ワーカーを待機中に戻す（実行回数の上限・待機数の上限を超える場合は終了）"""
+        if worker.requests < self.max_requests:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.idle_workers:
+                    idle.append(worker)
+                    return
+        worker.close()
+
+    def idle_count(self, python: str, script: str) -> int:
+        """
+        待機中のワーカー数
+
+        Args:
+            python: インタプリタ
+            script: スクリプトのパス
+
+        Returns:
+            ワーカー数
+        """
+        with self._lock:
+            return len(self._idle.get((python, script), []))
+
+    def close(self) -> None:
+        """待機中の全ワーカーを終了"""
+        with self._lock:
+            workers = [worker for idle in self._idle.values() for worker in idle]
+            self._idle.clear()
+        for worker in workers:
+            worker.close()
@@ -0,0 +1,6 @@
+"""フック処理済みマーカーの保存パッケージ"""
+
+from .marker_store import MarkerStore, MarkerKey
+from .retention import RetentionService, RetentionPolicy, RetentionResult
+
+__all__ = ['MarkerStore', 'MarkerKey', 'RetentionService', 'RetentionPolicy', 'RetentionResult']
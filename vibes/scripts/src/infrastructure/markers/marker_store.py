@@ -0,0 +1,694 @@
+"""SQLiteによるフック処理済みマーカーの保存
+
+従来は /tmp 直下にマーカー毎のファイル（claude_hook_*_session_*, claude_cmd_*,
+claude_rule_*, 期限切れ時は *.expired_* へリネーム）を作成していたが、
+1つのWALモードのSQLiteデータベースにまとめる。
+
+- markers: (hook, session_id, kind, key) を主キーとする現在のマーカー
+- marker_history: 期限切れになったマーカーの履歴
+- marker_counters: マーカー毎の期限切れ回数（履歴を数えずに参照するためのカウンタ）
+- transcript_usage: transcript毎の最後のusageと累積トークン数（同じtool呼び出しで起動する複数のフックが
+  transcriptを1回だけ読むための共有キャッシュ。パス・inode・サイズが一致する場合のみ使う）
+- meta: スキーマバージョンや旧形式ファイルの移行状況
+
+主キー・インデックスで検索するため、実行済みセッション数によらず
+検索コストは O(log n) に保たれる。
+"""
+
+import re
+import sys
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, NamedTuple, List, Tuple
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from shared.utils import json_codec
+
+
+DEFAULT_DB_PATH = Path("/tmp/claude_hook_markers.db")
+
+# 旧形式マーカーファイルの置き場所
+DEFAULT_LEGACY_DIR = Path("/tmp")
+
+SCHEMA_VERSION = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS markers (
+    hook TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    tokens INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (hook, session_id, kind, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS marker_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    hook TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    tokens INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL,
+    expired_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_marker_history_marker
+    ON marker_history (hook, session_id, kind, key);
+
+CREATE INDEX IF NOT EXISTS idx_marker_history_expired_at
+    ON marker_history (expired_at);
+
+CREATE TABLE IF NOT EXISTS marker_counters (
+    hook TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    expired_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (hook, session_id, kind, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS transcript_usage (
+    transcript_path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    updated_at TEXT NOT NULL,
+    usage TEXT NOT NULL,
+    cumulative_tokens INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_INCREMENT_COUNTER = """
+INSERT INTO marker_counters (hook, session_id, kind, key, expired_count)
+VALUES (?, ?, ?, ?, 1)
+ON CONFLICT (hook, session_id, kind, key) DO UPDATE SET expired_count = expired_count + 1
+"""
+
+_EXPIRED_SUFFIX = r'(?:\.expired_(?P<expired>\d{8}_\d{6}))?'
+
+# 旧形式のマーカーファイル名 -> (フック名, 種別, キー)
+# フック名・キーが None の場合はファイル名中の名前付きグループを使用する
+LEGACY_FILE_PATTERNS: List[Tuple[re.Pattern, Optional[str], str]] = [
+    (re.compile(r'^claude_hook_(?P<hook>[A-Za-z0-9]+)_session_(?P<session>.+?)' + _EXPIRED_SUFFIX + '$'),
+     None, 'session'),
+    (re.compile(r'^claude_rule_(?P<hook>[A-Za-z0-9]+)_(?P<session>.+)_(?P<key>[0-9a-f]{8})' + _EXPIRED_SUFFIX + '$'),
+     None, 'rule'),
+    (re.compile(r'^claude_cmd_(?P<session>.+)_(?P<key>[0-9a-f]{8})' + _EXPIRED_SUFFIX + '$'),
+     '', 'command'),
+    (re.compile(r'^claude_session_startup_(?P<session>.+?)' + _EXPIRED_SUFFIX + '$'),
+     'SessionStartupHook', 'startup'),
+]
+
+
+class MarkerKey(NamedTuple):
+    """マーカーの識別子"""
+    hook: str
+    session_id: str
+    kind: str
+    key: str = ''
+
+
+class MarkerStore:
+    """フック処理済みマーカーのSQLiteストア"""
+
+    def __init__(self, db_path: Optional[Path] = None, legacy_dir: Optional[Path] = DEFAULT_LEGACY_DIR,
+                 logger: Optional[logging.Logger] = None):
+        """
+        初期化（接続は初回アクセス時に行う）
+
+        Args:
+            db_path: データベースファイルのパス（デフォルト: /tmp/claude_hook_markers.db）
+            legacy_dir: 旧形式マーカーファイルの移行元ディレクトリ（Noneで移行しない）
+            logger: ロガー
+        """
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self.legacy_dir = Path(legacy_dir) if legacy_dir else None
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """データベース接続（初回はスキーマ作成と旧形式ファイルの移行を行う）"""
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    self._conn = self._connect()
+        return self._conn
+
+    def _connect(self) -> sqlite3.Connection:
+        """データベースに接続してスキーマを準備"""
+        conn = sqlite3.connect(str(self.db_path), timeout=5.0, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        self._upgrade_schema(conn)
+        if self.legacy_dir is not None:
+            self._migrate_legacy_files(conn)
+        return conn
+
+    def _upgrade_schema(self, conn: sqlite3.Connection) -> None:
+        """既存データベースのスキーマバージョンを更新"""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE name = 'schema_version'").fetchone()
+            version = int(row[0]) if row else None
+
+            if version is not None and version < 2:
+                # v1 -> v2: 期限切れ回数カウンタを履歴から作成
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO marker_counters (hook, session_id, kind, key, expired_count)
+                    SELECT hook, session_id, kind, key, COUNT(*) FROM marker_history
+                    GROUP BY hook, session_id, kind, key
+                    """
+                )
+
+            if version is not None and version < 4:
+                # v3 -> v4: usageキャッシュに累積トークン数を追加（キャッシュのため既存の行は破棄）
+                columns = [row[1] for row in conn.execute("PRAGMA table_info(transcript_usage)")]
+                if 'cumulative_tokens' not in columns:
+                    conn.execute("ALTER TABLE transcript_usage "
+                                 "ADD COLUMN cumulative_tokens INTEGER NOT NULL DEFAULT 0")
+                conn.execute("DELETE FROM transcript_usage")
+
+            if version != SCHEMA_VERSION:
+                conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('schema_version', ?)",
+                             (str(SCHEMA_VERSION),))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @contextmanager
+    def _transaction(self):
+        """書き込みトランザクション（BEGIN IMMEDIATE）"""
+        with self._lock:
+            conn = self.connection
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """接続を閉じる"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get(self, marker: MarkerKey) -> Optional[Dict[str, Any]]:
+        """
+        マーカーデータを取得
+
+        Args:
+            marker: マーカーの識別子
+
+        Returns:
+            マーカーデータ（存在しない場合None）
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT data FROM markers WHERE hook = ? AND session_id = ? AND kind = ? AND key = ?",
+                tuple(marker)
+            ).fetchone()
+        if row is None:
+            return None
+        return json_codec.loads(row[0])
+
+    def exists(self, marker: MarkerKey) -> bool:
+        """
+        マーカーが存在するか確認
+
+        Args:
+            marker: マーカーの識別子
+
+        Returns:
+            存在する場合True
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM markers WHERE hook = ? AND session_id = ? AND kind = ? AND key = ?",
+                tuple(marker)
+            ).fetchone()
+        return row is not None
+
+    def put(self, marker: MarkerKey, data: Dict[str, Any]) -> None:
+        """
+        マーカーを作成または更新
+
+        Args:
+            marker: マーカーの識別子
+            data: マーカーデータ（'tokens' と 'timestamp' を含む）
+        """
+        with self._lock:
+            self.connection.execute(
+                """
+                INSERT INTO markers (hook, session_id, kind, key, tokens, updated_at, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (hook, session_id, kind, key) DO UPDATE SET
+                    tokens = excluded.tokens,
+                    updated_at = excluded.updated_at,
+                    data = excluded.data
+                """,
+                (*marker, int(data.get('tokens') or 0),
+                 data.get('timestamp') or datetime.now().isoformat(),
+                 json_codec.dumps_compact(data))
+            )
+
+    def expire(self, marker: MarkerKey) -> bool:
+        """
+        マーカーを期限切れとして履歴に移動
+
+        Args:
+            marker: マーカーの識別子
+
+        Returns:
+            移動した場合True（マーカーが存在しない場合False）
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO marker_history
+                    (hook, session_id, kind, key, tokens, updated_at, expired_at, data)
+                SELECT hook, session_id, kind, key, tokens, updated_at, ?, data
+                FROM markers WHERE hook = ? AND session_id = ? AND kind = ? AND key = ?
+                """,
+                (datetime.now().isoformat(), *marker)
+            )
+            moved = cursor.rowcount > 0
+            if moved:
+                conn.execute(
+                    "DELETE FROM markers WHERE hook = ? AND session_id = ? AND kind = ? AND key = ?",
+                    tuple(marker)
+                )
+                conn.execute(_INCREMENT_COUNTER, tuple(marker))
+        return moved
+
+    def delete(self, marker: MarkerKey) -> None:
+        """
+        マーカーと履歴・期限切れ回数を削除
+
+        Args:
+            marker: マーカーの識別子
+        """
+        with self._transaction() as conn:
+            for table in ('markers', 'marker_history', 'marker_counters'):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE hook = ? AND session_id = ? AND kind = ? AND key = ?",
+                    tuple(marker)
+                )
+
+    def count_history(self, marker: MarkerKey) -> int:
+        """
+        期限切れ履歴の件数を取得
+
+        Args:
+            marker: マーカーの識別子
+
+        Returns:
+            履歴の件数
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT COUNT(*) FROM marker_history WHERE hook = ? AND session_id = ? AND kind = ? AND key = ?",
+                tuple(marker)
+            ).fetchone()
+        return row[0]
+
+    def get_expired_count(self, marker: MarkerKey) -> int:
+        """
+        期限切れになった回数を取得（履歴の件数を数えずカウンタを参照）
+
+        Args:
+            marker: マーカーの識別子
+
+        Returns:
+            期限切れ回数
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT expired_count FROM marker_counters "
+                "WHERE hook = ? AND session_id = ? AND kind = ? AND key = ?",
+                tuple(marker)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def fetch_history(self, expired_before: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        期限切れ履歴を古い順に取得（保持期間の整理用）
+
+        Args:
+            expired_before: この日時（ISO形式）より前に期限切れになったもののみ（Noneで全件対象）
+            limit: 最大件数
+
+        Returns:
+            履歴行の辞書リスト（'id' を含む）
+        """
+        columns = ('id', 'hook', 'session_id', 'kind', 'key', 'tokens', 'updated_at', 'expired_at', 'data')
+        sql = f"SELECT {', '.join(columns)} FROM marker_history"
+        params: Tuple = ()
+        if expired_before is not None:
+            sql += " WHERE expired_at < ?"
+            params = (expired_before,)
+        sql += " ORDER BY id LIMIT ?"
+        with self._lock:
+            rows = self.connection.execute(sql, (*params, limit)).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def count_all_history(self, expired_before: Optional[str] = None) -> int:
+        """
+        期限切れ履歴の総件数を取得
+
+        Args:
+            expired_before: この日時（ISO形式）より前に期限切れになったもののみ数える
+
+        Returns:
+            履歴の件数
+        """
+        sql = "SELECT COUNT(*) FROM marker_history"
+        params: Tuple = ()
+        if expired_before is not None:
+            sql += " WHERE expired_at < ?"
+            params = (expired_before,)
+        with self._lock:
+            return self.connection.execute(sql, params).fetchone()[0]
+
+    def delete_history(self, ids: List[int]) -> int:
+        """
+        期限切れ履歴を削除
+
+        Args:
+            ids: 削除する履歴のIDリスト
+
+        Returns:
+            削除件数
+        """
+        if not ids:
+            return 0
+        with self._transaction() as conn:
+            cursor = conn.executemany("DELETE FROM marker_history WHERE id = ?", [(i,) for i in ids])
+        return cursor.rowcount
+
+    def delete_stale_markers(self, updated_before: str, limit: Optional[int] = None,
+                             dry_run: bool = False) -> int:
+        """
+        長期間更新されていないマーカーを期限切れ回数と共に削除
+
+        Args:
+            updated_before: この日時（ISO形式）より前に更新されたマーカーが対象
+            limit: 最大件数（Noneで無制限）
+            dry_run: Trueの場合は件数のみ返し削除しない
+
+        Returns:
+            削除（対象）件数
+        """
+        sql = "SELECT hook, session_id, kind, key FROM markers WHERE updated_at < ?"
+        params: Tuple = (updated_before,)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+
+        with self._transaction() as conn:
+            stale = conn.execute(sql, params).fetchall()
+            if not dry_run:
+                for table in ('markers', 'marker_counters'):
+                    conn.executemany(
+                        f"DELETE FROM {table} WHERE hook = ? AND session_id = ? AND kind = ? AND key = ?",
+                        stale
+                    )
+        return len(stale)
+
+    def delete_orphan_counters(self, dry_run: bool = False) -> int:
+        """
+        マーカーも履歴も残っていないセッションの期限切れ回数を削除
+
+        期限切れ回数は履歴を整理した後も参照されるため、同じフック・セッションの
+        マーカーまたは履歴が1件でも残っている間は削除しない。
+
+        Args:
+            dry_run: Trueの場合は件数のみ返し削除しない
+
+        Returns:
+            削除（対象）件数
+        """
+        condition = """
+            NOT EXISTS (SELECT 1 FROM markers m WHERE m.hook = c.hook AND m.session_id = c.session_id)
+            AND NOT EXISTS (SELECT 1 FROM marker_history h WHERE h.hook = c.hook AND h.session_id = c.session_id)
+        """
+        with self._transaction() as conn:
+            if dry_run:
+                return conn.execute(f"SELECT COUNT(*) FROM marker_counters c WHERE {condition}").fetchone()[0]
+            cursor = conn.execute(
+                f"""
+                DELETE FROM marker_counters WHERE (hook, session_id, kind, key) IN (
+                    SELECT hook, session_id, kind, key FROM marker_counters c WHERE {condition}
+                )
+                """
+            )
+        return cursor.rowcount
+
+    def get_transcript_usage(self, transcript_path: str, inode: int,
+                             size: int) -> Optional[Tuple[Optional[Dict[str, Any]], int]]:
+        """
+        共有キャッシュからtranscriptの最後のusageを取得
+
+        Args:
+            transcript_path: transcriptファイルのパス
+            inode: 現在のinode番号
+            size: 現在のファイルサイズ
+
+        Returns:
+            (usageブロック（usageが無い場合None）, 累積トークン数)。
+            inode・サイズが一致するエントリが無い場合None
+        """
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT usage, cumulative_tokens FROM transcript_usage "
+                "WHERE transcript_path = ? AND inode = ? AND size = ?",
+                (str(transcript_path), inode, size)
+            ).fetchone()
+        if row is None:
+            return None
+        return json_codec.loads(row[0]), row[1]
+
+    def put_transcript_usage(self, transcript_path: str, inode: int, size: int,
+                             usage: Optional[Dict[str, Any]], cumulative_tokens: int = 0) -> None:
+        """
+        transcriptの最後のusageを共有キャッシュに保存
+
+        同じinodeでより大きいサイズのエントリが既にある場合（後から読み始めた
+        プロセスが先に保存した場合）は上書きしない。
+
+        Args:
+            transcript_path: transcriptファイルのパス
+            inode: 読み取り時のinode番号
+            size: 読み取り時のファイルサイズ
+            usage: usageブロック（見つからなかった場合None）
+            cumulative_tokens: コンパクションで減少しない累積トークン数
+        """
+        with self._lock:
+            self.connection.execute(
+                """
+                INSERT INTO transcript_usage (transcript_path, inode, size, updated_at, usage, cumulative_tokens)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (transcript_path) DO UPDATE SET
+                    inode = excluded.inode,
+                    size = excluded.size,
+                    updated_at = excluded.updated_at,
+                    usage = excluded.usage,
+                    cumulative_tokens = excluded.cumulative_tokens
+                WHERE transcript_usage.inode != excluded.inode OR transcript_usage.size <= excluded.size
+                """,
+                (str(transcript_path), inode, size, datetime.now().isoformat(),
+                 json_codec.dumps_compact(usage), cumulative_tokens)
+            )
+
+    def delete_stale_transcript_usage(self, updated_before: str, limit: Optional[int] = None,
+                                      dry_run: bool = False) -> int:
+        """
+        長期間更新されていないtranscriptのusageキャッシュを削除
+
+        Args:
+            updated_before: この日時（ISO形式）より前に更新されたエントリが対象
+            limit: 最大件数（Noneで無制限）
+            dry_run: Trueの場合は件数のみ返し削除しない
+
+        Returns:
+            削除（対象）件数
+        """
+        sql = "SELECT transcript_path FROM transcript_usage WHERE updated_at < ?"
+        params: Tuple = (updated_before,)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+
+        with self._transaction() as conn:
+            stale = conn.execute(sql, params).fetchall()
+            if not dry_run:
+                conn.executemany("DELETE FROM transcript_usage WHERE transcript_path = ?", stale)
+        return len(stale)
+
+    def claim_interval(self, name: str, interval_seconds: float, now: Optional[datetime] = None) -> bool:
+        """
+        一定間隔で1回だけ行う処理の実行権を取得
+
+        前回の実行から interval_seconds 以上経過していれば実行時刻を更新してTrueを返す。
+        複数プロセスが同時に呼び出しても、Trueを返すのは1プロセスのみ。
+
+        Args:
+            name: 処理名（metaテーブルのキー）
+            interval_seconds: 実行間隔（秒）
+            now: 現在時刻（テスト用）
+
+        Returns:
+            実行すべき場合True
+        """
+        now = now or datetime.now()
+        meta_name = f"last_run:{name}"
+
+        def is_due(conn: sqlite3.Connection) -> bool:
+            row = conn.execute("SELECT value FROM meta WHERE name = ?", (meta_name,)).fetchone()
+            if row is None:
+                return True
+            try:
+                elapsed = (now - datetime.fromisoformat(row[0])).total_seconds()
+            except ValueError:
+                return True
+            return not 0 <= elapsed < interval_seconds
+
+        # 殆どの呼び出しは間隔内のため、書き込みロックを取らずに先に確認する
+        with self._lock:
+            due = is_due(self.connection)
+        if not due:
+            return False
+        with self._transaction() as conn:
+            if not is_due(conn):
+                return False
+            conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                         (meta_name, now.isoformat()))
+        return True
+
+    def _migrate_legacy_files(self, conn: sqlite3.Connection) -> None:
+        """
+        旧形式のマーカーファイルを取り込む（データベース毎に1回のみ）
+
+        取り込んだファイルは削除する。現在のマーカーは既にデータベースに
+        同じマーカーがあれば上書きしない。
+        """
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM meta WHERE name = 'legacy_migrated'").fetchone():
+                conn.execute("COMMIT")
+                return
+
+            migrated = []
+            for path in self._iter_legacy_files():
+                parsed = self._parse_legacy_name(path.name)
+                if parsed is None:
+                    continue
+                marker, expired = parsed
+                data = self._read_legacy_file(path)
+                if data is None:
+                    continue
+
+                timestamp = data.get('timestamp') or datetime.fromtimestamp(path.stat().st_mtime).isoformat()
+                values = (*marker, int(data.get('tokens') or 0), timestamp,
+                          json_codec.dumps_compact(data))
+                if expired:
+                    expired_at = datetime.strptime(expired, "%Y%m%d_%H%M%S").isoformat()
+                    conn.execute(
+                        """
+                        INSERT INTO marker_history
+                            (hook, session_id, kind, key, tokens, updated_at, data, expired_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        (*values, expired_at)
+                    )
+                    conn.execute(_INCREMENT_COUNTER, tuple(marker))
+                else:
+                    conn.execute(
+                        """
+                        INSERT OR IGNORE INTO markers (hook, session_id, kind, key, tokens, updated_at, data)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        values
+                    )
+                migrated.append(path)
+
+            conn.execute("INSERT INTO meta (name, value) VALUES ('legacy_migrated', ?)",
+                         (datetime.now().isoformat(),))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        for path in migrated:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        if migrated:
+            self.logger.info("Migrated %d legacy marker files into %s", len(migrated), self.db_path)
+
+    def _iter_legacy_files(self):
+        """旧形式マーカーファイルの候補を列挙"""
+        try:
+            for path in self.legacy_dir.glob('claude_*'):
+                if path.is_file():
+                    yield path
+        except OSError:
+            return
+
+    @staticmethod
+    def _parse_legacy_name(name: str) -> Optional[Tuple[MarkerKey, Optional[str]]]:
+        """
+        旧形式マーカーファイル名を解析
+
+        Args:
+            name: ファイル名
+
+        Returns:
+            (マーカーの識別子, 期限切れ日時文字列またはNone)。対象外のファイルはNone
+        """
+        for pattern, hook, kind in LEGACY_FILE_PATTERNS:
+            match = pattern.match(name)
+            if match:
+                groups = match.groupdict()
+                marker = MarkerKey(
+                    hook=groups.get('hook') if hook is None else hook,
+                    session_id=groups['session'],
+                    kind=kind,
+                    key=groups.get('key') or ''
+                )
+                return marker, groups.get('expired')
+        return None
+
+    @staticmethod
+    def _read_legacy_file(path: Path) -> Optional[Dict[str, Any]]:
+        """旧形式マーカーファイルのJSONを読み込む（空・不正な場合は空の辞書）"""
+        try:
+            content = path.read_text(encoding='utf-8')
+        except OSError:
+            return None
+        try:
+            data = json_codec.loads(content) if content.strip() else {}
+        except ValueError:
+            data = {}
+        return data if isinstance(data, dict) else {}
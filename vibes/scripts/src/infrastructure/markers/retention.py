@@ -0,0 +1,290 @@
+"""マーカー・一時ファイルの保持期間管理
+
+期限切れマーカー履歴、長期間更新されないマーカー、フック入力の生JSON
+（/tmp/claude/base_hook_*.json）、transcriptチェックポイントを種類毎の
+保持期間・件数上限に従って整理する。
+
+期限切れ履歴は削除前に1つのNDJSONアーカイブへ追記し、アーカイブが
+上限サイズを超えた場合は `.1` へローテーションする（イベント毎に
+ファイルを作らない）。
+
+`vibes --action hook_gc` から全件を整理するほか、フック実行時にも
+一定間隔で1回だけ、batch_size 件ずつ少量の整理を行う。
+"""
+
+import os
+import sys
+import logging
+from dataclasses import dataclass, asdict, fields
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from shared.utils import json_codec
+from .marker_store import MarkerStore
+
+
+DEFAULT_ARCHIVE_PATH = Path("/tmp/claude_marker_history.ndjson")
+
+# RawInputCapture（sampled / on_error / all モード）の保存先
+DEFAULT_RAW_INPUT_DIR = Path("/tmp/claude")
+
+# TranscriptReader のチェックポイント保存先
+DEFAULT_CHECKPOINT_DIR = Path("/tmp")
+
+RAW_INPUT_PREFIX = "base_hook_"
+CHECKPOINT_PREFIX = "claude_transcript_checkpoint_"
+
+
+@dataclass
+class RetentionPolicy:
+    """種類毎の保持期間・件数上限"""
+    marker_history_ttl_days: float = 7
+    max_history_rows: int = 10000
+    marker_ttl_days: float = 30
+    raw_input_ttl_hours: float = 24
+    max_raw_input_files: int = 1000
+    checkpoint_ttl_days: float = 7
+    archive_max_bytes: int = 10 * 1024 * 1024
+    batch_size: int = 200
+    hook_interval_seconds: float = 3600
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> 'RetentionPolicy':
+        """
+        設定（config.json5 の convention_hooks.retention）から生成
+
+        Args:
+            settings: 設定の辞書（未知のキーは無視）
+
+        Returns:
+            保持期間ポリシー
+        """
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (settings or {}).items() if k in names})
+
+
+@dataclass
+class RetentionResult:
+    """整理結果の件数"""
+    archived_history: int = 0
+    deleted_markers: int = 0
+    deleted_counters: int = 0
+    deleted_raw_inputs: int = 0
+    deleted_checkpoints: int = 0
+    deleted_transcript_usage: int = 0
+    dry_run: bool = False
+
+    @property
+    def total(self) -> int:
+        """整理した（dry_run時は対象の）総件数"""
+        return (self.archived_history + self.deleted_markers + self.deleted_counters
+                + self.deleted_raw_inputs + self.deleted_checkpoints + self.deleted_transcript_usage)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """辞書に変換"""
+        return asdict(self)
+
+
+class RetentionService:
+    """マーカー・一時ファイルの整理"""
+
+    # MarkerStore.claim_interval に渡す処理名
+    INTERVAL_NAME = 'retention'
+
+    def __init__(self, store: MarkerStore, policy: Optional[RetentionPolicy] = None,
+                 archive_path: Optional[Path] = None,
+                 raw_input_dir: Optional[Path] = None,
+                 checkpoint_dir: Optional[Path] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        初期化
+
+        Args:
+            store: マーカーストア
+            policy: 保持期間ポリシー（省略時はデフォルト値）
+            archive_path: 期限切れ履歴のアーカイブ（NDJSON）
+            raw_input_dir: フック入力の生JSONの保存先
+            checkpoint_dir: transcriptチェックポイントの保存先
+            logger: ロガー
+        """
+        self.store = store
+        self.policy = policy or RetentionPolicy()
+        self.archive_path = Path(archive_path) if archive_path else DEFAULT_ARCHIVE_PATH
+        self.raw_input_dir = Path(raw_input_dir) if raw_input_dir else DEFAULT_RAW_INPUT_DIR
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else DEFAULT_CHECKPOINT_DIR
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+
+    def run(self, limit: Optional[int] = None, dry_run: bool = False,
+            now: Optional[datetime] = None) -> RetentionResult:
+        """
+        整理を実行
+
+        Args:
+            limit: 種類毎に整理する最大件数（Noneで全件。参照されなくなった
+                期限切れ回数の削除は全件整理時のみ行う）
+            dry_run: Trueの場合は対象件数のみ数え、何も変更しない
+            now: 現在時刻（テスト用）
+
+        Returns:
+            整理結果
+        """
+        now = now or datetime.now()
+        policy = self.policy
+        result = RetentionResult(dry_run=dry_run)
+
+        result.archived_history = self.compact_history(limit, dry_run, now)
+        result.deleted_markers = self.store.delete_stale_markers(
+            (now - timedelta(days=policy.marker_ttl_days)).isoformat(), limit, dry_run
+        )
+        if limit is None:
+            result.deleted_counters = self.store.delete_orphan_counters(dry_run)
+
+        result.deleted_raw_inputs = self._delete_files(
+            self.raw_input_dir, RAW_INPUT_PREFIX, now - timedelta(hours=policy.raw_input_ttl_hours),
+            policy.max_raw_input_files, limit, dry_run
+        )
+        result.deleted_checkpoints = self._delete_files(
+            self.checkpoint_dir, CHECKPOINT_PREFIX, now - timedelta(days=policy.checkpoint_ttl_days),
+            None, limit, dry_run
+        )
+        result.deleted_transcript_usage = self.store.delete_stale_transcript_usage(
+            (now - timedelta(days=policy.checkpoint_ttl_days)).isoformat(), limit, dry_run
+        )
+
+        self.logger.debug("Retention finished: %s", result)
+        return result
+
+    def run_if_due(self, now: Optional[datetime] = None) -> Optional[RetentionResult]:
+        """
+        前回から hook_interval_seconds 以上経過していれば少量の整理を実行
+
+        フック実行時に呼び出す。同時に起動した複数のフックのうち
+        1プロセスのみが batch_size 件までを整理する。
+
+        Args:
+            now: 現在時刻（テスト用）
+
+        Returns:
+            整理結果（実行しなかった場合None）
+        """
+        interval = self.policy.hook_interval_seconds
+        if interval <= 0 or not self.store.claim_interval(self.INTERVAL_NAME, interval, now):
+            return None
+        return self.run(limit=self.policy.batch_size, now=now)
+
+    def compact_history(self, limit: Optional[int] = None, dry_run: bool = False,
+                        now: Optional[datetime] = None) -> int:
+        """
+        保持期間・件数上限を超えた期限切れ履歴をアーカイブへ移動
+
+        Args:
+            limit: 最大件数（Noneで全件）
+            dry_run: Trueの場合は対象件数のみ返す
+            now: 現在時刻（テスト用）
+
+        Returns:
+            移動（対象）件数
+        """
+        now = now or datetime.now()
+        cutoff = (now - timedelta(days=self.policy.marker_history_ttl_days)).isoformat()
+
+        if dry_run:
+            excess = max(0, self.store.count_all_history() - self.policy.max_history_rows)
+            count = max(excess, self.store.count_all_history(cutoff))
+            return count if limit is None else min(count, limit)
+
+        archived = 0
+        batch_size = max(1, self.policy.batch_size)
+        while limit is None or archived < limit:
+            size = batch_size if limit is None else min(batch_size, limit - archived)
+            # 件数上限の超過分は期限に関わらず古い順に移動する
+            excess = max(0, self.store.count_all_history() - self.policy.max_history_rows)
+            if excess:
+                rows = self.store.fetch_history(None, min(size, excess))
+            else:
+                rows = self.store.fetch_history(cutoff, size)
+            if not rows:
+                break
+
+            # アーカイブへの追記に失敗した場合は履歴を削除しない
+            self._append_archive(rows)
+            archived += self.store.delete_history([row['id'] for row in rows])
+
+        return archived
+
+    def _append_archive(self, rows: List[Dict[str, Any]]) -> None:
+        """履歴をアーカイブへ追記（上限サイズ超過時はローテーション）"""
+        try:
+            if self.archive_path.stat().st_size >= self.policy.archive_max_bytes:
+                os.replace(self.archive_path, self.archive_path.with_name(self.archive_path.name + '.1'))
+        except FileNotFoundError:
+            pass
+
+        lines = []
+        for row in rows:
+            record = {k: v for k, v in row.items() if k != 'id'}
+            try:
+                record['data'] = json_codec.loads(record['data'])
+            except (TypeError, ValueError):
+                pass
+            lines.append(json_codec.dumps_compact(record) + '\n')
+
+        self.archive_path.parent.mkdir(parents=True, exist_ok=True)
+        # 1回の書き込みで追記し、並行する追記と行が混ざらないようにする
+        with open(self.archive_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(lines))
+
+    def _delete_files(self, directory: Path, prefix: str, expire_before: datetime,
+                      max_files: Optional[int], limit: Optional[int], dry_run: bool) -> int:
+        """
+        期限切れ・件数上限超過のファイルを古い順に削除
+
+        Args:
+            directory: 対象ディレクトリ
+            prefix: 対象ファイル名の接頭辞（拡張子 .json）
+            expire_before: この時刻より前に更新されたファイルを削除
+            max_files: 残す最大ファイル数（Noneで無制限）
+            limit: 最大削除件数（Noneで無制限）
+            dry_run: Trueの場合は対象件数のみ返す
+
+        Returns:
+            削除（対象）件数
+        """
+        entries = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if not (entry.name.startswith(prefix) and entry.name.endswith('.json')):
+                        continue
+                    try:
+                        entries.append((entry.stat(follow_symlinks=False).st_mtime, entry.path))
+                    except OSError:
+                        continue
+        except OSError:
+            return 0
+
+        entries.sort()
+        threshold = expire_before.timestamp()
+        excess = len(entries) - max_files if max_files is not None else 0
+        targets = [
+            path for i, (mtime, path) in enumerate(entries)
+            if mtime < threshold or i < excess
+        ]
+        if limit is not None:
+            targets = targets[:limit]
+        if dry_run:
+            return len(targets)
+
+        deleted = 0
+        for path in targets:
+            try:
+                os.unlink(path)
+                deleted += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.logger.warning("Failed to delete %s: %s", path, e)
+        return deleted
@@ -0,0 +1,5 @@
+"""フック実行時間の計測パッケージ"""
+
+from .hook_metrics import PhaseTimer, HookMetricsLog, MetricsSettings, summarize
+
+__all__ = ['PhaseTimer', 'HookMetricsLog', 'MetricsSettings', 'summarize']
@@ -0,0 +1,211 @@
+"""フック実行時間の計測と集計
+
+BaseHook.run の各フェーズ（read_input, marker_check, transcript_read,
+should_process, process, output など）の所要時間を単調増加クロック
+（perf_counter_ns）で計測し、1呼び出し1行のNDJSONとして追記する。
+
+transcript_read は marker_check / process の内側で行われるため、
+フェーズの時間は重複して計上され得る（total はフック全体の時間）。
+"""
+
+import os
+import sys
+import math
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Sequence, Tuple
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from shared.utils import json_codec
+
+
+DEFAULT_METRICS_PATH = Path("/tmp/claude_hook_metrics.ndjson")
+
+# 集計で算出するパーセンタイル
+PERCENTILES = (50, 95, 99)
+
+# 集計のグループ化に使用できる項目
+GROUP_FIELDS = ('hook', 'tool', 'rule')
+
+
+@dataclass
+class MetricsSettings:
+    """実行時間計測の設定"""
+    enabled: bool = True
+    file: str = str(DEFAULT_METRICS_PATH)
+    max_bytes: int = 10 * 1024 * 1024
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> 'MetricsSettings':
+        """
+        設定（config.json5 の convention_hooks.metrics）から生成
+
+        Args:
+            settings: 設定の辞書（未知のキーは無視）
+
+        Returns:
+            計測設定
+        """
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (settings or {}).items() if k in names})
+
+
+class PhaseTimer:
+    """1回のフック呼び出しのフェーズ別所要時間"""
+
+    def __init__(self):
+        """初期化（計測開始）"""
+        self.started_ns = time.perf_counter_ns()
+        self.phases_ns: Dict[str, int] = {}
+        self.tags: Dict[str, Any] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        フェーズの所要時間を計測（同名のフェーズは合算）
+
+        Args:
+            name: フェーズ名
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.phases_ns[name] = self.phases_ns.get(name, 0) + time.perf_counter_ns() - start
+
+    def to_record(self, hook: str) -> Dict[str, Any]:
+        """
+        計測結果を記録用の辞書に変換（所要時間はミリ秒）
+
+        Args:
+            hook: フッククラス名
+
+        Returns:
+            記録する辞書
+        """
+        total_ns = time.perf_counter_ns() - self.started_ns
+        return {
+            'ts': round(time.time(), 3),
+            'hook': hook,
+            **{k: v for k, v in self.tags.items() if v is not None},
+            'total': round(total_ns / 1e6, 3),
+            'phases': {name: round(ns / 1e6, 3) for name, ns in self.phases_ns.items()}
+        }
+
+
+class HookMetricsLog:
+    """実行時間の記録ファイル（NDJSON、上限サイズで .1 へローテーション）"""
+
+    def __init__(self, path: Optional[Path] = None, max_bytes: int = 10 * 1024 * 1024):
+        """
+        初期化
+
+        Args:
+            path: 記録ファイルのパス
+            max_bytes: ローテーションするサイズ
+        """
+        self.path = Path(path) if path else DEFAULT_METRICS_PATH
+        self.max_bytes = max_bytes
+
+    @property
+    def rotated_path(self) -> Path:
+        """ローテーション後のファイルのパス"""
+        return self.path.with_name(self.path.name + '.1')
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """
+        1件追記（1回の書き込みで行い、並行するフックの記録と混ざらないようにする）
+
+        Args:
+            record: 記録する辞書
+        """
+        line = json_codec.dumps_bytes(record) + b'\n'
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line)
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size >= self.max_bytes:
+            try:
+                os.replace(self.path, self.rotated_path)
+            except FileNotFoundError:
+                pass
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        """
+        記録を古い順に読み込む（壊れた行は無視）
+
+        Yields:
+            記録の辞書
+        """
+        for path in (self.rotated_path, self.path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json_codec.loads(line)
+                        except ValueError:
+                            continue
+                        if isinstance(record, dict):
+                            yield record
+            except FileNotFoundError:
+                continue
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """
+    パーセンタイル値を取得（nearest-rank法）
+
+    Args:
+        sorted_values: 昇順に並べた値
+        p: パーセント（0〜100）
+
+    Returns:
+        パーセンタイル値
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    """値のパーセンタイル"""
+    values.sort()
+    return {f"p{p}": percentile(values, p) for p in PERCENTILES}
+
+
+def summarize(records: Iterable[Dict[str, Any]],
+              group_by: Sequence[str] = GROUP_FIELDS) -> List[Dict[str, Any]]:
+    """
+    記録をグループ別に集計
+
+    Args:
+        records: 記録の辞書
+        group_by: グループ化する項目（'hook', 'tool', 'rule' の組み合わせ）
+
+    Returns:
+        グループ毎の 'count', 'total'（パーセンタイル）, 'phases'（フェーズ別パーセンタイル）
+        を含む辞書のリスト（件数の多い順）
+    """
+    groups: Dict[Tuple, Dict[str, Any]] = {}
+    for record in records:
+        key = tuple(record.get(name) or '-' for name in group_by)
+        group = groups.setdefault(key, {'total': [], 'phases': {}})
+        group['total'].append(record.get('total', 0.0))
+        for name, value in (record.get('phases') or {}).items():
+            group['phases'].setdefault(name, []).append(value)
+
+    summaries = []
+    for key, group in groups.items():
+        summaries.append({
+            **dict(zip(group_by, key)),
+            'count': len(group['total']),
+            'total': _summary(group['total']),
+            'phases': {name: _summary(values) for name, values in group['phases'].items()}
+        })
+    summaries.sort(key=lambda summary: (-summary['count'], [str(summary[name]) for name in group_by]))
+    return summaries
@@ -0,0 +1,5 @@
+"""transcript読み取りパッケージ"""
+
+from .transcript_reader import TranscriptReader, calculate_context_tokens
+
+__all__ = ['TranscriptReader', 'calculate_context_tokens']
@@ -0,0 +1,387 @@
+"""transcript読み取りサービス"""
+
+import os
+import sys
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple, NamedTuple
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from shared.utils import json_codec
+
+
+# 末尾から逆方向に読み取る際のブロックサイズ
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def calculate_context_tokens(usage: Dict[str, Any]) -> int:
+    """
+    usageブロックからコンテキストサイズ（トークン数）を算出
+
+    Args:
+        usage: assistantメッセージのusageブロック
+
+    Returns:
+        合計トークン数
+    """
+    return (
+        usage.get('input_tokens', 0) +
+        usage.get('output_tokens', 0) +
+        usage.get('cache_creation_input_tokens', 0) +
+        usage.get('cache_read_input_tokens', 0)
+    )
+
+
+class UsageState(NamedTuple):
+    """transcriptのトークン数の状態"""
+    usage: Optional[Dict[str, Any]] = None
+    # コンパクションで減少しない累積トークン数（コンテキストサイズの増加分の合計。
+    # コンパクションが無ければコンテキストサイズと等しい）
+    cumulative_tokens: int = 0
+
+    @property
+    def context_tokens(self) -> Optional[int]:
+        """現在のコンテキストサイズ（usageが無い場合None）"""
+        return calculate_context_tokens(self.usage) if self.usage else None
+
+
+def advance_usage_state(state: UsageState, usage: Dict[str, Any], after_boundary: bool = False) -> UsageState:
+    """
+    新しいusageを累積トークン数に反映
+
+    コンテキストサイズの増加分のみを加算する。コンパクション境界の直後のusage、
+    およびコンテキストサイズが減少した場合は新しい基準とし、加算しない。
+
+    Args:
+        state: 直前の状態
+        usage: 新しいassistant usage
+        after_boundary: 直前のusageとの間にコンパクション境界があったか
+
+    Returns:
+        新しい状態
+    """
+    if not state.usage:
+        return UsageState(usage, state.cumulative_tokens + calculate_context_tokens(usage))
+    if after_boundary:
+        return UsageState(usage, state.cumulative_tokens)
+    increase = calculate_context_tokens(usage) - calculate_context_tokens(state.usage)
+    return UsageState(usage, state.cumulative_tokens + max(0, increase))
+
+
+def is_compaction_boundary(line: bytes) -> bool:
+    """
+    transcriptの1行がコンパクション（/compact・自動コンパクト）の境界か判定
+
+    Args:
+        line: transcriptの1行（バイト列）
+
+    Returns:
+        境界（compact_boundary のシステムメッセージ、またはコンパクトの要約）の場合True
+    """
+    if b'compact_boundary' not in line and b'isCompactSummary' not in line:
+        return False
+    try:
+        entry = json_codec.loads(line)
+    except (json_codec.JSONDecodeError, UnicodeDecodeError):
+        return False
+    return isinstance(entry, dict) and (
+        entry.get('subtype') == 'compact_boundary' or entry.get('isCompactSummary') is True
+    )
+
+
+def extract_assistant_usage(line: bytes) -> Optional[Dict[str, Any]]:
+    """
+    transcriptの1行からassistantメッセージのusageを抽出
+
+    assistantのusageを含み得ない行はJSONデコードせずに除外する。
+
+    Args:
+        line: transcriptの1行（バイト列）
+
+    Returns:
+        usageブロック（該当しない場合None）
+    """
+    if b'"assistant"' not in line or b'"usage"' not in line:
+        return None
+    try:
+        entry = json_codec.loads(line)
+    except (json_codec.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if isinstance(entry, dict) and entry.get('type') == 'assistant':
+        message = entry.get('message')
+        if isinstance(message, dict) and message.get('usage'):
+            return message['usage']
+    return None
+
+
+def scan_last_usage(transcript_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[Optional[Dict[str, Any]], int]:
+    """
+    transcriptを末尾から固定長ブロック単位で逆走査し、最後のassistant usageを取得
+
+    最初に見つかったusageで走査を打ち切るため、通常はファイルサイズに依存しない。
+    書き込み途中の末尾行（改行で終わらない行）は対象外とする。
+
+    Args:
+        transcript_path: transcriptファイルのパス
+        chunk_size: 1回に読み取るブロックサイズ
+
+    Returns:
+        (usageブロック（見つからない場合None）, 完結した最終行の終端オフセット)
+    """
+    with open(transcript_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        end_offset = None
+        remainder = b''
+
+        while position > 0:
+            read_size = min(chunk_size, position)
+            position -= read_size
+            f.seek(position)
+            buffer = f.read(read_size) + remainder
+
+            if end_offset is None:
+                last_newline = buffer.rfind(b'\n')
+                if last_newline == -1:
+                    remainder = buffer
+                    continue
+                end_offset = position + last_newline + 1
+                buffer = buffer[:last_newline + 1]
+
+            lines = buffer.split(b'\n')
+            # 先頭要素は前のブロックに続く可能性があるため持ち越す
+            remainder = lines[0] if position > 0 else b''
+            candidates = lines[1:] if position > 0 else lines
+            for line in reversed(candidates):
+                usage = extract_assistant_usage(line)
+                if usage:
+                    return usage, end_offset
+
+        if end_offset is None:
+            return None, 0
+        return None, end_offset
+
+
+class TranscriptReader:
+    """transcript JSONLの増分読み取り（チェックポイント方式）
+
+    transcript毎に (inode, バイトオフセット, 最終usage, 累積トークン数) をチェックポイントとして
+    永続化し、次回呼び出し時は追記されたバイトのみを解析する。
+    追記分の解析ではコンパクション境界を検出し、コンパクションで減少しない
+    累積トークン数（UsageState.cumulative_tokens）を更新する。
+    チェックポイントが無い、またはファイルが切り詰め・ローテーションされた場合は
+    末尾から逆走査して最後のusageを取得し、チェックポイントを作り直す。
+
+    usage_cache（MarkerStore）を指定した場合、取得結果を (パス, inode, サイズ) を
+    キーとして共有する。同じtool呼び出しで起動した複数のフックのうち最初の1プロセスのみが
+    transcriptを読み、他のプロセスはtranscriptを開かずに結果を再利用する
+    （transcriptは追記のみのため、inode・サイズが同じであれば内容も同じとみなす）。
+    """
+
+    # チェックポイント直前の照合に使うバイト数（同一inodeでの書き換え検知用）
+    FINGERPRINT_SIZE = 64
+
+    def __init__(self, checkpoint_dir: Optional[Path] = None,
+                 logger: Optional[logging.Logger] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 usage_cache: Optional[Any] = None):
+        """
+        初期化
+
+        Args:
+            checkpoint_dir: チェックポイント保存ディレクトリ（デフォルト: /tmp）
+            logger: ロガー（省略時はクラス名のロガー）
+            chunk_size: 逆走査時のブロックサイズ
+            usage_cache: プロセス間で共有するusageキャッシュ
+                （get_transcript_usage / put_transcript_usage を持つ MarkerStore。Noneで共有しない）
+        """
+        self.checkpoint_dir = checkpoint_dir or Path("/tmp")
+        self.chunk_size = chunk_size
+        self.usage_cache = usage_cache
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+
+    def get_checkpoint_path(self, transcript_path: str) -> Path:
+        """
+        transcriptに対応するチェックポイントファイルのパスを取得
+
+        Args:
+            transcript_path: transcriptファイルのパス
+
+        Returns:
+            チェックポイントファイルのパス
+        """
+        path_hash = hashlib.md5(str(transcript_path).encode()).hexdigest()[:16]
+        return self.checkpoint_dir / f"claude_transcript_checkpoint_{path_hash}.json"
+
+    def get_usage_state(self, transcript_path: Optional[str],
+                        usage_cache: Optional[Any] = None) -> UsageState:
+        """
+        最後のassistant usageと累積トークン数を取得
+
+        Args:
+            transcript_path: transcriptファイルのパス
+            usage_cache: 共有するusageキャッシュ（省略時は初期化時の指定）
+
+        Returns:
+            トークン数の状態（取得できない場合は空の状態）
+        """
+        if not transcript_path:
+            return UsageState()
+
+        try:
+            stat = os.stat(transcript_path)
+        except OSError:
+            return UsageState()
+
+        if usage_cache is None:
+            usage_cache = self.usage_cache
+        if usage_cache is not None:
+            try:
+                cached = usage_cache.get_transcript_usage(transcript_path, stat.st_ino, stat.st_size)
+                if cached is not None:
+                    return UsageState(*cached)
+            except Exception as e:
+                self.logger.error("Failed to read shared transcript usage: %s", e)
+
+        state = self._read_usage_state(transcript_path, stat)
+
+        if usage_cache is not None:
+            try:
+                usage_cache.put_transcript_usage(transcript_path, stat.st_ino, stat.st_size,
+                                                 state.usage, state.cumulative_tokens)
+            except Exception as e:
+                self.logger.error("Failed to publish shared transcript usage: %s", e)
+        return state
+
+    def get_last_usage(self, transcript_path: Optional[str],
+                       usage_cache: Optional[Any] = None) -> Optional[Dict[str, Any]]:
+        """
+        最後のassistantメッセージのusageブロックを取得
+
+        Args:
+            transcript_path: transcriptファイルのパス
+            usage_cache: 共有するusageキャッシュ（省略時は初期化時の指定）
+
+        Returns:
+            usageブロック（見つからない場合None）
+        """
+        return self.get_usage_state(transcript_path, usage_cache).usage
+
+    def get_context_size(self, transcript_path: Optional[str],
+                         usage_cache: Optional[Any] = None) -> Optional[int]:
+        """
+        transcriptから現在のコンテキストサイズを取得
+
+        Args:
+            transcript_path: transcriptファイルのパス
+            usage_cache: 共有するusageキャッシュ（省略時は初期化時の指定）
+
+        Returns:
+            トークン数（取得できない場合None）
+        """
+        return self.get_usage_state(transcript_path, usage_cache).context_tokens
+
+    def _read_usage_state(self, transcript_path: str, stat: os.stat_result) -> UsageState:
+        """チェックポイント以降を解析してトークン数の状態を取得（チェックポイントを更新）"""
+        checkpoint_path = self.get_checkpoint_path(transcript_path)
+        resume = self._resume_point(transcript_path, checkpoint_path, stat)
+
+        if resume is None:
+            last_usage, offset = scan_last_usage(transcript_path, self.chunk_size)
+            state = UsageState(last_usage, calculate_context_tokens(last_usage) if last_usage else 0)
+            after_boundary = False
+        else:
+            offset, state, after_boundary = resume
+            if offset == stat.st_size:
+                return state
+            offset, state, after_boundary = self._scan_forward(transcript_path, offset, state, after_boundary)
+
+        self._save_checkpoint(checkpoint_path, transcript_path, stat.st_ino, offset, state, after_boundary)
+        return state
+
+    def _resume_point(self, transcript_path: str, checkpoint_path: Path,
+                      stat: os.stat_result) -> Optional[Tuple[int, UsageState, bool]]:
+        """チェックポイントを検証し、(読み取り再開位置, 状態, 境界の後か) を返す（無効時はNone）"""
+        checkpoint = self._load_checkpoint(checkpoint_path)
+        if not checkpoint or checkpoint.get('transcript_path') != str(transcript_path):
+            return None
+
+        offset = checkpoint.get('offset', 0)
+        if checkpoint.get('inode') != stat.st_ino:
+            self.logger.debug("Transcript rotated (inode changed), rescan: %s", transcript_path)
+            return None
+        if offset > stat.st_size:
+            self.logger.debug("Transcript truncated (%d > %d), rescan: %s",
+                              offset, stat.st_size, transcript_path)
+            return None
+        if checkpoint.get('fingerprint') != self._fingerprint(transcript_path, offset):
+            self.logger.debug("Transcript rewritten before checkpoint, rescan: %s", transcript_path)
+            return None
+
+        last_usage = checkpoint.get('last_usage')
+        cumulative_tokens = checkpoint.get('cumulative_tokens')
+        if cumulative_tokens is None:
+            # 累積トークン数の無い旧形式はコンテキストサイズから始める
+            cumulative_tokens = calculate_context_tokens(last_usage) if last_usage else 0
+        return offset, UsageState(last_usage, cumulative_tokens), bool(checkpoint.get('after_boundary'))
+
+    def _scan_forward(self, transcript_path: str, offset: int, state: UsageState,
+                      after_boundary: bool) -> Tuple[int, UsageState, bool]:
+        """offset以降の完結した行を解析し、新しい (offset, 状態, 境界の後か) を返す"""
+        with open(transcript_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                # 書き込み途中の末尾行は次回に持ち越す
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+
+                usage = extract_assistant_usage(line)
+                if usage:
+                    state = advance_usage_state(state, usage, after_boundary)
+                    after_boundary = False
+                elif is_compaction_boundary(line):
+                    self.logger.debug("Compaction boundary at offset %d: %s", offset, transcript_path)
+                    after_boundary = True
+
+        return offset, state, after_boundary
+
+    def _fingerprint(self, transcript_path: str, offset: int) -> str:
+        """offset直前のバイト列のハッシュ値"""
+        start = max(0, offset - self.FINGERPRINT_SIZE)
+        with open(transcript_path, 'rb') as f:
+            f.seek(start)
+            return hashlib.md5(f.read(offset - start)).hexdigest()
+
+    def _load_checkpoint(self, checkpoint_path: Path) -> Optional[Dict[str, Any]]:
+        """チェックポイントを読み込み"""
+        try:
+            with open(checkpoint_path, 'r', encoding='utf-8') as f:
+                return json_codec.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_checkpoint(self, checkpoint_path: Path, transcript_path: str, inode: int,
+                         offset: int, state: UsageState, after_boundary: bool = False) -> None:
+        """チェックポイントをアトミックに保存"""
+        checkpoint = {
+            'transcript_path': str(transcript_path),
+            'inode': inode,
+            'offset': offset,
+            'fingerprint': self._fingerprint(transcript_path, offset),
+            'last_usage': state.usage,
+            'cumulative_tokens': state.cumulative_tokens,
+            'after_boundary': after_boundary
+        }
+        tmp_path = checkpoint_path.with_name(f"{checkpoint_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json_codec.dump(checkpoint, f, ensure_ascii=False)
+            os.replace(tmp_path, checkpoint_path)
+        except OSError as e:
+            self.logger.error("Failed to save transcript checkpoint: %s", e)
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
@@ -1,5 +1,6 @@
 """共通ユーティリティパッケージ"""
 
 from .session_manager import SessionManager, get_session_manager
+from .hook_logging import configure_hook_logging, get_hook_logger, LoggingSettings
 
-__all__ = ['SessionManager', 'get_session_manager']
\ No newline at end of file
+__all__ = ['SessionManager', 'get_session_manager', 'configure_hook_logging', 'get_hook_logger', 'LoggingSettings']
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""フック共通のロギング設定
+
+フック・規約マッチャーはこれまで各自のFileHandlerで /tmp 配下の複数ファイルへ
+同期的に書き込んでいた。ここでは1つの出力先（サイズでローテーションする
+RotatingFileHandler）にまとめ、書き込みを QueueListener のスレッドで行う。
+
+フック・マッチャーのロガーは HOT_PATH_LOGGER 配下に作成し、呼び出し毎に
+大量に出力されるログは hot_path_level（既定: WARNING）で抑制する。
+詳細な追跡が必要な場合は config.json5 の convention_hooks.logging.hot_path_level を
+"DEBUG" に変更する。レベル判定で除外されたログはメッセージの組み立ても行われない。
+
+状態はloggingモジュール側（ルートロガーのハンドラ）に保持するため、
+`shared.utils` と `src.shared.utils` のように別名でimportされても設定は1つになる。
+"""
+
+import atexit
+import queue
+import logging
+import logging.handlers
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+# フック・マッチャーのロガーの親ロガー名
+HOT_PATH_LOGGER = "claude_hooks"
+
+DEFAULT_LOG_FILE = Path("/tmp/claude_hooks_debug.log")
+
+LOG_FORMAT = '[%(asctime)s] %(name)s %(levelname)s: %(message)s'
+
+
+@dataclass
+class LoggingSettings:
+    """ロギング設定"""
+    level: str = 'INFO'
+    hot_path_level: str = 'WARNING'
+    file: Optional[str] = None
+    max_bytes: int = 5 * 1024 * 1024
+    backup_count: int = 3
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> 'LoggingSettings':
+        """
+        設定（config.json5 の convention_hooks.logging）から生成
+
+        Args:
+            settings: 設定の辞書（未知のキーは無視）
+
+        Returns:
+            ロギング設定
+        """
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (settings or {}).items() if k in names})
+
+
+def _to_level(level: Any, default: int) -> int:
+    """レベル名または数値をloggingのレベル値に変換"""
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    return value if isinstance(value, int) else default
+
+
+def get_hook_logger(name: str) -> logging.Logger:
+    """
+    フック・マッチャー用のロガーを取得（hot_path_level の対象）
+
+    Args:
+        name: ロガー名（通常はクラス名）
+
+    Returns:
+        HOT_PATH_LOGGER 配下のロガー
+    """
+    return logging.getLogger(f"{HOT_PATH_LOGGER}.{name}")
+
+
+def _find_sink(root: logging.Logger) -> Optional[logging.handlers.QueueHandler]:
+    """設定済みの出力先（QueueHandler）を取得"""
+    for handler in root.handlers:
+        if getattr(handler, 'hook_sink', None) is not None:
+            return handler
+    return None
+
+
+def configure_hook_logging(settings: Optional[Dict[str, Any]] = None,
+                           log_file: Optional[Path] = None) -> LoggingSettings:
+    """
+    フック共通のロギングを設定（複数回呼び出し可能）
+
+    レベルは呼び出し毎に反映し、出力先は変更があった場合のみ作り直す。
+
+    Args:
+        settings: 設定（config.json5 の convention_hooks.logging）
+        log_file: 設定に出力先が無い場合の出力先
+
+    Returns:
+        適用したロギング設定
+    """
+    config = LoggingSettings.from_settings(settings)
+    root = logging.getLogger()
+    root.setLevel(_to_level(config.level, logging.INFO))
+    logging.getLogger(HOT_PATH_LOGGER).setLevel(_to_level(config.hot_path_level, logging.WARNING))
+
+    sink = (str(config.file or log_file or DEFAULT_LOG_FILE), int(config.max_bytes), int(config.backup_count))
+    current = _find_sink(root)
+    if current is not None:
+        if current.hook_sink == sink:
+            return config
+        _remove_sink(root, current)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        sink[0], maxBytes=sink[1], backupCount=sink[2], encoding='utf-8', delay=True
+    )
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.hook_sink = sink
+    queue_handler.listener = logging.handlers.QueueListener(log_queue, file_handler)
+    queue_handler.listener.start()
+    root.addHandler(queue_handler)
+    return config
+
+
+def _remove_sink(root: logging.Logger, handler: logging.handlers.QueueHandler) -> None:
+    """出力先を取り外し、キューに残ったログを書き出して閉じる"""
+    root.removeHandler(handler)
+    handler.listener.stop()
+    for target in handler.listener.handlers:
+        target.close()
+
+
+def shutdown_hook_logging() -> None:
+    """キューに残ったログを書き出して出力先を閉じる（プロセス終了時に自動で呼ばれる）"""
+    root = logging.getLogger()
+    handler = _find_sink(root)
+    if handler is not None:
+        _remove_sink(root, handler)
+
+
+atexit.register(shutdown_hook_logging)
@@ -0,0 +1,133 @@
+"""JSONの読み書き（orjsonがインストールされていれば使用し、無ければ標準のjson）
+
+フック入力・transcript・マーカーの解析など、フックの呼び出し毎に繰り返す処理で使う。
+解析結果は標準のjsonと同じになるよう、orjsonが受け付けない入力（NaN・UTF-8以外の
+バイト列など）は標準のjsonで解析し直し、同じ結果・例外を返す。
+
+dumps() / dump() の出力は標準の json.dumps と同じ（区切り文字・浮動小数点数の表記を含む）。
+マーカー・フックの応答など、読み手がJSONとして解析するだけの出力には、区切り文字に空白を
+入れない dumps_compact() / dumps_bytes() を使う。orjsonを使用するのはこれらで
+ensure_ascii=False の場合のみ（orjsonは非ASCII文字をエスケープできないため）。
+
+標準のjsonと異なるのは、orjson使用時に 64bitを超える整数を浮動小数点数として解析する点と、
+dumps_compact() / dumps_bytes() が非有限の浮動小数点数を null として出力する点のみ（フック入力・transcript・設定には現れない。
+事前に入力を走査して判定すると orjson を使う利点が無くなるため対応しない）。
+"""
+
+import json
+from typing import Any, IO, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# 使用中のバックエンド（'orjson' / 'json'）
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+JSONDecodeError = json.JSONDecodeError
+
+
+# orjsonの出力オプション（文字列以外のキーは標準のjsonと同様に文字列化）
+_ORJSON_OPTION = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """
+    JSONテキストを解析
+
+    Args:
+        data: JSONテキスト（bytesの場合はデコードせずに解析）
+
+    Returns:
+        解析結果
+
+    Raises:
+        JSONDecodeError: JSONとして不正な場合
+        UnicodeDecodeError: bytesが標準のjsonでもデコードできない場合
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # 標準のjsonで解析し直し、同じ結果・例外にする
+    return json.loads(data)
+
+
+def dumps(obj: Any, ensure_ascii: bool = True, indent: Optional[int] = None) -> str:
+    """
+    JSONテキストに変換（標準の json.dumps と同じ出力）
+
+    Args:
+        obj: 変換するオブジェクト
+        ensure_ascii: 非ASCII文字をエスケープするか（標準のjsonと同じ既定値）
+        indent: インデント幅（Noneの場合は1行）
+
+    Returns:
+        JSONテキスト
+    """
+    return json.dumps(obj, ensure_ascii=ensure_ascii, indent=indent)
+
+
+def dumps_compact(obj: Any, ensure_ascii: bool = False) -> str:
+    """
+    区切り文字に空白を入れない1行のJSONテキストに変換
+
+    Args:
+        obj: 変換するオブジェクト
+        ensure_ascii: 非ASCII文字をエスケープするか
+
+    Returns:
+        JSONテキスト
+    """
+    if orjson is not None and not ensure_ascii:
+        try:
+            return orjson.dumps(obj, option=_ORJSON_OPTION).decode('utf-8')
+        except TypeError:
+            pass  # orjsonで扱えない値（64bitを超える整数など）は標準のjsonで変換
+    return json.dumps(obj, ensure_ascii=ensure_ascii, separators=(',', ':'))
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """
+    1行のJSON（UTF-8、非ASCII文字はエスケープしない、区切り文字に空白を入れない）に変換
+
+    Args:
+        obj: 変換するオブジェクト
+
+    Returns:
+        UTF-8のJSONテキスト
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=_ORJSON_OPTION)
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def load(fp: IO) -> Any:
+    """
+    ファイルからJSONを読み込む
+
+    Args:
+        fp: 読み込み用に開いたファイル（テキスト・バイナリどちらでも可）
+
+    Returns:
+        解析結果
+    """
+    return loads(fp.read())
+
+
+def dump(obj: Any, fp: IO[str], ensure_ascii: bool = True, indent: Optional[int] = None) -> None:
+    """
+    JSONをファイルに書き込む
+
+    Args:
+        obj: 変換するオブジェクト
+        fp: テキストモードで書き込み用に開いたファイル
+        ensure_ascii: 非ASCII文字をエスケープするか
+        indent: インデント幅
+    """
+    fp.write(dumps(obj, ensure_ascii=ensure_ascii, indent=indent))
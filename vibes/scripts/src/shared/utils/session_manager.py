@@ -2,10 +2,10 @@
 
 import os
 import sys
-import json
 import hashlib
 from typing import Optional, Dict, Any
 from pathlib import Path
+from . import json_codec
 
 
 class SessionManager:
@@ -100,8 +100,8 @@ class SessionManager:
             # stdin から読み込み
             input_data = sys.stdin.read()
             if input_data:
-                return json.loads(input_data)
-        except (json.JSONDecodeError, IOError):
+                return json_codec.loads(input_data)
+        except (json_codec.JSONDecodeError, IOError):
             pass
         
         return {}
@@ -0,0 +1,593 @@
+#!/usr/bin/env python3
+"""フックのホットパスのベンチマーク
+
+合成したtranscript（既定: 1MB〜1GB）と規約ルール（既定: 10〜10,000パターン）を生成し、
+以下の処理の1回あたりの所要時間を計測する。
+
+    file_check       FileConventionMatcher.check_file
+    command_check    CommandConventionMatcher.check_command
+    context_size     BaseHook._get_current_context_size
+                     （cold: チェックポイント無し / warm: 変更無し / append: 1行追記後）
+    hook_run         ImplementationDesignHook.run（プロセス内、合成ルール使用）
+    hook_process     実装設計書フックを子プロセスで起動し標準入力へパイプ（同梱ルール使用）
+
+結果はJSONで出力し、--baseline に以前の結果を指定すると中央値を比較する。
+pytest の収集対象外（test_*.py ではない）のため、直接実行する。
+
+使用例:
+    python tests/benchmark_hook_hot_path.py --output /tmp/bench.json
+    python tests/benchmark_hook_hot_path.py --transcript-mb 1,10 --rules 10,1000 \\
+        --baseline /tmp/bench.json --fail-on-regression
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import platform
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Sequence
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from src.domain.services.file_convention_matcher import FileConventionMatcher
+from src.domain.services.command_convention_matcher import CommandConventionMatcher
+from src.infrastructure.transcript.transcript_reader import TranscriptReader
+from src.infrastructure.markers.marker_store import MarkerStore
+from src.infrastructure.capture.raw_input_capture import RawInputCapture, RawCaptureSettings
+
+
+SCHEMA_VERSION = 1
+
+DEFAULT_WORK_DIR = Path("/tmp/claude_hook_benchmark")
+DEFAULT_TRANSCRIPT_MB = (1, 10, 100, 1024)
+DEFAULT_RULE_COUNTS = (10, 100, 1000, 10000)
+
+HOOK_SCRIPT = SCRIPTS_DIR / "src" / "domain" / "hooks" / "implementation_design_hook.py"
+
+# 中央値の変化がこの割合以内なら変化なしとみなす
+DEFAULT_TOLERANCE = 0.10
+
+# 1サンプルの目安の所要時間（短い処理はこの時間に達するまで繰り返し呼び出す）
+TARGET_SAMPLE_SECONDS = 0.01
+
+# 1ベンチマークあたりの計測時間の上限（超える場合はサンプル数を減らす、最低3サンプル）
+MAX_BENCH_SECONDS = 10.0
+
+
+# ---------------------------------------------------------------------------
+# 合成データ
+# ---------------------------------------------------------------------------
+
+def _assistant_line(n: int) -> str:
+    """usageを含むassistantメッセージ1行"""
+    return json.dumps({
+        'type': 'assistant',
+        'uuid': f'a-{n}',
+        'message': {
+            'role': 'assistant',
+            'content': [{'type': 'text', 'text': f'応答 {n} ' + 'x' * 200}],
+            'usage': {
+                'input_tokens': 10 + n % 7,
+                'output_tokens': 200 + n % 13,
+                'cache_creation_input_tokens': 1000,
+                'cache_read_input_tokens': 20000 + n
+            }
+        }
+    }, ensure_ascii=False) + '\n'
+
+
+def _filler_lines(n: int) -> str:
+    """usageを含まない行（userメッセージとツール結果）"""
+    user = json.dumps({
+        'type': 'user', 'uuid': f'u-{n}',
+        'message': {'role': 'user', 'content': f'依頼 {n} ' + 'y' * 300}
+    }, ensure_ascii=False)
+    tool = json.dumps({
+        'type': 'user', 'uuid': f't-{n}',
+        'message': {'role': 'user', 'content': [
+            {'type': 'tool_result', 'tool_use_id': f'tool-{n}', 'content': 'z' * 4000}
+        ]}
+    }, ensure_ascii=False)
+    return user + '\n' + tool + '\n'
+
+
+def generate_transcript(path: Path, size_bytes: int, usage_at: str = 'tail') -> Path:
+    """
+    合成transcript（JSONL）を生成
+
+    Args:
+        path: 出力先
+        size_bytes: おおよそのファイルサイズ
+        usage_at: 'tail' は会話全体にusageが分布し末尾もassistant、
+                  'head' は先頭1行のみusageを含む（逆走査の最悪ケース）
+
+    Returns:
+        出力先のパス
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        written = 0
+        if usage_at == 'head':
+            line = _assistant_line(0)
+            f.write(line)
+            written += len(line.encode('utf-8'))
+            block = _filler_lines(0) * 64
+        else:
+            block = ''.join(_filler_lines(n) + _assistant_line(n) for n in range(64))
+        block_bytes = len(block.encode('utf-8'))
+        while written < size_bytes:
+            f.write(block)
+            written += block_bytes
+    return path
+
+
+def _cached_transcript(work_dir: Path, size_mb: float, usage_at: str) -> Path:
+    """生成済みであれば再利用するtranscript"""
+    path = work_dir / 'transcripts' / f'transcript_{size_mb:g}mb_{usage_at}.jsonl'
+    size_bytes = int(size_mb * 1024 * 1024)
+    if not path.exists() or path.stat().st_size < size_bytes:
+        generate_transcript(path, size_bytes, usage_at)
+    return path
+
+
+def generate_file_rules(path: Path, count: int) -> Path:
+    """
+    ファイル規約ルールを生成（ルール毎に1パターン、最後のルールがプローブに一致）
+
+    JSONはYAMLとしても有効なため、そのままルールファイルとして読み込める。
+
+    Args:
+        path: 出力先
+        count: パターン数
+
+    Returns:
+        出力先のパス
+    """
+    kinds = ['**/module_{i}/**/*.rb', 'app/feature_{i}/*.py', '**/docs_{i}/**/*.md', '**/*.ext{i}']
+    rules = [{
+        'name': f'file rule {i}',
+        'patterns': [kinds[i % len(kinds)].format(i=i)],
+        'severity': 'block' if i % 2 else 'warn',
+        'message': f'規約 {i} を確認してください',
+        'token_threshold': 1000 + i
+    } for i in range(count - 1)]
+    rules.append({
+        'name': 'file rule last',
+        'patterns': ['**/benchmark_target/**/*.pu'],
+        'severity': 'block',
+        'message': '最後の規約を確認してください'
+    })
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({'rules': rules}, ensure_ascii=False), encoding='utf-8')
+    return path
+
+
+def generate_command_rules(path: Path, count: int) -> Path:
+    """
+    コマンド規約ルールを生成（ルール毎に1パターン、最後のルールがプローブに一致）
+
+    Args:
+        path: 出力先
+        count: パターン数
+
+    Returns:
+        出力先のパス
+    """
+    kinds = ['tool{i}*', 'tool{i} sub{i}*', 'bin/tool{i} *', '*tool{i}-wrapper*']
+    rules = [{
+        'name': f'command rule {i}',
+        'patterns': [kinds[i % len(kinds)].format(i=i)],
+        'severity': 'block' if i % 2 else 'warn',
+        'message': f'コマンド規約 {i} を確認してください',
+        'token_threshold': 1000 + i
+    } for i in range(count - 1)]
+    rules.append({
+        'name': 'command rule last',
+        'patterns': ['benchmark-target deploy*'],
+        'severity': 'block',
+        'message': '最後のコマンド規約を確認してください'
+    })
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({'rules': rules}, ensure_ascii=False), encoding='utf-8')
+    return path
+
+
+# 照合するファイルパス（一致無し・最後のルールに一致）
+FILE_PROBES = (
+    '/repo/app/models/user.rb',
+    '/repo/vibes/docs/logics/benchmark_target/設計/実装設計書.pu',
+    'frontend/src/components/Board/Card.tsx',
+    '/repo/lib/tasks/benchmark.rake',
+)
+
+# 照合するコマンド（一致無し・複合コマンドの途中で最後のルールに一致）
+COMMAND_PROBES = (
+    'ls -la /repo',
+    'cd /repo && benchmark-target deploy --all',
+    'npm run build | tee build.log',
+    'python -m pytest -q tests',
+)
+
+
+# ---------------------------------------------------------------------------
+# 計測
+# ---------------------------------------------------------------------------
+
+def measure(func: Callable[[], Any], repeat: int,
+            setup: Optional[Callable[[], Any]] = None,
+            teardown: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """
+    関数の1回あたりの所要時間を計測
+
+    ウォームアップの所要時間から1サンプルあたりの呼び出し回数を決める。
+    setup / teardown がある場合は毎回状態を戻す必要があるため1回ずつ呼び出す。
+
+    Args:
+        func: 計測対象
+        repeat: サンプル数（MAX_BENCH_SECONDS を超える場合は減らす）
+        setup: 各サンプルの前に呼ぶ関数（計測対象外）
+        teardown: 各サンプルの後に呼ぶ関数（計測対象外）
+
+    Returns:
+        1回あたりの所要時間の統計（ミリ秒）
+    """
+    if setup:
+        setup()
+    start = time.perf_counter()
+    func()  # ウォームアップ（遅延初期化を計測から除外）
+    elapsed = max(time.perf_counter() - start, 1e-6)
+    if teardown:
+        teardown()
+
+    number = 1 if setup or teardown else max(1, min(1000, int(TARGET_SAMPLE_SECONDS / elapsed)))
+    repeat = max(min(3, repeat), min(repeat, int(MAX_BENCH_SECONDS / (elapsed * number))))
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter_ns() - start) / number / 1e6)
+        if teardown:
+            teardown()
+    return summarize_samples(samples) | {'number': number}
+
+
+def summarize_samples(samples: Sequence[float]) -> Dict[str, Any]:
+    """
+    サンプルの統計
+
+    Args:
+        samples: 所要時間（ミリ秒）
+
+    Returns:
+        'samples', 'min_ms', 'median_ms', 'p95_ms', 'mean_ms', 'stdev_ms'
+    """
+    ordered = sorted(samples)
+    p95_index = max(0, -(-95 * len(ordered) // 100) - 1)
+    return {
+        'samples': len(ordered),
+        'min_ms': round(ordered[0], 4),
+        'median_ms': round(statistics.median(ordered), 4),
+        'p95_ms': round(ordered[p95_index], 4),
+        'mean_ms': round(statistics.fmean(ordered), 4),
+        'stdev_ms': round(statistics.stdev(ordered), 4) if len(ordered) > 1 else 0.0
+    }
+
+
+class HotPathBenchmark:
+    """フックのホットパスのベンチマーク"""
+
+    def __init__(self, work_dir: Path, repeat: int = 20, log: Callable[[str], None] = print):
+        """
+        初期化
+
+        Args:
+            work_dir: 合成データ・マーカー・チェックポイントの保存先
+            repeat: 各ベンチマークのサンプル数
+            log: 進捗の出力先
+        """
+        self.work_dir = Path(work_dir)
+        self.repeat = repeat
+        self.log = log
+        self.results: List[Dict[str, Any]] = []
+
+    def _record(self, name: str, params: Dict[str, Any], stats: Dict[str, Any]) -> None:
+        """結果を追加"""
+        self.results.append({'name': name, 'params': params, **stats})
+        label = ', '.join(f'{k}={v}' for k, v in params.items())
+        self.log(f"  {name} [{label}]: median {stats['median_ms']:.4f} ms, p95 {stats['p95_ms']:.4f} ms")
+
+    def _rules_dir(self, count: int) -> Path:
+        """ルール数毎の作業ディレクトリ"""
+        return self.work_dir / 'rules' / str(count)
+
+    def file_matcher(self, count: int) -> FileConventionMatcher:
+        """合成ルールのファイル規約マッチャー"""
+        rules_dir = self._rules_dir(count)
+        rules_file = generate_file_rules(rules_dir / 'file_conventions.yaml', count)
+        return FileConventionMatcher(rules_file, cache_dir=rules_dir / 'cache')
+
+    def command_matcher(self, count: int) -> CommandConventionMatcher:
+        """合成ルールのコマンド規約マッチャー"""
+        rules_dir = self._rules_dir(count)
+        rules_file = generate_command_rules(rules_dir / 'command_conventions.yaml', count)
+        return CommandConventionMatcher(rules_file, cache_dir=rules_dir / 'cache')
+
+    def bench_matchers(self, rule_counts: Sequence[int]) -> None:
+        """規約マッチャーの照合"""
+        for count in rule_counts:
+            file_matcher = self.file_matcher(count)
+            assert file_matcher.check_file(FILE_PROBES[1]) is not None
+            self._record('file_check', {'rules': count}, measure(
+                lambda: [file_matcher.check_file(p) for p in FILE_PROBES], self.repeat
+            ) | {'probes': len(FILE_PROBES)})
+
+            command_matcher = self.command_matcher(count)
+            assert command_matcher.check_command(COMMAND_PROBES[1]) is not None
+            self._record('command_check', {'rules': count}, measure(
+                lambda: [command_matcher.check_command(c) for c in COMMAND_PROBES], self.repeat
+            ) | {'probes': len(COMMAND_PROBES)})
+
+    def _new_hook(self, file_matcher: Optional[FileConventionMatcher] = None,
+                  command_matcher: Optional[CommandConventionMatcher] = None):
+        """作業ディレクトリに状態を保存する実装設計書フック（計測の記録は無効）"""
+        from src.domain.hooks.implementation_design_hook import ImplementationDesignHook
+
+        hook = ImplementationDesignHook()
+        hook.marker_store.close()
+        hook.marker_store = MarkerStore(self.work_dir / 'markers.db', legacy_dir=None)
+        hook.transcript_reader = TranscriptReader(self.work_dir / 'checkpoints', logger=hook.logger)
+        hook._raw_capture = RawInputCapture(RawCaptureSettings(mode='off'))
+        hook._metrics_log = None
+        hook._metrics_loaded = True
+        if file_matcher is not None:
+            hook.matcher = file_matcher
+        if command_matcher is not None:
+            hook.command_matcher = command_matcher
+        return hook
+
+    def bench_context_size(self, transcript_mb: Sequence[float]) -> None:
+        """transcriptからのコンテキストサイズ取得"""
+        hook = self._new_hook()
+        (self.work_dir / 'checkpoints').mkdir(parents=True, exist_ok=True)
+        reader = hook.transcript_reader
+        appended = _assistant_line(10 ** 6).encode('utf-8')
+
+        for size_mb in transcript_mb:
+            for usage_at in ('tail', 'head'):
+                path = _cached_transcript(self.work_dir, size_mb, usage_at)
+                transcript = str(path)
+                checkpoint = reader.get_checkpoint_path(transcript)
+                size = path.stat().st_size
+                params = {'transcript_mb': size_mb, 'usage_at': usage_at}
+
+                def drop_checkpoint():
+                    checkpoint.unlink(missing_ok=True)
+
+                self._record('context_size_cold', params, measure(
+                    lambda: hook._get_current_context_size(transcript), self.repeat,
+                    setup=drop_checkpoint
+                ))
+
+                hook._get_current_context_size(transcript)
+                self._record('context_size_warm', params, measure(
+                    lambda: hook._get_current_context_size(transcript), self.repeat
+                ))
+
+                saved = checkpoint.read_bytes()
+
+                def append_line():
+                    checkpoint.write_bytes(saved)
+                    with open(path, 'ab') as f:
+                        f.write(appended)
+
+                def restore():
+                    os.truncate(path, size)
+
+                try:
+                    self._record('context_size_append', params, measure(
+                        lambda: hook._get_current_context_size(transcript), self.repeat,
+                        setup=append_line, teardown=restore
+                    ))
+                finally:
+                    restore()
+                    drop_checkpoint()
+        hook.marker_store.close()
+
+    def _run_input(self, transcript: str) -> str:
+        """毎回新しいセッションとして処理されるフック入力"""
+        return json.dumps({
+            'session_id': f'benchmark-{uuid.uuid4().hex}',
+            'transcript_path': transcript,
+            'cwd': '/repo',
+            'hook_event_name': 'PreToolUse',
+            'tool_name': 'Edit',
+            'tool_input': {'file_path': FILE_PROBES[1], 'old_string': 'a', 'new_string': 'b'}
+        })
+
+    def bench_hook_run(self, rule_counts: Sequence[int], transcript_mb: float) -> None:
+        """フック全体（プロセス内、合成ルール）"""
+        transcript = str(_cached_transcript(self.work_dir, transcript_mb, 'tail'))
+        for count in rule_counts:
+            hook = self._new_hook(self.file_matcher(count), self.command_matcher(count))
+            self._record('hook_run', {'rules': count, 'transcript_mb': transcript_mb}, measure(
+                lambda: hook.run(io.StringIO(self._run_input(transcript)), io.StringIO()), self.repeat
+            ))
+            hook.marker_store.close()
+
+    def bench_hook_process(self, transcript_mb: float) -> None:
+        """フック全体（子プロセスの起動を含む、同梱ルール）"""
+        transcript = str(_cached_transcript(self.work_dir, transcript_mb, 'tail'))
+
+        def run():
+            subprocess.run([sys.executable, str(HOOK_SCRIPT)], input=self._run_input(transcript),
+                           capture_output=True, text=True, check=False)
+
+        self._record('hook_process', {'transcript_mb': transcript_mb}, measure(run, self.repeat))
+
+
+# ---------------------------------------------------------------------------
+# 結果の出力・比較
+# ---------------------------------------------------------------------------
+
+def result_key(result: Dict[str, Any]) -> str:
+    """ベンチマーク名とパラメータによる比較用キー"""
+    params = ','.join(f'{k}={v}' for k, v in sorted(result.get('params', {}).items()))
+    return f"{result['name']}[{params}]"
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[Dict[str, Any]]:
+    """
+    基準となる結果と中央値を比較
+
+    Args:
+        results: 今回の結果
+        baseline: 以前に出力したJSON
+        tolerance: 変化なしとみなす割合
+
+    Returns:
+        'key', 'baseline_ms', 'current_ms', 'ratio', 'status'
+        （'regressed' / 'improved' / 'unchanged' / 'new'）のリスト
+    """
+    previous = {result_key(r): r for r in baseline.get('results', [])}
+    comparison = []
+    for result in results:
+        key = result_key(result)
+        entry = {'key': key, 'current_ms': result['median_ms'], 'baseline_ms': None,
+                 'ratio': None, 'status': 'new'}
+        base = previous.get(key)
+        if base is not None and base.get('median_ms'):
+            ratio = result['median_ms'] / base['median_ms']
+            entry.update(baseline_ms=base['median_ms'], ratio=round(ratio, 3))
+            if ratio > 1 + tolerance:
+                entry['status'] = 'regressed'
+            elif ratio < 1 - tolerance:
+                entry['status'] = 'improved'
+            else:
+                entry['status'] = 'unchanged'
+        comparison.append(entry)
+    return comparison
+
+
+def build_report(results: List[Dict[str, Any]], args: argparse.Namespace) -> Dict[str, Any]:
+    """JSON出力の内容"""
+    return {
+        'schema': SCHEMA_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count()
+        },
+        'config': {
+            'repeat': args.repeat,
+            'transcript_mb': args.transcript_mb,
+            'rules': args.rules,
+            'suites': args.suites
+        },
+        'results': results
+    }
+
+
+def _number_list(value: str) -> List[float]:
+    """カンマ区切りの数値"""
+    numbers = [float(v) for v in value.split(',') if v.strip()]
+    return [int(n) if n.is_integer() else n for n in numbers]
+
+
+SUITES = ('matchers', 'context', 'hook', 'process')
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """コマンドライン引数"""
+    parser = argparse.ArgumentParser(description='フックのホットパスのベンチマーク')
+    parser.add_argument('--transcript-mb', type=_number_list, default=list(DEFAULT_TRANSCRIPT_MB),
+                        help='transcriptのサイズ（MB、カンマ区切り）')
+    parser.add_argument('--rules', type=lambda v: [int(n) for n in _number_list(v)],
+                        default=list(DEFAULT_RULE_COUNTS), help='ルールのパターン数（カンマ区切り）')
+    parser.add_argument('--suites', type=lambda v: [s.strip() for s in v.split(',') if s.strip()],
+                        default=list(SUITES), help=f"実行するベンチマーク（{','.join(SUITES)}）")
+    parser.add_argument('--repeat', type=int, default=20, help='各ベンチマークのサンプル数')
+    parser.add_argument('--work-dir', type=Path, default=DEFAULT_WORK_DIR,
+                        help='合成データの保存先（生成済みのtranscriptは再利用）')
+    parser.add_argument('--output', type=Path, help='結果のJSONの出力先（省略時は標準出力）')
+    parser.add_argument('--baseline', type=Path, help='比較する以前の結果のJSON')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='変化なしとみなす中央値の変化率')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='悪化したベンチマークがあれば終了コード1で終了')
+    parser.add_argument('--clean', action='store_true', help='終了時に作業ディレクトリを削除')
+    args = parser.parse_args(argv)
+    unknown = [s for s in args.suites if s not in SUITES]
+    if unknown:
+        parser.error(f"不正なベンチマーク: {', '.join(unknown)}")
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """メインエントリーポイント"""
+    args = parse_args(argv)
+    log = lambda message: print(message, file=sys.stderr)
+
+    args.work_dir.mkdir(parents=True, exist_ok=True)
+    bench = HotPathBenchmark(args.work_dir, repeat=args.repeat, log=log)
+    try:
+        smallest = min(args.transcript_mb)
+        if 'matchers' in args.suites:
+            log('規約マッチャー:')
+            bench.bench_matchers(args.rules)
+        if 'context' in args.suites:
+            log('コンテキストサイズ取得:')
+            bench.bench_context_size(args.transcript_mb)
+        if 'hook' in args.suites:
+            log('フック全体（プロセス内）:')
+            bench.bench_hook_run(args.rules, smallest)
+        if 'process' in args.suites:
+            log('フック全体（子プロセス）:')
+            bench.bench_hook_process(smallest)
+    finally:
+        if args.clean:
+            shutil.rmtree(args.work_dir, ignore_errors=True)
+
+    report = build_report(bench.results, args)
+    exit_code = 0
+    if args.baseline:
+        report['baseline'] = str(args.baseline)
+        report['comparison'] = compare(bench.results, json.loads(args.baseline.read_text(encoding='utf-8')),
+                                       args.tolerance)
+        log('基準との比較（中央値）:')
+        for entry in report['comparison']:
+            if entry['ratio'] is None:
+                log(f"  {entry['status']:>10}  {entry['key']}")
+            else:
+                log(f"  {entry['status']:>10}  {entry['key']}: {entry['baseline_ms']:.4f} -> "
+                    f"{entry['current_ms']:.4f} ms (x{entry['ratio']})")
+        if args.fail_on_regression and any(e['status'] == 'regressed' for e in report['comparison']):
+            exit_code = 1
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(text + '\n', encoding='utf-8')
+        log(f'結果: {args.output}')
+    else:
+        print(text)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""テスト共通のフィクスチャ"""
+
+import sys
+import functools
+import importlib
+import dataclasses
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+
+@pytest.fixture
+def isolated_hook_state(tmp_path, monkeypatch):
+    """
+    フックの状態の保存先を tmp_path に向ける
+
+    デーモン・hook_client・HookExecutor はフックを内部で生成するため、インスタンスに
+    ストアを渡す代わりに base_hook が使うクラスを差し替える。既定の /tmp の
+    マーカーDB・実行時間の記録・生JSON・チェックポイントを読み書き・整理しないようにする。
+    """
+    # フックは src. を経由せずに読み込まれるため、同じモジュールを差し替える
+    base_hook = importlib.import_module('domain.hooks.base_hook')
+    state_dir = tmp_path / 'hook_state'
+    state_dir.mkdir()
+
+    monkeypatch.setattr(base_hook, 'MarkerStore', functools.partial(
+        base_hook.MarkerStore, state_dir / 'markers.db', legacy_dir=None))
+    monkeypatch.setattr(base_hook, 'HookMetricsLog', lambda path, *args, _cls=base_hook.HookMetricsLog:
+                        _cls(state_dir / 'metrics.ndjson', *args))
+    monkeypatch.setattr(base_hook, 'RetentionService', functools.partial(
+        base_hook.RetentionService,
+        archive_path=state_dir / 'marker_history.ndjson',
+        raw_input_dir=state_dir / 'raw',
+        checkpoint_dir=state_dir / 'checkpoints'))
+    monkeypatch.setattr(base_hook, 'RawInputCapture', lambda settings, _cls=base_hook.RawInputCapture, **kwargs:
+                        _cls(dataclasses.replace(settings, capture_dir=str(state_dir / 'capture')), **kwargs))
+    return state_dir
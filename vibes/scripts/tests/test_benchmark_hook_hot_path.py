@@ -0,0 +1,74 @@
+"""ホットパスのベンチマーク（合成データ・結果比較）のテスト"""
+
+import pytest
+from benchmark_hook_hot_path import (
+    generate_transcript, generate_file_rules, generate_command_rules, compare, measure,
+    HotPathBenchmark, FILE_PROBES, COMMAND_PROBES
+)
+from src.infrastructure.transcript.transcript_reader import TranscriptReader
+
+
+class TestSyntheticData:
+    """合成データのテストクラス"""
+
+    @pytest.mark.parametrize('usage_at, expected', [('tail', 21284), ('head', 21210)])
+    def test_transcript(self, tmp_path, usage_at, expected):
+        """指定サイズ以上のtranscriptを生成し、最後のusageの位置を切り替えられる"""
+        path = generate_transcript(tmp_path / 'transcript.jsonl', 64 * 1024, usage_at)
+
+        assert path.stat().st_size >= 64 * 1024
+        assert TranscriptReader(tmp_path).get_context_size(str(path)) == expected
+
+    def test_rules_match_probes(self, tmp_path):
+        """生成したルール数でマッチャーが構築され、プローブが最後のルールに一致する"""
+        bench = HotPathBenchmark(tmp_path, repeat=1, log=lambda message: None)
+
+        file_matcher = bench.file_matcher(20)
+        command_matcher = bench.command_matcher(20)
+
+        assert len(file_matcher.rules) == 20
+        assert file_matcher.check_file(FILE_PROBES[1]).name == 'file rule last'
+        assert file_matcher.check_file(FILE_PROBES[0]) is None
+        assert len(command_matcher.rules) == 20
+        assert command_matcher.check_command(COMMAND_PROBES[1]).name == 'command rule last'
+        assert command_matcher.check_command(COMMAND_PROBES[0]) is None
+
+    def test_rule_files_are_deterministic(self, tmp_path):
+        """同じルール数では同じ内容を生成する（ベースライン比較の前提）"""
+        first = generate_file_rules(tmp_path / 'a.yaml', 5).read_text()
+        second = generate_file_rules(tmp_path / 'b.yaml', 5).read_text()
+
+        assert first == second
+        assert generate_command_rules(tmp_path / 'c.yaml', 5).read_text().count('"name"') == 5
+
+
+class TestMeasureAndCompare:
+    """計測・比較のテストクラス"""
+
+    def test_measure_calls_setup_per_sample(self):
+        """setup がある場合は1サンプル1回呼び出す"""
+        calls = []
+        stats = measure(lambda: calls.append('run'), repeat=4, setup=lambda: calls.append('setup'))
+
+        assert stats['samples'] == 4
+        assert stats['number'] == 1
+        assert calls == ['setup', 'run'] * 5
+        assert stats['min_ms'] <= stats['median_ms'] <= stats['p95_ms']
+
+    def test_compare(self):
+        """中央値の比率で悪化・改善・変化なし・新規を判定する"""
+        baseline = {'results': [
+            {'name': 'a', 'params': {'rules': 10}, 'median_ms': 1.0},
+            {'name': 'b', 'params': {}, 'median_ms': 1.0},
+            {'name': 'c', 'params': {}, 'median_ms': 1.0},
+        ]}
+        results = [
+            {'name': 'a', 'params': {'rules': 10}, 'median_ms': 1.5},
+            {'name': 'b', 'params': {}, 'median_ms': 0.5},
+            {'name': 'c', 'params': {}, 'median_ms': 1.05},
+            {'name': 'a', 'params': {'rules': 100}, 'median_ms': 2.0},
+        ]
+
+        statuses = [entry['status'] for entry in compare(results, baseline, tolerance=0.1)]
+
+        assert statuses == ['regressed', 'improved', 'unchanged', 'new']
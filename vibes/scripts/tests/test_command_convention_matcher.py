@@ -0,0 +1,156 @@
+"""CommandConventionMatcherのテスト"""
+
+import pytest
+import yaml
+from src.domain.services.command_convention_matcher import CommandConventionMatcher, CommandRuleIndex
+
+
+class TestCommandConventionMatcher:
+    """CommandConventionMatcherのテストクラス"""
+
+    @pytest.fixture
+    def rules_file(self, tmp_path):
+        """テスト用のルールファイルを作成"""
+        path = tmp_path / 'command_conventions.yaml'
+        path.write_text(yaml.dump({
+            'rules': [
+                {
+                    'name': 'Git Push',
+                    'patterns': ['git push*'],
+                    'severity': 'block',
+                    'message': 'Push message'
+                },
+                {
+                    'name': 'Git',
+                    'patterns': ['git*'],
+                    'severity': 'warn',
+                    'message': 'Git message'
+                },
+                {
+                    'name': 'Rails',
+                    'patterns': ['bin/rails db:*', 'rails'],
+                    'severity': 'warn',
+                    'message': 'Rails message'
+                },
+                {
+                    'name': 'Deploy',
+                    'patterns': ['*deploy*'],
+                    'severity': 'block',
+                    'message': 'Deploy message'
+                }
+            ]
+        }))
+        return path
+
+    def test_check_command_first_rule_wins(self, rules_file):
+        """ルール定義順で最初にマッチしたルールを返す"""
+        matcher = CommandConventionMatcher(rules_file)
+
+        assert matcher.check_command('git push origin main').name == 'Git Push'
+        assert matcher.check_command('git   status').name == 'Git'
+        assert matcher.check_command('gitk').name == 'Git'
+
+    def test_check_command_exact_and_prefix(self, rules_file):
+        """先頭トークンの完全一致・接頭辞一致"""
+        matcher = CommandConventionMatcher(rules_file)
+
+        assert matcher.check_command('bin/rails db:migrate').name == 'Rails'
+        assert matcher.check_command('rails server').name == 'Rails'
+        assert matcher.check_command('bin/rails server') is None
+
+    def test_check_command_generic_pattern(self, rules_file):
+        """接頭辞を持たないパターンは常に評価される"""
+        matcher = CommandConventionMatcher(rules_file)
+
+        assert matcher.check_command('cap production deploy').name == 'Deploy'
+        assert matcher.check_command('echo hello') is None
+        assert matcher.check_command('') is None
+
+    def test_matches_pattern(self, rules_file):
+        """個別パターンのマッチング（全体または先頭トークン）"""
+        matcher = CommandConventionMatcher(rules_file)
+
+        assert matcher.matches_pattern('git  push -f', ['git push*'])
+        assert matcher.matches_pattern('make test', ['make'])
+        assert not matcher.matches_pattern('cmake test', ['make'])
+        assert not matcher.matches_pattern('', ['make'])
+
+    def test_reload_rebuilds_index(self, rules_file):
+        """リロード時に索引を再構築する"""
+        matcher = CommandConventionMatcher(rules_file)
+        rules_file.write_text(yaml.dump({
+            'rules': [{'name': 'Docker', 'patterns': ['docker*'], 'message': 'Docker message'}]
+        }))
+
+        matcher.reload_rules()
+
+        assert matcher.check_command('git status') is None
+        assert matcher.check_command('docker compose up').name == 'Docker'
+
+
+class TestCommandRuleIndex:
+    """CommandRuleIndexのテストクラス"""
+
+    def test_unrelated_token_has_no_candidates(self, tmp_path):
+        """関係のない先頭トークンは辞書参照のみで候補なしとなる"""
+        path = tmp_path / 'rules.yaml'
+        path.write_text(yaml.dump({
+            'rules': [
+                {'name': f'Rule {i}', 'patterns': [f'tool{i} run*', f'tool{i}-*'], 'message': 'm'}
+                for i in range(200)
+            ]
+        }))
+        index = CommandRuleIndex(CommandConventionMatcher(path).rules)
+
+        assert index.candidates('ls') == []
+        assert [rule_index for rule_index, _ in index.candidates('tool42')] == [42]
+
+
+class TestCompoundCommands:
+    """複合コマンドのマッチングのテストクラス"""
+
+    @pytest.fixture
+    def matcher(self, tmp_path):
+        """テスト用のマッチャー"""
+        path = tmp_path / 'rules.yaml'
+        path.write_text(yaml.dump({
+            'rules': [
+                {'name': 'Git Push', 'patterns': ['git push*'], 'severity': 'block', 'message': 'Push'},
+                {'name': 'Docker', 'patterns': ['docker*'], 'severity': 'warn', 'message': 'Docker'},
+                {'name': 'Make', 'patterns': ['make'], 'severity': 'warn', 'message': 'Make'}
+            ]
+        }))
+        return CommandConventionMatcher(path)
+
+    def test_and_list(self, matcher):
+        """&&で連結された後続コマンドも評価する"""
+        rule, matched = matcher.match_command('cd app && git push origin main')
+
+        assert rule.name == 'Git Push'
+        assert matched == 'git push origin main'
+
+    def test_env_assignment_prefix(self, matcher):
+        """先頭の環境変数代入を除去して評価する"""
+        rule, matched = matcher.match_command('FOO=1 BAR="a b" docker compose up')
+
+        assert rule.name == 'Docker'
+        assert matched == 'docker compose up'
+
+    def test_lowest_rule_index_wins(self, matcher):
+        """複数の単純コマンドがマッチした場合は定義順で前のルールを採用する"""
+        rule, matched = matcher.match_command('make test | tee log; (git push)')
+
+        assert rule.name == 'Git Push'
+        assert matched == 'git push'
+
+    def test_quoted_operators_are_not_split(self, matcher):
+        """クォート内の演算子では分割しない"""
+        assert matcher.match_command('echo "a && git push"') is None
+
+    def test_confirmation_message_reports_sub_command(self, matcher):
+        """確認メッセージに該当した単純コマンドを含める"""
+        result = matcher.get_confirmation_message('cd app && git push')
+
+        assert result['command'] == 'cd app && git push'
+        assert result['matched_command'] == 'git push'
+        assert 'git push' in result['message']
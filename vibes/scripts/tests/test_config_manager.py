@@ -0,0 +1,46 @@
+"""ConfigManagerの解析済み設定キャッシュのテスト"""
+
+import os
+from unittest.mock import patch
+import pytest
+from src.infrastructure.config import config_manager
+from src.infrastructure.config.config_manager import ConfigManager
+
+
+class TestConfigCache:
+    """解析済み設定キャッシュのテストクラス"""
+
+    @pytest.fixture
+    def config_file(self, tmp_path):
+        """テスト用の設定ファイル"""
+        path = tmp_path / 'config.json5'
+        path.write_text('{\n  // コメント\n  convention_hooks: {metrics: {enabled: false}},\n}\n', encoding='utf-8')
+        return path
+
+    def _manager(self, config_file, tmp_path):
+        return ConfigManager(config_file, cache_dir=tmp_path / 'cache')
+
+    def test_second_load_uses_cache(self, config_file, tmp_path):
+        """2回目以降は設定ファイルを解析しない"""
+        assert self._manager(config_file, tmp_path).get_metrics_settings() == {'enabled': False}
+
+        with patch.object(config_manager, '_parse', side_effect=AssertionError('parsed')):
+            assert self._manager(config_file, tmp_path).get_metrics_settings() == {'enabled': False}
+
+    def test_cache_invalidated_on_change(self, config_file, tmp_path):
+        """設定ファイルが更新されると解析し直す"""
+        self._manager(config_file, tmp_path).config
+        config_file.write_text('{convention_hooks: {metrics: {enabled: true, max_bytes: 1}}}', encoding='utf-8')
+        os.utime(config_file, ns=(0, config_file.stat().st_mtime_ns + 10 ** 9))
+
+        assert self._manager(config_file, tmp_path).get_metrics_settings() == {'enabled': True, 'max_bytes': 1}
+
+    def test_broken_cache_is_ignored(self, config_file, tmp_path):
+        """壊れたキャッシュは無視して解析し直す"""
+        manager = self._manager(config_file, tmp_path)
+        manager.config
+        cache_files = list((tmp_path / 'cache').iterdir())
+        assert len(cache_files) == 1
+        cache_files[0].write_bytes(b'broken')
+
+        assert self._manager(config_file, tmp_path).get_metrics_settings() == {'enabled': False}
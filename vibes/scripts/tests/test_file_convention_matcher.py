@@ -72,6 +72,51 @@ class TestFileConventionMatcher:
         assert matcher.matches_pattern('app/controllers/api/v1/users.rb', ['app/**/*.rb'])
         assert not matcher.matches_pattern('lib/tasks/user.rb', ['app/**/*.rb'])
 
+    def test_matches_pattern_globstar(self, temp_rules_file):
+        """**が0個以上のディレクトリにマッチすることのテスト"""
+        matcher = FileConventionMatcher(temp_rules_file)
+        
+        assert matcher.matches_pattern('docs/a.md', ['docs/**/*.md'])
+        assert matcher.matches_pattern('/x/docs/a/b/c.md', ['**/docs/**/*.md'])
+        assert matcher.matches_pattern('docs/a/b', ['docs/**'])
+        assert not matcher.matches_pattern('docs/a.txt', ['docs/**/*.md'])
+        # *は/を跨がない
+        assert not matcher.matches_pattern('test/sub/file.pu', ['test/*.pu'])
+
+    def test_matches_pattern_absolute(self, temp_rules_file):
+        """/で始まるパターンはパス全体にマッチすることのテスト"""
+        matcher = FileConventionMatcher(temp_rules_file)
+        
+        assert matcher.matches_pattern('/x/a.rb', ['/x/*.rb'])
+        assert matcher.matches_pattern('x/a.rb', ['/x/*.rb'])
+        assert not matcher.matches_pattern('/y/x/a.rb', ['/x/*.rb'])
+
+    def test_matches_pattern_character_class(self, temp_rules_file):
+        """文字クラスパターンのテスト"""
+        matcher = FileConventionMatcher(temp_rules_file)
+        
+        assert matcher.matches_pattern('src/a1.py', ['src/a[0-9].py'])
+        assert not matcher.matches_pattern('src/ab.py', ['src/a[0-9].py'])
+        assert matcher.matches_pattern('src/ab.py', ['src/a[!0-9].py'])
+
+    def test_check_file_preserves_rule_order(self, tmp_path):
+        """複数ルールにマッチする場合は定義順で最初のルールを返す"""
+        rules_file = tmp_path / 'rules.yaml'
+        rules_file.write_text(yaml.dump({
+            'rules': [
+                {'name': 'Specific', 'patterns': ['app/models/*.rb'], 'severity': 'block', 'message': 'm1'},
+                {'name': 'Generic', 'patterns': ['**/*.rb'], 'severity': 'warn', 'message': 'm2'},
+                {'name': 'Broken', 'patterns': [''], 'severity': 'warn', 'message': 'm3'},
+                {'name': 'Docs', 'patterns': ['**/*.md'], 'severity': 'warn', 'message': 'm4'}
+            ]
+        }))
+        matcher = FileConventionMatcher(rules_file)
+        
+        assert matcher.check_file('app/models/user.rb').name == 'Specific'
+        assert matcher.check_file('lib/user.rb').name == 'Generic'
+        assert matcher.check_file('README.md').name == 'Docs'
+        assert matcher.check_file('README.txt') is None
+
     def test_check_file(self, temp_rules_file):
         """ファイルチェック機能のテスト"""
         matcher = FileConventionMatcher(temp_rules_file)
@@ -0,0 +1,136 @@
+"""HookDaemon / hook_clientのテスト"""
+
+import io
+import json
+import socket
+import threading
+import pytest
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from src.infrastructure.hooks.hook_daemon import HookDaemon
+from src.infrastructure.hooks import hook_client
+
+# 既定の /tmp のマーカーDB・実行時間の記録を使わない
+pytestmark = pytest.mark.usefixtures('isolated_hook_state')
+
+
+class TestHookDaemon:
+    """HookDaemonのテストクラス"""
+
+    @pytest.fixture
+    def socket_path(self, tmp_path):
+        """テスト用ソケットパス"""
+        return tmp_path / 'daemon.sock'
+
+    @pytest.fixture
+    def daemon(self, socket_path):
+        """バックグラウンドスレッドで起動したデーモン"""
+        daemon = HookDaemon(socket_path)
+        thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+        thread.start()
+
+        for _ in range(200):
+            if socket_path.exists() and daemon._server is not None:
+                break
+            threading.Event().wait(0.01)
+
+        yield daemon
+
+        daemon.shutdown()
+        thread.join(timeout=5)
+
+    def test_request_is_handled_by_daemon(self, daemon, socket_path):
+        """デーモン経由でフックの判定結果を取得できる"""
+        result = hook_client.request_daemon('implementation_design', '', str(socket_path))
+
+        assert result is not None
+        exit_code, output = result
+        assert exit_code == 0
+        response = json.loads(output)
+        assert response['hookSpecificOutput']['permissionDecision'] == 'allow'
+
+    def test_hook_state_is_isolated(self, daemon, socket_path, isolated_hook_state):
+        """フックの状態はテスト用のディレクトリに保存される"""
+        hook_client.request_daemon('implementation_design', '', str(socket_path))
+
+        hook = daemon.get_instance('implementation_design').hook
+        assert hook.marker_store.db_path == isolated_hook_state / 'markers.db'
+        assert (isolated_hook_state / 'metrics.ndjson').exists()
+
+    def test_hook_instance_is_reused(self, daemon, socket_path):
+        """同じフックのインスタンスは要求間で再利用される"""
+        first = daemon.get_instance('implementation_design')
+        hook_client.request_daemon('implementation_design', '', str(socket_path))
+
+        assert daemon.get_instance('implementation_design') is first
+
+    def test_unknown_hook(self, daemon):
+        """未登録のフック名はエラー応答"""
+        response = daemon.handle_request({'hook': 'unknown', 'input': ''})
+
+        assert response['exit_code'] == 1
+        assert 'error' in response
+
+
+class TestHookClient:
+    """hook_clientのテストクラス"""
+
+    @pytest.fixture
+    def silent_daemon(self, tmp_path):
+        """要求を読み込むが応答しないデーモン（hold 秒後に応答せず切断する）"""
+        socket_path = tmp_path / 'silent.sock'
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(socket_path))
+        server.listen()
+        requests = []
+        hold = {'seconds': 0.0}
+
+        def serve():
+            with server:
+                conn, _ = server.accept()
+                with conn:
+                    requests.append(conn.makefile('rb').read())
+                    threading.Event().wait(hold['seconds'])
+
+        thread = threading.Thread(target=serve, daemon=True)
+        thread.start()
+        yield socket_path, requests, hold
+        thread.join(timeout=5)
+
+    def test_request_without_daemon_returns_none(self, tmp_path):
+        """デーモン未起動時はNone"""
+        assert hook_client.request_daemon('implementation_design', '', str(tmp_path / 'missing.sock')) is None
+
+    def test_run_in_process_fallback(self):
+        """同一プロセス内実行のフォールバック"""
+        exit_code, output = hook_client.run_in_process('implementation_design', '')
+
+        assert exit_code == 0
+        assert json.loads(output)['hookSpecificOutput']['permissionDecision'] == 'allow'
+
+    def test_main_rejects_unknown_hook(self):
+        """未登録のフック名は使用方法エラー"""
+        assert hook_client.main(['unknown']) == 2
+
+    def test_timeout_after_request_is_an_error(self, silent_daemon):
+        """要求の送信後のタイムアウトはNone（同一プロセス内での再実行）にせずエラー"""
+        socket_path, requests, hold = silent_daemon
+        hold['seconds'] = 1.0
+
+        result = hook_client.request_daemon('implementation_design', '{}', str(socket_path), timeout=0.2)
+
+        assert result == (hook_client.DAEMON_ERROR_EXIT_CODE, '')
+        assert requests == [b'implementation_design\n{}']
+
+    def test_main_does_not_rerun_hook_after_request(self, silent_daemon, monkeypatch, capsys):
+        """デーモンに送信済みの要求はフックを同一プロセス内で再実行しない"""
+        socket_path, requests, _ = silent_daemon
+        monkeypatch.setenv('CLAUDE_HOOK_DAEMON_SOCKET', str(socket_path))
+        monkeypatch.setattr('sys.stdin', io.StringIO('{}'))
+        monkeypatch.setattr(hook_client, 'run_in_process', lambda *args: pytest.fail('hook was run again'))
+
+        assert hook_client.main(['implementation_design']) == hook_client.DAEMON_ERROR_EXIT_CODE
+        assert capsys.readouterr().out == ''
+        assert len(requests) == 1
@@ -0,0 +1,250 @@
+"""HookExecutorのコマンドフック実行のテスト"""
+
+import os
+import json
+import time
+import asyncio
+import pytest
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from src.infrastructure.hooks.hook_executor import (
+    HookExecutor, ExecutionSettings, aggregate_results, get_decision
+)
+
+
+def _hook(command: str, timeout: int = 60) -> dict:
+    """コマンドフックの設定"""
+    return {'type': 'command', 'command': command, 'timeout': timeout}
+
+
+def _respond(decision: str, reason: str = '', delay: float = 0) -> str:
+    """delay 秒後に判定を出力するコマンド"""
+    payload = json.dumps({'decision': decision, 'reason': reason})
+    return f"sleep {delay}; echo '{payload}'"
+
+
+def _is_running(pid: int) -> bool:
+    """プロセスが実行中か（回収されていない終了済みプロセスは実行中とみなさない）"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:
+        return Path(f'/proc/{pid}/stat').read_text().rsplit(')', 1)[1].split()[0] != 'Z'
+    except OSError:
+        return True
+
+
+@pytest.fixture
+def make_executor(tmp_path):
+    """settings.json に Edit 用のフックを登録した実行エンジンを作成"""
+    def make(hooks, **settings):
+        claude_dir = tmp_path / '.claude'
+        claude_dir.mkdir(exist_ok=True)
+        (claude_dir / 'settings.json').write_text(json.dumps({
+            'hooks': {'PostToolUse': [{'matcher': 'Edit|Write', 'hooks': hooks}]}
+        }))
+        return HookExecutor(claude_dir, ExecutionSettings.from_settings(settings))
+    return make
+
+
+class TestHookExecutor:
+    """HookExecutorのテストクラス"""
+
+    def _execute(self, executor):
+        """PostToolUse の Edit として実行（内蔵フックは発火しない）"""
+        return executor.execute_hook('PostToolUse', 'Edit', {'file_path': 'a.py'}, 'session-1')
+
+    def test_settings_from_settings(self):
+        """設定から実行設定を生成（未知のキーは無視）"""
+        settings = ExecutionSettings.from_settings({'concurrent': False, 'deadline_seconds': 5, 'unknown': 1})
+
+        assert settings == ExecutionSettings(concurrent=False, deadline_seconds=5)
+
+    def test_concurrent_hooks_run_at_once(self, make_executor):
+        """同時実行では実行時間が各フックの合計にならず、結果は設定の順"""
+        executor = make_executor([_hook(_respond('allow', str(i), 0.4)) for i in range(4)])
+
+        started = time.monotonic()
+        results = self._execute(executor)
+        elapsed = time.monotonic() - started
+
+        assert [result['reason'] for result in results] == ['0', '1', '2', '3']
+        assert elapsed < 1.2
+
+    def test_serial_mode(self, make_executor):
+        """concurrent: false では設定順に1つずつ実行する"""
+        executor = make_executor([_hook(_respond('allow', str(i), 0.2)) for i in range(3)], concurrent=False)
+
+        started = time.monotonic()
+        results = self._execute(executor)
+
+        assert [result['reason'] for result in results] == ['0', '1', '2']
+        assert time.monotonic() - started >= 0.6
+
+    def test_first_block_in_config_order_wins(self, make_executor):
+        """先に完了したフックではなく、設定の順で最初の block を採用する"""
+        executor = make_executor([
+            _hook(_respond('allow', 'first')),
+            _hook(_respond('block', 'slow block', 0.3)),
+            _hook(_respond('block', 'fast block')),
+        ])
+
+        aggregated = aggregate_results(self._execute(executor))
+
+        assert aggregated == {'decision': 'block', 'reason': 'slow block', 'errors': []}
+
+    def test_deadline_kills_process_group(self, make_executor, tmp_path):
+        """全体の期限を過ぎたフックはシェルが起動した子プロセスごと終了する"""
+        pid_file = tmp_path / 'child.pid'
+        executor = make_executor([
+            _hook(_respond('allow', 'quick')),
+            _hook(f"sleep 30 & echo $! > {pid_file}; wait"),
+        ], deadline_seconds=0.5)
+
+        started = time.monotonic()
+        results = self._execute(executor)
+
+        assert time.monotonic() - started < 5
+        assert results[0]['reason'] == 'quick'
+        assert 'overall deadline' in results[1]['error']
+        child_pid = int(pid_file.read_text())
+        for _ in range(50):
+            if not _is_running(child_pid):
+                break
+            time.sleep(0.05)
+        else:
+            pytest.fail('child process of the timed out hook is still running')
+
+    @pytest.mark.parametrize('hooks', [
+        [_hook('sleep 30')],
+        [_hook(_respond('allow', 'quick')), _hook('sleep 30')],
+    ])
+    def test_deadline_applies_in_serial_mode(self, make_executor, hooks):
+        """直列実行・フックが1つの場合も全体の期限で打ち切る"""
+        executor = make_executor(hooks, concurrent=False, deadline_seconds=0.5)
+
+        started = time.monotonic()
+        results = self._execute(executor)
+
+        assert time.monotonic() - started < 5
+        assert 'overall deadline' in results[-1]['error']
+
+    def test_own_timeout_is_reported(self, make_executor):
+        """フック毎のタイムアウトが全体の期限より短い場合はタイムアウトとして記録する"""
+        executor = make_executor([_hook('sleep 5', timeout=0.3), _hook(_respond('allow'))])
+
+        results = self._execute(executor)
+
+        assert results[0]['error'] == 'Hook timed out after 0.3 seconds'
+        assert aggregate_results(results)['errors'] == ['Hook timed out after 0.3 seconds']
+
+    def test_local_settings_hooks_run(self, make_executor, tmp_path):
+        """settings.local.json のフックもプロジェクト設定の後に実行する"""
+        executor = make_executor([_hook(_respond('allow', 'project'))])
+        (tmp_path / '.claude' / 'settings.local.json').write_text(json.dumps({
+            'hooks': {'PostToolUse': [{'matcher': 'Edit', 'hooks': [_hook(_respond('warn', 'local'))]}]}
+        }))
+
+        assert [result['reason'] for result in self._execute(executor)] == ['project', 'local']
+
+
+class TestExecuteHookAsync:
+    """execute_hook_async のテストクラス"""
+
+    def _execute(self, executor):
+        """PostToolUse の Edit として実行するコルーチン"""
+        return executor.execute_hook_async('PostToolUse', 'Edit', {'file_path': 'a.py'}, 'session-1')
+
+    def test_event_loop_is_not_blocked(self, make_executor):
+        """フックの実行中も同じイベントループの他の処理が進む"""
+        executor = make_executor([_hook(_respond('allow', 'slow', 0.5))])
+
+        async def main():
+            ticks = 0
+            task = asyncio.ensure_future(self._execute(executor))
+            while not task.done():
+                await asyncio.sleep(0.01)
+                ticks += 1
+            return ticks, task.result()
+
+        ticks, results = asyncio.run(main())
+
+        assert results[0]['reason'] == 'slow'
+        assert ticks >= 20
+
+    def test_concurrency_is_bounded(self, make_executor):
+        """max_workers を超える分は空きを待って起動する"""
+        executor = make_executor([_hook(_respond('allow', str(i), 0.3)) for i in range(4)], max_workers=2)
+
+        started = time.monotonic()
+        results = asyncio.run(self._execute(executor))
+        elapsed = time.monotonic() - started
+
+        assert [result['reason'] for result in results] == ['0', '1', '2', '3']
+        assert 0.6 <= elapsed < 1.5
+
+    def test_cancellation_kills_process_group(self, make_executor, tmp_path):
+        """キャンセルされたら実行中のフックを子プロセスごと終了する"""
+        pid_file = tmp_path / 'child.pid'
+        executor = make_executor([_hook(f"sleep 30 & echo $! > {pid_file}; wait")])
+
+        async def main():
+            task = asyncio.ensure_future(self._execute(executor))
+            while not pid_file.exists() or not pid_file.read_text().strip():
+                assert not task.done(), task.result()
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(asyncio.wait_for(main(), 10))
+
+        child_pid = int(pid_file.read_text())
+        for _ in range(50):
+            if not _is_running(child_pid):
+                break
+            time.sleep(0.05)
+        else:
+            pytest.fail('child process of the cancelled hook is still running')
+
+    def test_sync_wrapper_inside_running_loop(self, make_executor):
+        """イベントループ内から同期版を呼んでも別スレッドで実行できる"""
+        executor = make_executor([_hook(_respond('block', 'from sync'))])
+
+        async def main():
+            return executor.execute_hook('PostToolUse', 'Edit', {'file_path': 'a.py'})
+
+        assert asyncio.run(main())[0]['reason'] == 'from sync'
+
+
+class TestAggregateResults:
+    """判定の集約のテストクラス"""
+
+    def test_warn_without_block(self):
+        """block が無ければ最初の warn を採用し、エラーは全て記録する"""
+        results = [
+            {'decision': 'allow', 'reason': '', 'error': 'Invalid JSON response from hook'},
+            {'decision': 'warn', 'reason': 'first warn'},
+            {'decision': 'warn', 'reason': 'second warn'},
+        ]
+
+        assert aggregate_results(results) == {
+            'decision': 'warn', 'reason': 'first warn', 'errors': ['Invalid JSON response from hook']
+        }
+
+    def test_empty(self):
+        """結果が無ければ allow"""
+        assert aggregate_results([]) == {'decision': 'allow', 'reason': '', 'errors': []}
+
+    @pytest.mark.parametrize('result, expected', [
+        ({'decision': 'block'}, 'block'),
+        ({'hookSpecificOutput': {'permissionDecision': 'deny'}}, 'block'),
+        ({'hookSpecificOutput': {'permissionDecision': 'ask'}}, 'warn'),
+        ({'continue': True}, 'allow'),
+    ])
+    def test_get_decision(self, result, expected):
+        """decision と permissionDecision の両方の形式を読み取る"""
+        assert get_decision(result) == expected
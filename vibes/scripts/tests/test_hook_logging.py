@@ -0,0 +1,69 @@
+"""フック共通ロギング設定のテスト"""
+
+import logging
+import logging.handlers
+import pytest
+from src.shared.utils.hook_logging import (
+    configure_hook_logging, get_hook_logger, shutdown_hook_logging, HOT_PATH_LOGGER
+)
+
+
+class TestHookLogging:
+    """configure_hook_loggingのテストクラス"""
+
+    @pytest.fixture(autouse=True)
+    def restore_logging(self):
+        """テスト後に出力先とレベルを元に戻す"""
+        root = logging.getLogger()
+        hot_path = logging.getLogger(HOT_PATH_LOGGER)
+        levels = (root.level, hot_path.level)
+        shutdown_hook_logging()
+        yield
+        shutdown_hook_logging()
+        root.setLevel(levels[0])
+        hot_path.setLevel(levels[1])
+
+    def _sinks(self):
+        """ルートロガーに設定された出力先"""
+        return [h for h in logging.getLogger().handlers if isinstance(h, logging.handlers.QueueHandler)]
+
+    def test_single_sink(self, tmp_path):
+        """複数回設定しても出力先は1つで、変更時のみ作り直す"""
+        configure_hook_logging({'file': str(tmp_path / 'a.log')})
+        first = self._sinks()
+        configure_hook_logging({'file': str(tmp_path / 'a.log'), 'hot_path_level': 'DEBUG'})
+
+        assert self._sinks() == first
+        assert logging.getLogger(HOT_PATH_LOGGER).level == logging.DEBUG
+
+        configure_hook_logging({'file': str(tmp_path / 'b.log')})
+
+        assert len(self._sinks()) == 1
+        assert self._sinks() != first
+
+    def test_hot_path_level_gates_messages(self, tmp_path):
+        """hot_path_level 未満のログは出力されず、引数の文字列化も行われない"""
+        log_file = tmp_path / 'hooks.log'
+        configure_hook_logging({'file': str(log_file), 'hot_path_level': 'WARNING'})
+        logger = get_hook_logger('TestHook')
+
+        class Unprintable:
+            def __str__(self):
+                raise AssertionError("formatted while disabled")
+
+        logger.info("skipped %s", Unprintable())
+        logger.warning("kept %s", 'warning')
+        shutdown_hook_logging()
+
+        content = log_file.read_text()
+        assert 'claude_hooks.TestHook WARNING: kept warning' in content
+        assert 'skipped' not in content
+
+    def test_log_file_fallback(self, tmp_path):
+        """設定に出力先が無い場合は引数の出力先を使用"""
+        log_file = tmp_path / 'fallback.log'
+        configure_hook_logging({'hot_path_level': 'DEBUG'}, log_file)
+        get_hook_logger('TestHook').debug("trace %d", 1)
+        shutdown_hook_logging()
+
+        assert 'trace 1' in log_file.read_text()
@@ -0,0 +1,83 @@
+"""フック実行時間の計測・集計のテスト"""
+
+import pytest
+from src.infrastructure.metrics.hook_metrics import PhaseTimer, HookMetricsLog, percentile, summarize
+
+
+class TestPhaseTimer:
+    """PhaseTimerのテストクラス"""
+
+    def test_phases_are_accumulated(self):
+        """同名のフェーズは合算し、タグを記録に含める"""
+        timer = PhaseTimer()
+        with timer.phase('read_input'):
+            pass
+        with pytest.raises(SystemExit):
+            with timer.phase('process'):
+                raise SystemExit(0)
+        timer.tags.update(tool='Edit', rule=None)
+
+        record = timer.to_record('Hook')
+
+        assert set(record['phases']) == {'read_input', 'process'}
+        assert record['hook'] == 'Hook'
+        assert record['tool'] == 'Edit'
+        assert 'rule' not in record
+        assert record['total'] >= max(record['phases'].values())
+
+
+class TestHookMetricsLog:
+    """HookMetricsLogのテストクラス"""
+
+    def test_append_and_read(self, tmp_path):
+        """追記した記録を古い順に読み込み、壊れた行は無視する"""
+        log = HookMetricsLog(tmp_path / 'metrics.ndjson')
+        log.append({'hook': 'A', 'total': 1.0})
+        with open(log.path, 'a') as f:
+            f.write('{broken\n')
+        log.append({'hook': 'B', 'total': 2.0})
+
+        assert [record['hook'] for record in log.read()] == ['A', 'B']
+
+    def test_rotation(self, tmp_path):
+        """上限サイズを超えたら .1 へローテーションし、両方を読み込む"""
+        log = HookMetricsLog(tmp_path / 'metrics.ndjson', max_bytes=1)
+        log.append({'hook': 'A'})
+        log.append({'hook': 'B'})
+
+        assert not log.path.exists()
+        assert [record['hook'] for record in log.read()] == ['B']
+
+        log.max_bytes = 1024
+        log.append({'hook': 'C'})
+        assert [record['hook'] for record in log.read()] == ['B', 'C']
+
+
+class TestSummarize:
+    """集計のテストクラス"""
+
+    def test_percentile_nearest_rank(self):
+        """nearest-rank法のパーセンタイル"""
+        values = list(range(1, 101))
+
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 99) == 99
+        assert percentile([7], 99) == 7
+        assert percentile([], 50) == 0.0
+
+    def test_group_by_hook_tool_rule(self):
+        """フック・ツール・規約の組み合わせ毎に件数の多い順で集計する"""
+        records = [
+            {'hook': 'H', 'tool': 'Edit', 'rule': 'R', 'total': float(i), 'phases': {'process': i / 2}}
+            for i in range(1, 11)
+        ] + [{'hook': 'H', 'tool': 'Bash', 'total': 3.0, 'phases': {}}]
+
+        summaries = summarize(records)
+
+        assert [(s['tool'], s['rule'], s['count']) for s in summaries] == [('Edit', 'R', 10), ('Bash', '-', 1)]
+        assert summaries[0]['total'] == {'p50': 5.0, 'p95': 10.0, 'p99': 10.0}
+        assert summaries[0]['phases']['process']['p50'] == 2.5
+
+        by_hook = summarize(records, group_by=['hook'])
+        assert len(by_hook) == 1 and by_hook[0]['count'] == 11
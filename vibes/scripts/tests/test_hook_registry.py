@@ -0,0 +1,107 @@
+"""内蔵フックのインスタンスのレジストリのテスト"""
+
+import os
+import json
+import pytest
+from pathlib import Path
+import sys
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from src.infrastructure.hooks.hook_registry import HookInstanceRegistry
+from src.infrastructure.hooks.hook_executor import HookExecutor
+
+
+class FakeHook:
+    """生成回数を記録するフック"""
+
+    created = 0
+    watched_files = []
+
+    def __init__(self):
+        FakeHook.created += 1
+
+    def get_watched_files(self):
+        return FakeHook.watched_files
+
+
+@pytest.fixture
+def watched_file(tmp_path):
+    """監視対象ファイル"""
+    path = tmp_path / 'rules.yaml'
+    path.write_text('rules: []\n')
+    FakeHook.created = 0
+    FakeHook.watched_files = [path]
+    yield path
+    FakeHook.watched_files = []
+
+
+class TestHookInstanceRegistry:
+    """HookInstanceRegistryのテストクラス"""
+
+    def test_instance_is_reused(self, watched_file):
+        """同じフック名では同じインスタンスを返し、生成は初回のみ"""
+        registry = HookInstanceRegistry({'fake': FakeHook})
+
+        first = registry.get('fake')
+
+        assert registry.get('fake') is first
+        assert FakeHook.created == 1
+
+    def test_reload(self, watched_file):
+        """reload() の後は生成し直す（フック名を省略すると全て）"""
+        registry = HookInstanceRegistry({'fake': FakeHook, 'other': FakeHook})
+        registry.warm_up()
+        first = registry.get('fake')
+
+        registry.reload('fake')
+        assert not registry.is_loaded('fake')
+        assert registry.is_loaded('other')
+        assert registry.get('fake') is not first
+
+        registry.reload()
+        assert not registry.is_loaded('other')
+        assert FakeHook.created == 3
+
+    def test_watched_file_change_recreates(self, watched_file):
+        """監視対象ファイルが更新されたら自動で生成し直す"""
+        registry = HookInstanceRegistry({'fake': FakeHook})
+        first = registry.get('fake')
+
+        watched_file.write_text('rules: [changed]\n')
+        stat = watched_file.stat()
+        os.utime(watched_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert registry.get('fake') is not first
+
+    def test_unknown_hook(self):
+        """登録されていないフック名はKeyError"""
+        with pytest.raises(KeyError):
+            HookInstanceRegistry({}).get('missing')
+
+
+class TestBuiltinHookReuse:
+    """HookExecutorの内蔵フックの再利用のテストクラス"""
+
+    @pytest.fixture
+    def executor(self, tmp_path, isolated_hook_state):
+        """フック設定の無い実行エンジン"""
+        claude_dir = tmp_path / '.claude'
+        claude_dir.mkdir()
+        (claude_dir / 'settings.json').write_text(json.dumps({'hooks': {}}))
+        return HookExecutor(claude_dir)
+
+    def _execute(self, executor):
+        """規約に該当しないファイルの Edit を実行"""
+        return executor.execute_hook('PreToolUse', 'Edit', {'file_path': '/tmp/not_a_convention_target.txt'})
+
+    def test_builtin_hook_instance_is_reused(self, executor):
+        """内蔵フックのインスタンスは実行間で再利用し、reload_builtin_hooks() で生成し直す"""
+        self._execute(executor)
+        first = executor.builtin_registry.get('implementation_design').hook
+
+        self._execute(executor)
+        assert executor.builtin_registry.get('implementation_design').hook is first
+
+        executor.reload_builtin_hooks()
+        self._execute(executor)
+        assert executor.builtin_registry.get('implementation_design').hook is not first
@@ -0,0 +1,121 @@
+"""フックのルーティングテーブルのテスト"""
+
+import os
+import json
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+import sys
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from src.domain.services.hook_routing import CompiledMatcher, HookRoutingTable
+from src.domain.services.hook_manager import HookManager
+
+
+def _hook(command: str) -> dict:
+    """コマンドフックの設定"""
+    return {'type': 'command', 'command': command}
+
+
+def _settings(*entries) -> dict:
+    """PreToolUse の (マッチャー, コマンド) からなる設定"""
+    return {'hooks': {'PreToolUse': [{'matcher': matcher, 'hooks': [_hook(command)]} for matcher, command in entries]}}
+
+
+class TestCompiledMatcher:
+    """CompiledMatcherのテストクラス"""
+
+    @pytest.mark.parametrize('matcher, tool_name, expected', [
+        ('', 'Edit', True),
+        ('Edit', 'Edit', True),
+        ('Edit', 'Editor', False),
+        ('Edit|Write', 'Write', True),
+        ('Edit | Write', 'Write', True),
+        ('Edit|Write', 'Read', False),
+        ('mcp__serena__*', 'mcp__serena__find_symbol', True),
+        ('mcp__serena__*', 'mcp__other__find', False),
+        ('Bash|mcp__*__read', 'mcp__fs__read', True),
+        ('Bash|mcp__*__read', 'mcp__fs__write', False),
+        ('Edit?', 'Edit?', True),
+    ])
+    def test_matches(self, matcher, tool_name, expected):
+        """完全一致・'|' 区切り・ワイルドカードの判定"""
+        assert CompiledMatcher(matcher).matches(tool_name) is expected
+
+
+class TestHookRoutingTable:
+    """HookRoutingTableのテストクラス"""
+
+    def test_route_keeps_settings_order(self):
+        """該当するフックを設定の順（先の設定が先）に返す"""
+        table = HookRoutingTable.compile([
+            _settings(('Edit|Write', 'project-edit'), ('', 'project-all'), ('Read', 'project-read')),
+            _settings(('Edit', 'local-edit')),
+        ])
+
+        commands = [hook['command'] for hook in table.route('PreToolUse', 'Edit')]
+
+        assert commands == ['project-edit', 'project-all', 'local-edit']
+        assert table.route('PostToolUse', 'Edit') == []
+
+    def test_route_is_memoized(self):
+        """同じツール名の2回目以降はマッチャーを評価しない"""
+        table = HookRoutingTable.compile([_settings(('Edit', 'a'), ('mcp__*', 'b'))])
+        first = table.route('PreToolUse', 'Edit')
+
+        with patch.object(CompiledMatcher, 'matches', side_effect=AssertionError('not memoized')):
+            assert table.route('PreToolUse', 'Edit') is first
+
+    def test_invalid_entries_are_ignored(self):
+        """hooks が辞書でない設定・辞書でないエントリは無視する"""
+        table = HookRoutingTable.compile([{'hooks': []}, {}, {'hooks': {'PreToolUse': ['bad', {'hooks': [_hook('ok')]}]}}])
+
+        assert [hook['command'] for hook in table.route('PreToolUse', 'Bash')] == ['ok']
+        assert [hook['command'] for hook in table.hooks()] == ['ok']
+
+
+class TestHookManagerRoutingTable:
+    """HookManager.get_routing_table のテストクラス"""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        """プロジェクト設定とローカル設定を持つHookManager"""
+        claude_dir = tmp_path / '.claude'
+        claude_dir.mkdir()
+        (claude_dir / 'settings.json').write_text(json.dumps(_settings(('Edit', 'project'))))
+        (claude_dir / 'settings.local.json').write_text(json.dumps(_settings(('Edit', 'local'))))
+        return HookManager(claude_dir)
+
+    def _commands(self, manager):
+        return [hook['command'] for hook in manager.get_routing_table().route('PreToolUse', 'Edit')]
+
+    def test_merges_local_settings(self, manager):
+        """ローカル設定のフックはプロジェクト設定の後に実行する"""
+        assert self._commands(manager) == ['project', 'local']
+
+    def test_cached_until_settings_change(self, manager):
+        """設定ファイルが変わるまでは読み込み直さず、更新されたら構築し直す"""
+        table = manager.get_routing_table()
+        with patch.object(HookManager, 'load_settings', side_effect=AssertionError('reloaded')):
+            assert manager.get_routing_table() is table
+
+        local_file = manager.settings_local_file
+        local_file.write_text(json.dumps(_settings(('Edit', 'local-updated'))))
+        stat = local_file.stat()
+        os.utime(local_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert self._commands(manager) == ['project', 'local-updated']
+
+    def test_deleted_local_settings(self, manager):
+        """ローカル設定が削除されたらプロジェクト設定のみ"""
+        manager.get_routing_table()
+        manager.settings_local_file.unlink()
+
+        assert self._commands(manager) == ['project']
+
+    def test_add_hook_invalidates(self, manager):
+        """add_hook で保存した設定はすぐに反映する"""
+        manager.get_routing_table()
+        manager.add_hook('PreToolUse', 'Edit', 'added')
+
+        assert self._commands(manager) == ['project', 'added', 'local']
@@ -1,5 +1,6 @@
 """ImplementationDesignHookのテスト"""
 
+import io
 import pytest
 import json
 import tempfile
@@ -9,21 +10,28 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 from src.domain.hooks.implementation_design_hook import ImplementationDesignHook
+from src.infrastructure.markers.marker_store import MarkerStore
+from src.infrastructure.metrics.hook_metrics import HookMetricsLog
+from src.infrastructure.transcript.transcript_reader import UsageState
 
 
 class TestImplementationDesignHook:
     """ImplementationDesignHookのテストクラス"""
 
     @pytest.fixture
-    def hook(self):
+    def hook(self, tmp_path):
         """テスト用フックインスタンス"""
         with tempfile.NamedTemporaryFile(delete=False) as f:
             log_file = Path(f.name)
         
         hook = ImplementationDesignHook(log_file=log_file, debug=False)
+        hook.marker_store = MarkerStore(tmp_path / 'markers.db', legacy_dir=None)
+        hook._metrics_log = HookMetricsLog(tmp_path / 'metrics.ndjson')
+        hook._metrics_loaded = True
         yield hook
         
         # クリーンアップ
+        hook.marker_store.close()
         log_file.unlink(missing_ok=True)
 
     def test_should_process_with_matching_file(self, hook):
@@ -141,8 +149,8 @@ class TestImplementationDesignHook:
         assert hook.is_session_processed(session_id)
         
         # クリーンアップ
-        marker_path = hook.get_session_marker_path(session_id)
-        marker_path.unlink()
+        hook.marker_store.delete(hook.get_session_marker_key(session_id))
+        assert not hook.is_session_processed(session_id)
 
     @patch('sys.stdin')
     @patch('builtins.print')
@@ -181,6 +189,33 @@ class TestImplementationDesignHook:
             assert output_data['decision'] == 'block'
             assert 'Blocked for testing' in output_data['reason']
 
+    def test_run_records_phase_metrics(self, hook):
+        """run はフェーズ別の所要時間をツール名・規約名と共に記録する"""
+        input_data = {
+            'session_id': 'test_session',
+            'tool_name': 'Edit',
+            'tool_input': {'file_path': 'test/実装設計書.pu'}
+        }
+
+        with patch.object(hook.matcher, 'get_confirmation_message') as mock_get_message:
+            mock_get_message.return_value = {
+                'rule_name': 'Test Rule',
+                'severity': 'block',
+                'message': 'Blocked for testing',
+                'convention_doc': '@test/doc.md'
+            }
+            hook.run(io.StringIO(json.dumps(input_data)), io.StringIO())
+
+        records = list(hook.metrics_log.read())
+        assert len(records) == 1
+        record = records[0]
+        assert record['hook'] == 'ImplementationDesignHook'
+        assert record['tool'] == 'Edit'
+        assert record['rule'] == 'Test Rule'
+        assert record['decision'] == 'block'
+        assert {'read_input', 'marker_check', 'should_process', 'process', 'output'} <= set(record['phases'])
+        assert record['total'] >= record['phases']['process']
+
     @patch('sys.stdin')
     def test_run_with_invalid_json(self, mock_stdin, hook):
         """無効なJSON入力での実行テスト"""
@@ -188,4 +223,132 @@ class TestImplementationDesignHook:
         
         # エラーが発生してもクラッシュしないことを確認
         exit_code = hook.run()
-        assert exit_code == 0  # 無効な入力は無視される
\ No newline at end of file
+        assert exit_code == 0  # 無効な入力は無視される
+
+    def test_context_size_computed_once_per_invocation(self, hook, tmp_path):
+        """1回の呼び出し内でtranscript読み取りと規約マッチングが共有されるテスト"""
+        session_id = 'test_session_context_cache'
+        rule_name = 'Context Cache Rule'
+        input_data = {
+            'session_id': session_id,
+            'transcript_path': str(tmp_path / 'transcript.jsonl'),
+            'tool_input': {
+                'file_path': 'test/実装設計書.pu'
+            }
+        }
+        hook.marker_store.put(hook.get_rule_marker_key(session_id, rule_name), {'tokens': 0})
+        
+        with patch.object(hook.matcher, 'get_confirmation_message') as mock_get_message, \
+             patch.object(hook, '_get_usage_state',
+                          return_value=UsageState({'input_tokens': 100000}, 100000)) as mock_size:
+            mock_get_message.return_value = {
+                'rule_name': rule_name,
+                'severity': 'block',
+                'message': 'Context cache test',
+                'token_threshold': 1000
+            }
+            
+            assert hook.should_process(input_data) is True
+            result = hook.process(input_data)
+            
+            assert result['decision'] == 'block'
+            mock_get_message.assert_called_once()
+            mock_size.assert_called_once()
+
+    @pytest.mark.parametrize('marker_data, state, expected', [
+        # コンパクションでコンテキストが減少しても再ブロックしない
+        ({'tokens': 150000, 'cumulative_tokens': 150000}, UsageState({'input_tokens': 20000}, 150000), False),
+        # コンパクション後の増加分のみで閾値を判定する
+        ({'tokens': 150000, 'cumulative_tokens': 150000}, UsageState({'input_tokens': 21500}, 151500), True),
+        # 累積トークン数の無い旧形式のマーカーは減少を0として扱う
+        ({'tokens': 150000}, UsageState({'input_tokens': 20000}, 20000), False),
+    ])
+    def test_rule_threshold_uses_cumulative_tokens(self, hook, tmp_path, marker_data, state, expected):
+        """規約の閾値判定はマーカー作成時からの累積トークン数の増加量で行うテスト"""
+        session_id = 'test_session_compaction'
+        rule_name = 'Compaction Rule'
+        input_data = {
+            'session_id': session_id,
+            'transcript_path': str(tmp_path / 'transcript.jsonl'),
+            'tool_input': {'file_path': 'test/実装設計書.pu'}
+        }
+        hook.marker_store.put(hook.get_rule_marker_key(session_id, rule_name), marker_data)
+
+        with patch.object(hook.matcher, 'get_confirmation_message') as mock_get_message, \
+             patch.object(hook, '_get_usage_state', return_value=state):
+            mock_get_message.return_value = {
+                'rule_name': rule_name,
+                'severity': 'block',
+                'message': 'Compaction test',
+                'token_threshold': 1000
+            }
+
+            assert hook.should_process(input_data) is expected
+
+    def test_rule_threshold_after_checkpoint_reset(self, hook, tmp_path):
+        """チェックポイントが削除され累積トークン数が数え直されても、閾値判定が負の増加量にならないテスト"""
+        session_id = 'test_session_checkpoint_reset'
+        rule_name = 'Reset Rule'
+        transcript = tmp_path / 'transcript.jsonl'
+        hook.transcript_reader.checkpoint_dir = tmp_path
+        input_data = {
+            'session_id': session_id,
+            'transcript_path': str(transcript),
+            'tool_input': {'file_path': 'test/実装設計書.pu'}
+        }
+
+        def append_usage(input_tokens):
+            with open(transcript, 'a') as f:
+                f.write(json.dumps({'type': 'assistant', 'message': {'usage': {'input_tokens': input_tokens}}}) + '\n')
+
+        append_usage(5000)
+        append_usage(8000)
+        state = hook.get_usage_state(dict(input_data))
+        hook.mark_rule_processed(session_id, rule_name, 1000, state.cumulative_tokens)
+        assert state.cumulative_tokens == 8000
+
+        # チェックポイントの削除後は現在のコンテキストサイズから数え直す（累積トークン数 < マーカー）
+        hook.transcript_reader.get_checkpoint_path(str(transcript)).unlink()
+        append_usage(2500)
+
+        with patch.object(hook.matcher, 'get_confirmation_message') as mock_get_message:
+            mock_get_message.return_value = {
+                'rule_name': rule_name,
+                'severity': 'block',
+                'message': 'Checkpoint reset test',
+                'token_threshold': 1000
+            }
+            fresh_input = dict(input_data)
+            assert hook.get_usage_state(fresh_input).cumulative_tokens == 2500
+            assert hook.tokens_since_marker(fresh_input, hook.read_marker(
+                fresh_input, hook.get_rule_marker_key(session_id, rule_name))) == 1500
+            assert hook.should_process(dict(input_data)) is True
+
+    def test_rule_marker_records_cumulative_tokens(self, hook, tmp_path):
+        """規約マーカーに累積トークン数を記録するテスト"""
+        session_id = 'test_session_cumulative'
+        input_data = {
+            'session_id': session_id,
+            'transcript_path': str(tmp_path / 'transcript.jsonl'),
+            'tool_input': {'file_path': 'test/実装設計書.pu'}
+        }
+
+        with patch.object(hook.matcher, 'get_confirmation_message') as mock_get_message, \
+             patch.object(hook, '_get_usage_state', return_value=UsageState({'input_tokens': 800}, 5000)):
+            mock_get_message.return_value = {
+                'rule_name': 'Cumulative Rule',
+                'severity': 'block',
+                'message': 'Cumulative test'
+            }
+            hook.process(input_data)
+
+        marker_data = hook.marker_store.get(hook.get_rule_marker_key(session_id, 'Cumulative Rule'))
+        assert (marker_data['tokens'], marker_data['cumulative_tokens']) == (800, 5000)
+
+    def test_context_is_scoped_to_input_data(self, hook):
+        """異なる入力データでは別のコンテキストが作られるテスト"""
+        first = {'session_id': 'a'}
+        second = {'session_id': 'a'}
+        
+        assert hook.get_context(first) is hook.get_context(first)
+        assert hook.get_context(first) is not hook.get_context(second)
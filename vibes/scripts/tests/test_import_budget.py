@@ -0,0 +1,86 @@
+"""フック・CLIエントリーポイントの起動時importのテスト
+
+フックの import 時間の上限は環境変数 HOOK_IMPORT_BUDGET_MS（既定: 200ms）で変更できる。
+"""
+
+import os
+import sys
+import subprocess
+from pathlib import Path
+import pytest
+
+SCRIPTS_DIR = Path(__file__).parent.parent
+SRC_DIR = SCRIPTS_DIR / 'src'
+
+HOOK_MODULE = 'domain.hooks.implementation_design_hook'
+DEFAULT_BUDGET_MS = 200.0
+
+# フック・CLIの起動時に読み込まれてはならない重いモジュール
+HOOK_DEFERRED_MODULES = (
+    'yaml', 'json5', 'questionary', 'rich', 'prompt_toolkit', 'random',
+    'domain.services.file_convention_matcher', 'domain.services.command_convention_matcher',
+)
+CLI_DEFERRED_MODULES = ('questionary', 'prompt_toolkit', 'rich', 'json5', 'application.document_management',
+                        'infrastructure.metrics.hook_metrics')
+
+
+def _run_python(*args: str, cwd: Path) -> subprocess.CompletedProcess:
+    """新しいインタプリタで実行（import済みのモジュールの影響を受けないように）"""
+    env = {k: v for k, v in os.environ.items() if k != 'PYTHONPROFILEIMPORTTIME'}
+    return subprocess.run([sys.executable, *args], cwd=cwd, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def _import_time_ms(module: str) -> float:
+    """-X importtime で計測したモジュールの累積import時間（ミリ秒）"""
+    result = _run_python('-X', 'importtime', '-c', f'import {module}', cwd=SRC_DIR)
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise AssertionError(f'{module} not found in importtime output')
+
+
+def _loaded_modules(code: str, cwd: Path) -> set:
+    """コードを実行した後に読み込まれているモジュール名"""
+    result = _run_python('-c', f'{code}\nimport sys\nprint("\\n".join(sys.modules))', cwd=cwd)
+    return set(result.stdout.split())
+
+
+class TestHookImportBudget:
+    """フックのimportのテストクラス"""
+
+    def test_import_time_within_budget(self):
+        """フックのimport時間が上限以内（3回の最小値で判定）"""
+        budget = float(os.environ.get('HOOK_IMPORT_BUDGET_MS', DEFAULT_BUDGET_MS))
+        elapsed = min(_import_time_ms(HOOK_MODULE) for _ in range(3))
+
+        assert elapsed <= budget, f'{HOOK_MODULE} import took {elapsed:.1f} ms (budget {budget:.0f} ms)'
+
+    def test_heavy_modules_are_deferred(self):
+        """規約マッチャー・YAML・json5 はフックのimport時に読み込まない"""
+        loaded = _loaded_modules(f'import {HOOK_MODULE}', SRC_DIR)
+
+        assert HOOK_MODULE in loaded
+        assert [name for name in HOOK_DEFERRED_MODULES if name in loaded] == []
+
+
+class TestCliImports:
+    """main.pyのimportのテストクラス"""
+
+    @pytest.mark.parametrize('argv', [['--version'], ['--help']])
+    def test_argument_parsing_skips_interactive_modules(self, argv):
+        """引数解析・--version では対話用ライブラリとオーケストレータを読み込まない"""
+        code = f'import sys; sys.argv = ["main.py", *{argv!r}]\nimport main\ntry:\n    main.main()\nexcept SystemExit:\n    pass'
+        loaded = _loaded_modules(code, SCRIPTS_DIR)
+
+        assert 'application.cli_options' in loaded
+        assert [name for name in CLI_DEFERRED_MODULES if name in loaded] == []
+
+    def test_metrics_group_fields_match(self):
+        """引数解析用の集計単位は hook_metrics の定義と同じ"""
+        sys.path.append(str(SRC_DIR))
+        from application.cli_options import METRICS_GROUP_FIELDS
+        from infrastructure.metrics.hook_metrics import GROUP_FIELDS
+
+        assert METRICS_GROUP_FIELDS == GROUP_FIELDS
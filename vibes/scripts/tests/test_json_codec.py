@@ -0,0 +1,113 @@
+"""json_codec（orjson / 標準jsonの切り替え）のテスト"""
+
+import json
+import pytest
+from src.shared.utils import json_codec
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def backend(request, monkeypatch):
+    """orjsonを使う場合と標準のjsonのみの場合の両方で実行"""
+    if request.param == 'orjson':
+        if json_codec.orjson is None:
+            pytest.skip('orjson is not installed')
+    else:
+        monkeypatch.setattr(json_codec, 'orjson', None)
+    return request.param
+
+
+class TestLoads:
+    """loadsのテストクラス"""
+
+    @pytest.mark.parametrize('text', [
+        '{"a": [1, 2.5, true, null], "日本語": "値"}',
+        '[NaN, Infinity]',
+        '[9223372036854775807, -9223372036854775808, 18446744073709551615]',
+        '"\\ud800"',
+    ])
+    def test_same_result_as_json(self, backend, text):
+        """標準のjsonと同じ結果（orjsonが受け付けない入力も含む）"""
+        expected = json.loads(text)
+        result = json_codec.loads(text)
+        assert repr(result) == repr(expected)
+        assert repr(json_codec.loads(text.encode('utf-8'))) == repr(expected)
+
+    def test_invalid_json(self, backend):
+        """不正なJSONは JSONDecodeError（ValueError）"""
+        with pytest.raises(json_codec.JSONDecodeError):
+            json_codec.loads('{"a": ')
+        with pytest.raises(ValueError):
+            json_codec.loads('')
+
+    def test_invalid_utf8(self, backend):
+        """UTF-8として不正なバイト列は標準のjsonと同じく UnicodeDecodeError"""
+        with pytest.raises(UnicodeDecodeError):
+            json_codec.loads(b'{"a": "\xff"}')
+
+
+class TestDumps:
+    """dumpsのテストクラス"""
+
+    DATA = {'hookSpecificOutput': {'permissionDecision': 'deny', 'reason': '規約を確認 ✅'}, 'n': [1, 2.5, None]}
+
+    @pytest.mark.parametrize('ensure_ascii', [True, False])
+    @pytest.mark.parametrize('indent', [None, 2, 4])
+    def test_matches_json(self, backend, ensure_ascii, indent):
+        """dumps の出力は標準の json.dumps と同じ（区切り文字・浮動小数点数の表記を含む）"""
+        data = {**self.DATA, 'floats': [1e16, 1e-07, 0.1, -0.0], '空': {}, 'list': []}
+
+        assert (json_codec.dumps(data, ensure_ascii=ensure_ascii, indent=indent)
+                == json.dumps(data, ensure_ascii=ensure_ascii, indent=indent))
+
+    def test_dumps_compact(self, backend):
+        """dumps_compact は区切り文字に空白を入れず、非ASCII文字をそのまま出力する"""
+        text = json_codec.dumps_compact(self.DATA)
+
+        assert '規約を確認 ✅' in text
+        assert json.loads(text) == self.DATA
+        assert ' ' not in text.replace('規約を確認 ✅', '')
+        assert json_codec.dumps_compact(self.DATA, ensure_ascii=True) == json.dumps(self.DATA, separators=(',', ':'))
+
+    def test_ensure_ascii_default(self, backend):
+        """既定では標準のjsonと同様に非ASCII文字をエスケープする"""
+        text = json_codec.dumps(self.DATA)
+
+        assert text.isascii()
+        assert json.loads(text) == self.DATA
+
+    def test_indent_matches_json(self, backend):
+        """indent=2 の出力は標準のjsonと同じ"""
+        data = {'hooks': {'PreToolUse': [{'matcher': 'Edit', 'hooks': []}]}, '名前': {}}
+
+        assert json_codec.dumps(data, ensure_ascii=False, indent=2) == json.dumps(data, ensure_ascii=False, indent=2)
+
+    def test_values_orjson_cannot_encode(self, backend):
+        """64bitを超える整数・文字列以外のキーも標準のjsonと同じく変換する"""
+        data = {1: 10 ** 30, None: True}
+
+        assert json.loads(json_codec.dumps(data, ensure_ascii=False)) == {'1': 10 ** 30, 'null': True}
+        assert json.loads(json_codec.dumps_compact(data)) == {'1': 10 ** 30, 'null': True}
+
+    def test_dumps_bytes(self, backend):
+        """dumps_bytes は1行のUTF-8バイト列"""
+        line = json_codec.dumps_bytes(self.DATA)
+
+        assert isinstance(line, bytes)
+        assert b'\n' not in line
+        assert json.loads(line.decode('utf-8')) == self.DATA
+
+
+class TestFiles:
+    """load / dumpのテストクラス"""
+
+    def test_round_trip(self, backend, tmp_path):
+        """ファイルへの書き込みと読み込み"""
+        path = tmp_path / 'settings.json'
+        data = {'hooks': {'名前': [1, 2]}}
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json_codec.dump(data, f, ensure_ascii=False, indent=2)
+        with open(path, 'r', encoding='utf-8') as f:
+            assert json_codec.load(f) == data
+        with open(path, 'rb') as f:
+            assert json_codec.load(f) == data
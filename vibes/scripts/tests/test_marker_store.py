@@ -0,0 +1,218 @@
+"""MarkerStoreのテスト"""
+
+import json
+import pytest
+from src.infrastructure.markers.marker_store import MarkerStore, MarkerKey
+
+
+class TestMarkerStore:
+    """MarkerStoreのテストクラス"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """一時ディレクトリのマーカーストア"""
+        store = MarkerStore(tmp_path / 'markers.db', legacy_dir=None)
+        yield store
+        store.close()
+
+    def test_put_and_get(self, store):
+        """作成したマーカーを取得できる"""
+        marker = MarkerKey('Hook', 'session-1', 'rule', 'abcd1234')
+        store.put(marker, {'tokens': 100, 'timestamp': '2024-01-01T00:00:00', 'rule_name': 'R'})
+
+        assert store.get(marker) == {'tokens': 100, 'timestamp': '2024-01-01T00:00:00', 'rule_name': 'R'}
+        assert store.exists(marker)
+        assert store.get(MarkerKey('Hook', 'session-2', 'rule', 'abcd1234')) is None
+
+    def test_put_upserts(self, store):
+        """同じ識別子への書き込みは上書き"""
+        marker = MarkerKey('Hook', 'session-1', 'session')
+        store.put(marker, {'tokens': 1})
+        store.put(marker, {'tokens': 2})
+
+        assert store.get(marker)['tokens'] == 2
+        row = store.connection.execute("SELECT COUNT(*) FROM markers").fetchone()
+        assert row[0] == 1
+
+    def test_expire_moves_marker_to_history(self, store):
+        """期限切れマーカーは履歴に移動する"""
+        marker = MarkerKey('Hook', 'session-1', 'session')
+        store.put(marker, {'tokens': 10})
+
+        assert store.expire(marker) is True
+        assert store.get(marker) is None
+        assert store.count_history(marker) == 1
+        assert store.expire(marker) is False
+
+    def test_expired_count(self, store):
+        """期限切れ回数はカウンタで保持される"""
+        marker = MarkerKey('Hook', 'session-1', 'startup')
+        assert store.get_expired_count(marker) == 0
+
+        for tokens in (1, 2, 3):
+            store.put(marker, {'tokens': tokens})
+            store.expire(marker)
+
+        assert store.get_expired_count(marker) == 3
+        assert store.get_expired_count(MarkerKey('Hook', 'session-2', 'startup')) == 0
+
+    def test_upgrade_from_v1_backfills_counters(self, tmp_path):
+        """v1のデータベースは履歴から期限切れ回数を作成する"""
+        store = MarkerStore(tmp_path / 'markers.db', legacy_dir=None)
+        marker = MarkerKey('Hook', 'session-1', 'startup')
+        store.put(marker, {'tokens': 1})
+        store.expire(marker)
+        store.put(marker, {'tokens': 2})
+        store.expire(marker)
+        store.connection.execute("DELETE FROM marker_counters")
+        store.connection.execute("UPDATE meta SET value = '1' WHERE name = 'schema_version'")
+        store.close()
+
+        store = MarkerStore(tmp_path / 'markers.db', legacy_dir=None)
+        try:
+            assert store.get_expired_count(marker) == 2
+        finally:
+            store.close()
+
+    def test_delete(self, store):
+        """マーカーと履歴を削除する"""
+        marker = MarkerKey('Hook', 'session-1', 'session')
+        store.put(marker, {'tokens': 10})
+        store.expire(marker)
+        store.put(marker, {'tokens': 20})
+
+        store.delete(marker)
+
+        assert not store.exists(marker)
+        assert store.count_history(marker) == 0
+
+    def test_wal_mode(self, store):
+        """WALモードで開かれる"""
+        assert store.connection.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+
+    def test_lookup_uses_primary_key(self, store):
+        """検索は主キーのインデックスを使用する"""
+        plan = store.connection.execute(
+            "EXPLAIN QUERY PLAN SELECT data FROM markers "
+            "WHERE hook = ? AND session_id = ? AND kind = ? AND key = ?",
+            ('h', 's', 'k', '')
+        ).fetchall()
+
+        assert any('PRIMARY KEY' in row[-1] or 'INDEX' in row[-1] for row in plan)
+
+    def test_shared_between_connections(self, tmp_path):
+        """別の接続（別プロセス相当）から書き込みを参照できる"""
+        marker = MarkerKey('Hook', 'session-1', 'command', '0123abcd')
+        writer = MarkerStore(tmp_path / 'markers.db', legacy_dir=None)
+        reader = MarkerStore(tmp_path / 'markers.db', legacy_dir=None)
+        try:
+            writer.put(marker, {'tokens': 5})
+            assert reader.get(marker) == {'tokens': 5}
+        finally:
+            writer.close()
+            reader.close()
+
+    def test_transcript_usage_cache(self, store):
+        """inode・サイズが一致する場合のみ共有キャッシュを返す"""
+        usage = {'input_tokens': 10}
+        store.put_transcript_usage('/t.jsonl', 1, 100, usage, 30)
+
+        assert store.get_transcript_usage('/t.jsonl', 1, 100) == (usage, 30)
+        assert store.get_transcript_usage('/t.jsonl', 1, 120) is None
+        assert store.get_transcript_usage('/t.jsonl', 2, 100) is None
+
+        store.put_transcript_usage('/empty.jsonl', 1, 0, None)
+        assert store.get_transcript_usage('/empty.jsonl', 1, 0) == (None, 0)
+
+    def test_transcript_usage_keeps_newer_entry(self, store):
+        """同じinodeで古いサイズの結果は新しいエントリを上書きしない"""
+        store.put_transcript_usage('/t.jsonl', 1, 200, {'input_tokens': 20}, 20)
+        store.put_transcript_usage('/t.jsonl', 1, 100, {'input_tokens': 10}, 10)
+        assert store.get_transcript_usage('/t.jsonl', 1, 200) == ({'input_tokens': 20}, 20)
+
+        store.put_transcript_usage('/t.jsonl', 2, 50, {'input_tokens': 5}, 5)
+        assert store.get_transcript_usage('/t.jsonl', 2, 50) == ({'input_tokens': 5}, 5)
+
+    def test_upgrade_from_v3_resets_usage_cache(self, tmp_path):
+        """v3のデータベースはusageキャッシュに累積トークン数の列を追加し、既存の行を破棄する"""
+        store = MarkerStore(tmp_path / 'markers.db', legacy_dir=None)
+        conn = store.connection
+        conn.execute("DROP TABLE transcript_usage")
+        conn.execute("CREATE TABLE transcript_usage (transcript_path TEXT PRIMARY KEY, inode INTEGER NOT NULL, "
+                     "size INTEGER NOT NULL, updated_at TEXT NOT NULL, usage TEXT NOT NULL) WITHOUT ROWID")
+        conn.execute("INSERT INTO transcript_usage VALUES ('/t.jsonl', 1, 10, '2024-01-01T00:00:00', 'null')")
+        conn.execute("UPDATE meta SET value = '3' WHERE name = 'schema_version'")
+        store.close()
+
+        store = MarkerStore(tmp_path / 'markers.db', legacy_dir=None)
+        try:
+            assert store.get_transcript_usage('/t.jsonl', 1, 10) is None
+            store.put_transcript_usage('/t.jsonl', 1, 10, None, 5)
+            assert store.get_transcript_usage('/t.jsonl', 1, 10) == (None, 5)
+        finally:
+            store.close()
+
+
+class TestLegacyMigration:
+    """旧形式マーカーファイルの移行のテストクラス"""
+
+    @pytest.fixture
+    def legacy_dir(self, tmp_path):
+        """旧形式のマーカーファイルを配置したディレクトリ"""
+        legacy = tmp_path / 'legacy'
+        legacy.mkdir()
+        (legacy / 'claude_hook_ImplementationDesignHook_session_abc-123').write_text(
+            json.dumps({'tokens': 100, 'timestamp': '2024-01-01T00:00:00', 'session_id': 'abc-123'}))
+        (legacy / 'claude_hook_ImplementationDesignHook_session_abc-123.expired_20240101_000000').write_text(
+            json.dumps({'tokens': 50}))
+        (legacy / 'claude_rule_ImplementationDesignHook_abc-123_0123abcd').write_text(json.dumps({'tokens': 7}))
+        (legacy / 'claude_cmd_abc-123_89abcdef').write_text(json.dumps({'tokens': 3}))
+        (legacy / 'claude_session_startup_abc-123').write_text(json.dumps({'tokens': 1}))
+        (legacy / 'claude_session_startup_abc-123.expired_20240102_000000').write_text('')
+        (legacy / 'claude_hooks_debug.log').write_text('log')
+        return legacy
+
+    def test_migrates_legacy_files(self, tmp_path, legacy_dir):
+        """旧形式のマーカーを取り込み、ファイルを削除する"""
+        store = MarkerStore(tmp_path / 'markers.db', legacy_dir=legacy_dir)
+        try:
+            session = MarkerKey('ImplementationDesignHook', 'abc-123', 'session')
+            assert store.get(session)['tokens'] == 100
+            assert store.count_history(session) == 1
+            assert store.get(MarkerKey('ImplementationDesignHook', 'abc-123', 'rule', '0123abcd'))['tokens'] == 7
+            assert store.get(MarkerKey('', 'abc-123', 'command', '89abcdef'))['tokens'] == 3
+
+            startup = MarkerKey('SessionStartupHook', 'abc-123', 'startup')
+            assert store.get(startup)['tokens'] == 1
+            assert store.count_history(startup) == 1
+            assert store.get_expired_count(startup) == 1
+        finally:
+            store.close()
+
+        assert sorted(path.name for path in legacy_dir.iterdir()) == ['claude_hooks_debug.log']
+
+    def test_migration_runs_once(self, tmp_path, legacy_dir):
+        """移行はデータベース毎に1回のみ"""
+        first = MarkerStore(tmp_path / 'markers.db', legacy_dir=legacy_dir)
+        first.exists(MarkerKey('ImplementationDesignHook', 'abc-123', 'session'))
+        first.close()
+        (legacy_dir / 'claude_hook_ImplementationDesignHook_session_late').write_text('{}')
+
+        store = MarkerStore(tmp_path / 'markers.db', legacy_dir=legacy_dir)
+        try:
+            assert store.get(MarkerKey('ImplementationDesignHook', 'late', 'session')) is None
+        finally:
+            store.close()
+
+    def test_existing_marker_is_not_overwritten(self, tmp_path, legacy_dir):
+        """移行時に既存のマーカーは上書きしない"""
+        session = MarkerKey('ImplementationDesignHook', 'abc-123', 'session')
+        store = MarkerStore(tmp_path / 'markers.db', legacy_dir=None)
+        store.put(session, {'tokens': 999})
+        store.close()
+
+        store = MarkerStore(tmp_path / 'markers.db', legacy_dir=legacy_dir)
+        try:
+            assert store.get(session)['tokens'] == 999
+        finally:
+            store.close()
@@ -0,0 +1,254 @@
+"""Pythonフックのワーカープールのテスト"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import pytest
+import subprocess
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from src.infrastructure.hooks.python_worker_pool import PythonWorkerPool, WorkerError
+from src.infrastructure.hooks.hook_executor import HookExecutor, ExecutionSettings, parse_python_hook
+
+# 実行したプロセスと、同じプロセスでの実行回数（モジュールの状態が残るか）を返すフック
+HOOK_SOURCE = '''
+import os
+import sys
+import json
+import helper_state
+
+helper_state.calls += 1
+data = json.load(sys.stdin)
+print(json.dumps({"decision": data.get("decision", "allow"), "reason": "",
+                  "pid": os.getpid(), "calls": helper_state.calls, "argv": sys.argv}))
+if data.get("exit"):
+    sys.exit(data["exit"])
+'''
+
+
+@pytest.fixture
+def hook_script(tmp_path):
+    """フックスクリプト（同じディレクトリのモジュールをimportする）"""
+    (tmp_path / 'helper_state.py').write_text('calls = 0\n')
+    script = tmp_path / 'hook.py'
+    script.write_text(HOOK_SOURCE)
+    return str(script)
+
+
+@pytest.fixture
+def pool():
+    """テスト後に待機中のワーカーを終了するプール"""
+    pools = []
+
+    def make(**kwargs):
+        pools.append(PythonWorkerPool(**kwargs))
+        return pools[-1]
+    yield make
+    for created in pools:
+        created.close()
+
+
+def _run(pool, script, timeout=10, **data):
+    """ワーカーで実行して出力のJSONを返す"""
+    return json.loads(pool.run(sys.executable, script, json.dumps(data), timeout))
+
+
+class TestPythonWorkerPool:
+    """PythonWorkerPoolのテストクラス"""
+
+    def test_worker_is_reused(self, pool, hook_script):
+        """2回目以降は同じワーカーで実行し、importしたモジュールは読み込み済み"""
+        workers = pool()
+
+        first = _run(workers, hook_script, decision='block')
+        second = _run(workers, hook_script)
+
+        assert first['decision'] == 'block'
+        assert first['pid'] == second['pid'] != os.getpid()
+        assert (first['calls'], second['calls']) == (1, 2)
+        assert second['argv'] == [hook_script]
+        assert workers.idle_count(sys.executable, hook_script) == 1
+
+    def test_exit_code_does_not_stop_worker(self, pool, hook_script):
+        """スクリプトの sys.exit() でワーカーは終了しない"""
+        workers = pool()
+
+        first = _run(workers, hook_script, exit=2)
+        second = _run(workers, hook_script)
+
+        assert first['pid'] == second['pid']
+
+    def test_direct_fd0_reads_do_not_consume_requests(self, pool, tmp_path):
+        """fd 0 を直接読むフック・子プロセスは要求の行を読まない（/dev/null を読む）"""
+        script = tmp_path / 'fd0.py'
+        script.write_text(
+            'import os, subprocess, sys\n'
+            'direct = os.read(0, 65536)\n'
+            'child = subprocess.run(["cat"], capture_output=True).stdout\n'
+            'print(len(direct), len(child), sys.stdin.read())\n'
+        )
+        workers = pool()
+
+        first = workers.run(sys.executable, str(script), 'input-1', 10)
+        second = workers.run(sys.executable, str(script), 'input-2', 10)
+
+        assert first.split() == ['0', '0', 'input-1']
+        assert second.split() == ['0', '0', 'input-2']
+
+    def test_recycle_after_max_requests(self, pool, hook_script):
+        """max_requests 回実行したワーカーは起動し直す"""
+        workers = pool(max_requests=2)
+
+        pids = [_run(workers, hook_script)['pid'] for _ in range(3)]
+
+        assert pids[0] == pids[1] != pids[2]
+
+    def test_dead_worker_is_restarted(self, pool, hook_script):
+        """終了したワーカーは破棄して新しく起動する"""
+        workers = pool()
+        first = _run(workers, hook_script)
+        os.kill(first['pid'], 9)
+        time.sleep(0.1)
+
+        second = _run(workers, hook_script)
+
+        assert second['pid'] != first['pid']
+        assert second['calls'] == 1
+
+    def test_idle_worker_is_health_checked(self, pool, hook_script):
+        """一定時間使われていないワーカーは ping に応答しなければ使わない"""
+        workers = pool(health_check_seconds=0)
+        first = _run(workers, hook_script)
+        os.kill(first['pid'], 19)  # SIGSTOP（応答しないが終了もしていない）
+        try:
+            second = _run(workers, hook_script)
+        finally:
+            try:
+                os.kill(first['pid'], 9)
+            except ProcessLookupError:
+                pass
+
+        assert second['pid'] != first['pid']
+
+    def test_timeout_kills_worker(self, pool, tmp_path):
+        """タイムアウトしたワーカーは終了し、次の実行は新しいワーカーで行う"""
+        script = tmp_path / 'slow.py'
+        script.write_text('import os, sys, time\nif sys.stdin.read() == "slow":\n    time.sleep(30)\nprint(os.getpid())\n')
+        workers = pool()
+        pid = int(workers.run(sys.executable, str(script), 'fast', 10))
+
+        started = time.monotonic()
+        with pytest.raises(subprocess.TimeoutExpired):
+            workers.run(sys.executable, str(script), 'slow', 0.3)
+
+        assert time.monotonic() - started < 5
+        assert workers.idle_count(sys.executable, str(script)) == 0
+        assert int(workers.run(sys.executable, str(script), 'fast', 10)) != pid
+
+    def test_worker_exit_during_request(self, pool, tmp_path):
+        """実行中にワーカーが終了した場合は再実行せずエラー"""
+        script = tmp_path / 'crash.py'
+        script.write_text('import os\nos._exit(3)\n')
+
+        with pytest.raises(WorkerError):
+            pool().run(sys.executable, str(script), '', 10)
+
+
+class TestPythonHookExecution:
+    """HookExecutorからのワーカー実行のテストクラス"""
+
+    @pytest.fixture
+    def make_executor(self, tmp_path, hook_script):
+        """Pythonフックを登録した実行エンジンを作成"""
+        executors = []
+
+        def make(**settings):
+            claude_dir = tmp_path / '.claude'
+            claude_dir.mkdir(exist_ok=True)
+            (claude_dir / 'settings.json').write_text(json.dumps({'hooks': {'PostToolUse': [{
+                'matcher': 'Edit',
+                'hooks': [{'type': 'command', 'command': f'{sys.executable} {hook_script}'}]
+            }]}}))
+            executors.append(HookExecutor(claude_dir, ExecutionSettings.from_settings(settings)))
+            return executors[-1]
+        yield make
+        for executor in executors:
+            executor.close()
+
+    def _pids(self, executor, times=2):
+        """フックを実行したプロセスID"""
+        return [executor.execute_hook('PostToolUse', 'Edit', {'file_path': 'a.py'}, 'session-1')[0]['pid']
+                for _ in range(times)]
+
+    def test_python_hook_uses_worker(self, make_executor):
+        """Pythonフックは同じワーカーで繰り返し実行する"""
+        first, second = self._pids(make_executor())
+
+        assert first == second
+
+    def test_python_workers_disabled(self, make_executor):
+        """python_workers: false では毎回新しいプロセスで実行する"""
+        first, second = self._pids(make_executor(python_workers=False))
+
+        assert first != second
+
+    def test_start_python_workers(self, make_executor, hook_script):
+        """登録済みのPythonフックのワーカーを事前に起動する"""
+        executor = make_executor(worker_idle=1)
+
+        assert executor.start_python_workers() == 1
+        assert executor.worker_pool.idle_count(sys.executable, hook_script) == 1
+
+    def test_cancellation_kills_worker(self, tmp_path):
+        """キャンセルされたら実行中のワーカーを終了する（ワーカーのタイムアウトを待たない）"""
+        pid_file = tmp_path / 'worker.pid'
+        script = tmp_path / 'slow_hook.py'
+        script.write_text(f'import os, time\nopen({str(pid_file)!r}, "w").write(str(os.getpid()))\ntime.sleep(30)\n')
+        claude_dir = tmp_path / '.claude'
+        claude_dir.mkdir()
+        (claude_dir / 'settings.json').write_text(json.dumps({'hooks': {'PostToolUse': [{
+            'matcher': 'Edit',
+            'hooks': [{'type': 'command', 'command': f'{sys.executable} {script}'}]
+        }]}}))
+        executor = HookExecutor(claude_dir)
+
+        async def main():
+            task = asyncio.ensure_future(executor.execute_hook_async('PostToolUse', 'Edit', {'file_path': 'a.py'}))
+            while not pid_file.exists() or not pid_file.read_text():
+                assert not task.done(), task.result()
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        started = time.monotonic()
+        try:
+            asyncio.run(asyncio.wait_for(main(), 10))
+            worker_pid = int(pid_file.read_text())
+            with pytest.raises(ProcessLookupError):
+                os.kill(worker_pid, 0)
+        finally:
+            executor.close()
+
+        assert time.monotonic() - started < 5
+
+    @pytest.mark.parametrize('command, expected', [
+        ('python3 {script}', ('python3', '{script}')),
+        ('/usr/bin/python3.11 "{script}"', ('/usr/bin/python3.11', '{script}')),
+        ('python3 {script} --flag', None),
+        ('python3 {script} > /tmp/out', None),
+        ('python3 {script}; echo done', None),
+        ('python3 {missing}', None),
+        ('node {script}', None),
+        ('bash run.sh', None),
+    ])
+    def test_parse_python_hook(self, hook_script, tmp_path, command, expected):
+        """`python3 <スクリプト>.py` 形式のみワーカーで実行する"""
+        names = {'script': hook_script, 'missing': str(tmp_path / 'missing.py')}
+        if expected is not None:
+            expected = tuple(part.format(**names) for part in expected)
+
+        assert parse_python_hook(command.format(**names)) == expected
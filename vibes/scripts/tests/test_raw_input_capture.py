@@ -0,0 +1,115 @@
+"""RawInputCaptureのテスト"""
+
+import pytest
+from src.infrastructure.capture.raw_input_capture import RawInputCapture, RawInputRing, RawCaptureSettings
+
+
+class TestRawInputRing:
+    """RawInputRingのテストクラス"""
+
+    def test_keeps_last_entries_in_order(self, tmp_path):
+        """スロット数を超えると古い入力から上書きされる"""
+        ring = RawInputRing(tmp_path / 'ring.bin', slots=3, slot_bytes=64)
+        for i in range(5):
+            ring.append(f'{{"n": {i}}}'.encode())
+
+        assert [entry['data'] for entry in ring.entries()] == ['{"n": 2}', '{"n": 3}', '{"n": 4}']
+        assert (tmp_path / 'ring.bin').stat().st_size == ring.file_size
+        ring.close()
+
+    def test_truncates_large_input(self, tmp_path):
+        """スロットに収まらない入力は先頭のみ保存する"""
+        ring = RawInputRing(tmp_path / 'ring.bin', slots=2, slot_bytes=8)
+        ring.append(b'0123456789')
+
+        entry = ring.entries()[0]
+        assert entry['data'] == '01234567'
+        assert entry['size'] == 10
+        assert entry['truncated']
+        ring.close()
+
+    def test_shared_between_instances(self, tmp_path):
+        """同じファイルを開いた別インスタンス（別プロセス相当）と書き込み番号を共有する"""
+        first = RawInputRing(tmp_path / 'ring.bin', slots=4, slot_bytes=16)
+        second = RawInputRing(tmp_path / 'ring.bin', slots=4, slot_bytes=16)
+
+        assert first.append(b'a') == 0
+        assert second.append(b'b') == 1
+        assert [entry['data'] for entry in first.entries()] == ['a', 'b']
+        first.close()
+        second.close()
+
+    def test_reinitializes_on_layout_change(self, tmp_path):
+        """スロット設定が変わった場合はファイルを作り直す"""
+        ring = RawInputRing(tmp_path / 'ring.bin', slots=2, slot_bytes=16)
+        ring.append(b'old')
+        ring.close()
+
+        resized = RawInputRing(tmp_path / 'ring.bin', slots=4, slot_bytes=16)
+
+        assert resized.entries() == []
+        assert resized.append(b'new') == 0
+        resized.close()
+
+
+class TestRawInputCapture:
+    """RawInputCaptureのテストクラス"""
+
+    def _capture(self, tmp_path, **settings):
+        """一時ディレクトリに保存するインスタンスを作成"""
+        return RawInputCapture(RawCaptureSettings.from_settings({'capture_dir': str(tmp_path), **settings}))
+
+    def _files(self, tmp_path):
+        """保存された生JSONファイル"""
+        return sorted(tmp_path.glob('base_hook_*.json'))
+
+    def test_off(self, tmp_path):
+        """off モードでは何も保存しない"""
+        self._capture(tmp_path, mode='off').capture('{}')
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_all(self, tmp_path):
+        """all モードでは毎回ファイルに保存する"""
+        capture = self._capture(tmp_path, mode='all')
+        capture.capture('{"a": 1}')
+
+        files = self._files(tmp_path)
+        assert len(files) == 1
+        assert files[0].read_text() == '{"a": 1}'
+
+    @pytest.mark.parametrize('rate, expected', [(0.0, 0), (1.0, 3)])
+    def test_sampled(self, tmp_path, rate, expected):
+        """sampled モードでは sample_rate の割合のみ保存する"""
+        capture = self._capture(tmp_path, mode='sampled', sample_rate=rate)
+        for _ in range(3):
+            capture.capture('{}')
+
+        assert len(self._files(tmp_path)) == expected
+
+    def test_ring(self, tmp_path):
+        """ring モードでは1つのリングファイルにのみ書き込む"""
+        capture = self._capture(tmp_path, mode='ring', ring_slots=2, ring_slot_bytes=32)
+        for i in range(3):
+            capture.capture(f'{{"n": {i}}}')
+
+        assert [p.name for p in tmp_path.iterdir()] == [RawInputCapture.RING_FILE_NAME]
+        assert [entry['data'] for entry in capture.ring.entries()] == ['{"n": 1}', '{"n": 2}']
+        capture.close()
+
+    def test_on_error(self, tmp_path):
+        """on_error モードでは失敗時のみ保存し、成功時は破棄する"""
+        capture = self._capture(tmp_path, mode='on_error')
+        capture.capture('{"ok": true}')
+        capture.reset()
+        assert capture.capture_error() is None
+
+        capture.capture('{"broken"')
+        path = capture.capture_error()
+
+        assert path.read_text() == '{"broken"'
+        assert self._files(tmp_path) == [path]
+
+    def test_unknown_mode_falls_back_to_ring(self, tmp_path):
+        """未知のモードは ring として扱う"""
+        assert self._capture(tmp_path, mode='everything').settings.mode == 'ring'
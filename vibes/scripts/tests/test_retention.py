@@ -0,0 +1,178 @@
+"""RetentionServiceのテスト"""
+
+import os
+import json
+import time
+import pytest
+from datetime import datetime, timedelta
+from src.infrastructure.markers.marker_store import MarkerStore, MarkerKey
+from src.infrastructure.markers.retention import RetentionService, RetentionPolicy
+
+
+class TestRetentionService:
+    """RetentionServiceのテストクラス"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """一時ディレクトリのマーカーストア"""
+        store = MarkerStore(tmp_path / 'markers.db', legacy_dir=None)
+        yield store
+        store.close()
+
+    @pytest.fixture
+    def make_service(self, store, tmp_path):
+        """一時ディレクトリを対象とするサービスを作成"""
+        (tmp_path / 'raw').mkdir()
+        (tmp_path / 'checkpoints').mkdir()
+
+        def make(**settings):
+            return RetentionService(
+                store, RetentionPolicy.from_settings(settings),
+                archive_path=tmp_path / 'history.ndjson',
+                raw_input_dir=tmp_path / 'raw',
+                checkpoint_dir=tmp_path / 'checkpoints'
+            )
+        return make
+
+    def _expire_markers(self, store, count, session_id='session-1'):
+        """期限切れ履歴を作成"""
+        for i in range(count):
+            marker = MarkerKey('Hook', session_id, 'rule', f'{i:08x}')
+            store.put(marker, {'tokens': i})
+            store.expire(marker)
+
+    def _touch(self, path, age_seconds):
+        """更新時刻を過去にしたファイルを作成"""
+        path.write_text('{}')
+        mtime = time.time() - age_seconds
+        os.utime(path, (mtime, mtime))
+
+    def test_policy_from_settings(self):
+        """設定の既知のキーのみ反映し、未指定はデフォルト値"""
+        policy = RetentionPolicy.from_settings({'batch_size': 10, 'unknown': 1})
+
+        assert policy.batch_size == 10
+        assert policy.marker_history_ttl_days == RetentionPolicy().marker_history_ttl_days
+        assert RetentionPolicy.from_settings(None) == RetentionPolicy()
+
+    def test_compact_history_archives_expired_rows(self, store, make_service, tmp_path):
+        """保持期間を過ぎた履歴はNDJSONアーカイブへ移動する"""
+        self._expire_markers(store, 3)
+        service = make_service(marker_history_ttl_days=7)
+
+        assert service.compact_history() == 0
+
+        archived = service.compact_history(now=datetime.now() + timedelta(days=8))
+
+        assert archived == 3
+        assert store.count_all_history() == 0
+        lines = (tmp_path / 'history.ndjson').read_text().splitlines()
+        assert [json.loads(line)['data']['tokens'] for line in lines] == [0, 1, 2]
+        # 期限切れ回数は履歴の整理後も残る
+        assert store.get_expired_count(MarkerKey('Hook', 'session-1', 'rule', '00000000')) == 1
+
+    def test_compact_history_enforces_row_cap(self, store, make_service):
+        """件数上限を超えた古い履歴は期限前でも移動する"""
+        self._expire_markers(store, 5)
+        service = make_service(max_history_rows=2, batch_size=2)
+
+        assert service.compact_history() == 3
+        assert [row['key'] for row in store.fetch_history()] == ['00000003', '00000004']
+
+    def test_compact_history_respects_limit(self, store, make_service):
+        """limit 件までしか移動しない"""
+        self._expire_markers(store, 5)
+        service = make_service(batch_size=2)
+
+        assert service.compact_history(limit=3, now=datetime.now() + timedelta(days=8)) == 3
+        assert store.count_all_history() == 2
+
+    def test_archive_rotation(self, store, make_service, tmp_path):
+        """アーカイブが上限サイズを超えたら .1 へローテーションする"""
+        service = make_service(archive_max_bytes=1)
+        later = datetime.now() + timedelta(days=8)
+
+        self._expire_markers(store, 1)
+        service.compact_history(now=later)
+        self._expire_markers(store, 1, session_id='session-2')
+        service.compact_history(now=later)
+
+        assert 'session-1' in (tmp_path / 'history.ndjson.1').read_text()
+        assert 'session-2' in (tmp_path / 'history.ndjson').read_text()
+
+    def test_stale_markers_and_orphan_counters(self, store, make_service):
+        """長期間未更新のマーカーと参照されない期限切れ回数を削除する"""
+        old = MarkerKey('Hook', 'old-session', 'session')
+        store.put(old, {'tokens': 1, 'timestamp': '2000-01-01T00:00:00'})
+        fresh = MarkerKey('Hook', 'fresh-session', 'session')
+        store.put(fresh, {'tokens': 1})
+        store.expire(fresh)
+        store.put(fresh, {'tokens': 2})
+        gone = MarkerKey('Hook', 'gone-session', 'session')
+        store.put(gone, {'tokens': 1})
+        store.expire(gone)
+        store.delete_history([row['id'] for row in store.fetch_history() if row['session_id'] == 'gone-session'])
+
+        result = make_service().run()
+
+        assert result.deleted_markers == 1
+        assert result.deleted_counters == 1
+        assert not store.exists(old)
+        assert store.exists(fresh)
+        assert store.get_expired_count(fresh) == 1
+        assert store.get_expired_count(gone) == 0
+
+    def test_raw_input_files_ttl_and_cap(self, make_service, tmp_path):
+        """生JSONは保持期間と最大ファイル数に従って古い順に削除する"""
+        raw = tmp_path / 'raw'
+        self._touch(raw / 'base_hook_old.json', 2 * 3600)
+        for i in range(3):
+            self._touch(raw / f'base_hook_{i}.json', 60 - i)
+        self._touch(raw / 'other.json', 10 * 3600)
+
+        result = make_service(raw_input_ttl_hours=1, max_raw_input_files=2).run()
+
+        assert result.deleted_raw_inputs == 2
+        assert sorted(p.name for p in raw.iterdir()) == ['base_hook_1.json', 'base_hook_2.json', 'other.json']
+
+    def test_checkpoint_files_ttl(self, make_service, tmp_path):
+        """古いtranscriptチェックポイントを削除する"""
+        checkpoints = tmp_path / 'checkpoints'
+        self._touch(checkpoints / 'claude_transcript_checkpoint_old.json', 8 * 86400)
+        self._touch(checkpoints / 'claude_transcript_checkpoint_new.json', 60)
+
+        assert make_service(checkpoint_ttl_days=7).run().deleted_checkpoints == 1
+        assert [p.name for p in checkpoints.iterdir()] == ['claude_transcript_checkpoint_new.json']
+
+    def test_stale_transcript_usage(self, store, make_service):
+        """checkpoint_ttl_days を過ぎたtranscriptのusageキャッシュを削除する"""
+        store.put_transcript_usage('/old.jsonl', 1, 10, None)
+
+        service = make_service(checkpoint_ttl_days=7)
+        assert service.run(now=datetime.now() + timedelta(days=1)).deleted_transcript_usage == 0
+        assert service.run(now=datetime.now() + timedelta(days=8)).deleted_transcript_usage == 1
+        assert store.get_transcript_usage('/old.jsonl', 1, 10) is None
+
+    def test_dry_run_changes_nothing(self, store, make_service, tmp_path):
+        """dry_run は対象件数のみ返し何も変更しない"""
+        self._expire_markers(store, 3)
+        self._touch(tmp_path / 'raw' / 'base_hook_old.json', 2 * 86400)
+
+        result = make_service().run(dry_run=True, now=datetime.now() + timedelta(days=8))
+
+        assert result.archived_history == 3
+        assert result.deleted_raw_inputs == 1
+        assert store.count_all_history() == 3
+        assert (tmp_path / 'raw' / 'base_hook_old.json').exists()
+        assert not (tmp_path / 'history.ndjson').exists()
+
+    def test_run_if_due_runs_once_per_interval(self, store, make_service):
+        """フック実行時の整理は間隔毎に1回、batch_size件まで"""
+        self._expire_markers(store, 5)
+        service = make_service(hook_interval_seconds=3600, batch_size=2, max_history_rows=0)
+        now = datetime.now()
+
+        assert service.run_if_due(now).archived_history == 2
+        assert service.run_if_due(now + timedelta(minutes=30)) is None
+        assert service.run_if_due(now + timedelta(hours=2)).archived_history == 2
+        assert make_service(hook_interval_seconds=0).run_if_due(now + timedelta(days=1)) is None
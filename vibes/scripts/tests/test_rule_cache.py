@@ -0,0 +1,129 @@
+"""RuleCacheのテスト"""
+
+import os
+import pytest
+import yaml
+from unittest.mock import patch
+from src.domain.services.rule_cache import RuleCache
+from src.domain.services.file_convention_matcher import FileConventionMatcher
+from src.domain.services.command_convention_matcher import CommandConventionMatcher
+
+
+class TestRuleCache:
+    """RuleCacheのテストクラス"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """一時ディレクトリに保存するキャッシュ"""
+        return RuleCache(tmp_path / 'cache')
+
+    @pytest.fixture
+    def rules_file(self, tmp_path):
+        """テスト用ルールファイル"""
+        path = tmp_path / 'rules.yaml'
+        path.write_text('rules: []\n')
+        return path
+
+    def test_save_and_load(self, cache, rules_file):
+        """保存した内容を読み込める"""
+        cache.save(rules_file, 'file', {'rules': [('a', ['*.md'], 'warn', 'm', None)]},
+                   cache.source_key(rules_file))
+
+        assert cache.load(rules_file, 'file') == {'rules': [('a', ['*.md'], 'warn', 'm', None)]}
+        assert cache.load(rules_file, 'command') is None
+
+    def test_modified_rules_file_invalidates_cache(self, cache, rules_file):
+        """ルールファイルが更新されるとキャッシュは無効"""
+        cache.save(rules_file, 'file', {'rules': []}, cache.source_key(rules_file))
+
+        rules_file.write_text('rules: [] # changed\n')
+
+        assert cache.load(rules_file, 'file') is None
+
+    def test_mtime_change_invalidates_cache(self, cache, rules_file):
+        """サイズが同じでもmtimeが変われば無効"""
+        cache.save(rules_file, 'file', {'rules': []}, cache.source_key(rules_file))
+
+        stat = rules_file.stat()
+        os.utime(rules_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert cache.load(rules_file, 'file') is None
+
+    def test_corrupt_cache_is_ignored(self, cache, rules_file):
+        """壊れたキャッシュは無視する"""
+        cache_path = cache.get_cache_path(rules_file, 'file')
+        cache_path.parent.mkdir(parents=True)
+        cache_path.write_bytes(b'\x00garbage')
+
+        assert cache.load(rules_file, 'file') is None
+
+    def test_missing_rules_file(self, cache, tmp_path):
+        """ルールファイルが無い場合は保存も読み込みもしない"""
+        missing = tmp_path / 'missing.yaml'
+        cache.save(missing, 'file', {'rules': []}, cache.source_key(missing))
+
+        assert cache.load(missing, 'file') is None
+        assert not cache.cache_dir.exists()
+
+
+class TestMatcherRuleCache:
+    """マッチャーのキャッシュ利用のテストクラス"""
+
+    @pytest.fixture
+    def rules_file(self, tmp_path):
+        """テスト用ルールファイル"""
+        path = tmp_path / 'rules.yaml'
+        path.write_text(yaml.dump({
+            'rules': [
+                {'name': 'Docs', 'patterns': ['docs/**/*.md'], 'severity': 'block', 'message': 'Docs'},
+                {'name': 'Git', 'patterns': ['git push*', 'git*'], 'severity': 'warn', 'message': 'Git',
+                 'token_threshold': 1000}
+            ]
+        }))
+        return path
+
+    def test_file_matcher_skips_yaml_when_cached(self, rules_file, tmp_path):
+        """キャッシュがあればYAMLを解析しない"""
+        FileConventionMatcher(rules_file, cache_dir=tmp_path / 'cache')
+
+        with patch('yaml.safe_load') as mock_load:
+            matcher = FileConventionMatcher(rules_file, cache_dir=tmp_path / 'cache')
+            mock_load.assert_not_called()
+
+        assert [rule.name for rule in matcher.rules] == ['Docs', 'Git']
+        assert matcher.check_file('docs/a/b.md').name == 'Docs'
+        assert matcher.check_file('src/a.py') is None
+
+    def test_command_matcher_skips_yaml_when_cached(self, rules_file, tmp_path):
+        """キャッシュがあればYAMLを解析しない"""
+        CommandConventionMatcher(rules_file, cache_dir=tmp_path / 'cache')
+
+        with patch('yaml.safe_load') as mock_load:
+            matcher = CommandConventionMatcher(rules_file, cache_dir=tmp_path / 'cache')
+            mock_load.assert_not_called()
+
+        rule = matcher.check_command('cd x && git push')
+        assert rule.name == 'Git'
+        assert rule.token_threshold == 1000
+        assert matcher.check_command('ls') is None
+
+    def test_rules_file_change_rebuilds_cache(self, rules_file, tmp_path):
+        """ルールファイルが更新されると解析し直す"""
+        FileConventionMatcher(rules_file, cache_dir=tmp_path / 'cache')
+        rules_file.write_text(yaml.dump({
+            'rules': [{'name': 'Ruby', 'patterns': ['**/*.rb'], 'message': 'Ruby'}]
+        }))
+
+        matcher = FileConventionMatcher(rules_file, cache_dir=tmp_path / 'cache')
+
+        assert [rule.name for rule in matcher.rules] == ['Ruby']
+
+    def test_broken_rules_file_is_not_cached(self, tmp_path):
+        """読み込みに失敗した結果はキャッシュしない"""
+        path = tmp_path / 'broken.yaml'
+        path.write_text('rules: [')
+
+        matcher = FileConventionMatcher(path, cache_dir=tmp_path / 'cache')
+
+        assert matcher.rules == []
+        assert matcher.rule_cache.load(path, FileConventionMatcher.CACHE_KIND) is None
@@ -0,0 +1,66 @@
+"""SessionStartupHookのテスト"""
+
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+import sys
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from src.domain.hooks.session_startup_hook import SessionStartupHook
+from src.infrastructure.markers.marker_store import MarkerStore
+
+
+class TestSessionStartupHook:
+    """SessionStartupHookのテストクラス"""
+
+    @pytest.fixture
+    def hook(self, tmp_path):
+        """一時ディレクトリのマーカーストアを使うフック"""
+        hook = SessionStartupHook()
+        hook.marker_store = MarkerStore(tmp_path / 'markers.db', legacy_dir=None)
+        yield hook
+        hook.marker_store.close()
+
+    def test_execution_count_first_time(self, hook):
+        """マーカーが無い場合は1回目"""
+        assert hook._get_execution_count('session-1') == 1
+
+    def test_execution_count_after_expiry(self, hook):
+        """マーカーが期限切れになる毎に回数が増える"""
+        session_id = 'session-1'
+        marker = hook.get_session_startup_marker_key(session_id)
+
+        assert hook.mark_session_startup_processed(session_id)
+        assert hook._get_execution_count(session_id) == 2
+
+        hook._expire_marker(marker)
+        assert hook._get_execution_count(session_id) == 2
+
+        assert hook.mark_session_startup_processed(session_id)
+        assert hook._get_execution_count(session_id) == 3
+
+    def test_execution_count_does_not_scan_history(self, hook):
+        """履歴の件数を数えずカウンタを参照する"""
+        session_id = 'session-1'
+        marker = hook.get_session_startup_marker_key(session_id)
+        for _ in range(5):
+            hook.mark_session_startup_processed(session_id)
+            hook._expire_marker(marker)
+        hook.marker_store.connection.execute("DELETE FROM marker_history")
+
+        assert hook._get_execution_count(session_id) == 6
+
+    @pytest.mark.parametrize('debug_settings, warned', [
+        ('    marker_path: "/tmp/claude_session_startup_"\n', True),
+        ('    enable_logging: true\n', False),
+    ])
+    def test_marker_path_is_deprecated(self, tmp_path, debug_settings, warned):
+        """debug.marker_path は使われないため、設定されている場合は警告する"""
+        config_file = tmp_path / 'session_startup_settings.yaml'
+        config_file.write_text('session_startup:\n  debug:\n' + debug_settings)
+
+        with patch.object(SessionStartupHook, 'CONFIG_FILE', config_file), \
+             patch.object(SessionStartupHook, 'log_warning') as log_warning:
+            SessionStartupHook()
+
+        assert log_warning.called is warned
@@ -0,0 +1,45 @@
+"""shell_command_splitterのテスト"""
+
+import pytest
+from src.domain.services.shell_command_splitter import split_simple_commands, strip_env_assignments
+
+
+class TestSplitSimpleCommands:
+    """split_simple_commandsのテストクラス"""
+
+    @pytest.mark.parametrize('command, expected', [
+        ('git status', ('git status',)),
+        ('cd app && git push', ('cd app', 'git push')),
+        ('a || b ; c', ('a', 'b', 'c')),
+        ('make test | tee log', ('make test', 'tee log')),
+        ('(cd x; rm -rf y) &', ('cd x', 'rm -rf y')),
+        ('echo $(git push)', ('echo', 'git push')),
+        ('echo `date`', ('echo', 'date')),
+        ('line1\nline2', ('line1', 'line2')),
+    ])
+    def test_split_operators(self, command, expected):
+        """制御演算子・パイプ・サブシェルで分割する"""
+        assert split_simple_commands(command) == expected
+
+    def test_quotes_are_preserved(self):
+        """クォート内の演算子では分割しない"""
+        assert split_simple_commands('git commit -m "a && b; c"') == ('git commit -m "a && b; c"',)
+        assert split_simple_commands("echo 'x | y'") == ("echo 'x | y'",)
+
+    def test_redirects_are_not_split(self):
+        """リダイレクト中の & や | では分割しない"""
+        assert split_simple_commands('make 2>&1 >| log') == ('make 2>&1 >| log',)
+
+    def test_env_assignments_are_stripped(self):
+        """先頭の環境変数代入を除去する"""
+        assert split_simple_commands('FOO=1 BAR="a b" docker compose up') == ('docker compose up',)
+        assert split_simple_commands('X=1') == ()
+
+
+class TestStripEnvAssignments:
+    """strip_env_assignmentsのテストクラス"""
+
+    def test_keeps_arguments_with_equals(self):
+        """コマンド名以降の代入形式の引数は残す"""
+        assert strip_env_assignments('make FOO=1') == 'make FOO=1'
+        assert strip_env_assignments("A='x y' B=2 env") == 'env'
@@ -0,0 +1,343 @@
+"""TranscriptReaderのテスト"""
+
+import json
+import pytest
+from unittest.mock import patch
+from src.infrastructure.transcript.transcript_reader import (
+    TranscriptReader, UsageState, calculate_context_tokens, scan_last_usage,
+    advance_usage_state, is_compaction_boundary
+)
+from src.infrastructure.markers.marker_store import MarkerStore
+
+
+def _assistant_line(input_tokens: int, output_tokens: int = 0) -> str:
+    """assistantメッセージ（usage付き）の1行を生成"""
+    entry = {
+        'type': 'assistant',
+        'message': {
+            'usage': {
+                'input_tokens': input_tokens,
+                'output_tokens': output_tokens,
+                'cache_creation_input_tokens': 0,
+                'cache_read_input_tokens': 0
+            }
+        }
+    }
+    return json.dumps(entry) + '\n'
+
+
+def _user_line(text: str = 'hello') -> str:
+    """userメッセージの1行を生成"""
+    return json.dumps({'type': 'user', 'message': {'content': text}}) + '\n'
+
+
+def _compact_boundary_line() -> str:
+    """コンパクション境界（compact_boundary のシステムメッセージ）の1行を生成"""
+    return json.dumps({'type': 'system', 'subtype': 'compact_boundary',
+                       'content': 'Conversation compacted', 'compactMetadata': {'trigger': 'manual'}}) + '\n'
+
+
+class TestTranscriptReader:
+    """TranscriptReaderのテストクラス"""
+
+    @pytest.fixture
+    def reader(self, tmp_path):
+        """チェックポイントを一時ディレクトリに保存するリーダー"""
+        checkpoint_dir = tmp_path / 'checkpoints'
+        checkpoint_dir.mkdir()
+        return TranscriptReader(checkpoint_dir=checkpoint_dir)
+
+    @pytest.fixture
+    def transcript(self, tmp_path):
+        """テスト用transcriptファイル"""
+        path = tmp_path / 'transcript.jsonl'
+        path.write_text(_user_line() + _assistant_line(100, 10) + _user_line())
+        return path
+
+    def test_calculate_context_tokens(self):
+        """usageブロックの合計トークン数"""
+        usage = {
+            'input_tokens': 1,
+            'output_tokens': 2,
+            'cache_creation_input_tokens': 3,
+            'cache_read_input_tokens': 4
+        }
+        assert calculate_context_tokens(usage) == 10
+
+    def test_get_context_size(self, reader, transcript):
+        """最後のusageからコンテキストサイズを取得"""
+        assert reader.get_context_size(str(transcript)) == 110
+
+    def test_missing_transcript(self, reader, tmp_path):
+        """存在しないtranscriptはNone"""
+        assert reader.get_context_size(str(tmp_path / 'missing.jsonl')) is None
+        assert reader.get_context_size(None) is None
+
+    def test_incremental_read_parses_only_appended_bytes(self, reader, transcript):
+        """2回目以降は追記分のみ解析する"""
+        assert reader.get_context_size(str(transcript)) == 110
+        offset = transcript.stat().st_size
+
+        with open(transcript, 'a') as f:
+            f.write(_assistant_line(200, 20))
+
+        seen_offsets = []
+        original_scan = reader._scan_forward
+
+        def spy(path, start, *state):
+            seen_offsets.append(start)
+            return original_scan(path, start, *state)
+
+        with patch.object(reader, '_scan_forward', side_effect=spy):
+            assert reader.get_context_size(str(transcript)) == 220
+
+        assert seen_offsets == [offset]
+
+    def test_unchanged_transcript_skips_scan(self, reader, transcript):
+        """変更がなければ走査しない"""
+        reader.get_context_size(str(transcript))
+
+        with patch.object(reader, '_scan_forward') as mock_scan:
+            assert reader.get_context_size(str(transcript)) == 110
+            mock_scan.assert_not_called()
+
+    def test_partial_trailing_line_is_deferred(self, reader, transcript):
+        """書き込み途中の末尾行は完結後に解析する"""
+        line = _assistant_line(300)
+        with open(transcript, 'a') as f:
+            f.write(line[:20])
+
+        assert reader.get_context_size(str(transcript)) == 110
+
+        with open(transcript, 'a') as f:
+            f.write(line[20:])
+
+        assert reader.get_context_size(str(transcript)) == 300
+
+    def test_truncated_transcript_triggers_rescan(self, reader, transcript):
+        """切り詰められた場合はチェックポイントを破棄して再走査する"""
+        reader.get_context_size(str(transcript))
+
+        transcript.write_text(_assistant_line(5))
+
+        assert reader.get_context_size(str(transcript)) == 5
+
+    def test_rotated_transcript_triggers_rescan(self, reader, transcript, tmp_path):
+        """inodeが変わった場合はチェックポイントを破棄して再走査する"""
+        reader.get_context_size(str(transcript))
+
+        replacement = tmp_path / 'replacement.jsonl'
+        replacement.write_text(_assistant_line(1) + _user_line() * 20)
+        replacement.replace(transcript)
+
+        assert reader.get_context_size(str(transcript)) == 1
+
+    def test_corrupt_checkpoint_is_ignored(self, reader, transcript):
+        """壊れたチェックポイントは無視して再走査する"""
+        reader.get_checkpoint_path(str(transcript)).write_text('not json')
+
+        assert reader.get_context_size(str(transcript)) == 110
+
+
+class TestScanLastUsage:
+    """scan_last_usage（末尾からの逆走査）のテストクラス"""
+
+    def test_finds_last_usage_across_chunks(self, tmp_path):
+        """ブロック境界をまたぐ行でも最後のusageを取得できる"""
+        path = tmp_path / 'transcript.jsonl'
+        content = _assistant_line(1) + _user_line('x' * 100) + _assistant_line(42) + _user_line('y' * 100)
+        path.write_text(content)
+
+        usage, offset = scan_last_usage(str(path), chunk_size=16)
+
+        assert usage['input_tokens'] == 42
+        assert offset == len(content.encode())
+
+    def test_stops_at_first_usage_from_end(self, tmp_path):
+        """末尾側で見つかった時点で走査を打ち切る"""
+        path = tmp_path / 'transcript.jsonl'
+        path.write_text(_user_line('x' * 10000) + _assistant_line(7))
+
+        with patch('src.infrastructure.transcript.transcript_reader.json_codec.loads',
+                   wraps=json.loads) as mock_loads:
+            usage, _ = scan_last_usage(str(path), chunk_size=128)
+
+        assert usage['input_tokens'] == 7
+        assert mock_loads.call_count == 1
+
+    def test_ignores_partial_trailing_line(self, tmp_path):
+        """改行で終わらない末尾行は対象外"""
+        path = tmp_path / 'transcript.jsonl'
+        complete = _assistant_line(10)
+        path.write_text(complete + _assistant_line(99)[:-5])
+
+        usage, offset = scan_last_usage(str(path), chunk_size=8)
+
+        assert usage['input_tokens'] == 10
+        assert offset == len(complete.encode())
+
+    def test_no_usage(self, tmp_path):
+        """usageが無い場合はNone"""
+        path = tmp_path / 'transcript.jsonl'
+        path.write_text(_user_line() * 3)
+
+        usage, offset = scan_last_usage(str(path), chunk_size=10)
+
+        assert usage is None
+        assert offset == path.stat().st_size
+
+    def test_empty_file(self, tmp_path):
+        """空ファイル"""
+        path = tmp_path / 'transcript.jsonl'
+        path.write_text('')
+
+        assert scan_last_usage(str(path)) == (None, 0)
+
+    def test_reader_uses_reverse_scan_without_checkpoint(self, tmp_path):
+        """チェックポイントが無い場合は逆走査で取得し、以降は追記分のみ解析する"""
+        path = tmp_path / 'transcript.jsonl'
+        path.write_text(_assistant_line(5) + _user_line() * 50)
+        reader = TranscriptReader(checkpoint_dir=tmp_path, chunk_size=64)
+
+        with patch.object(reader, '_scan_forward') as mock_scan:
+            assert reader.get_context_size(str(path)) == 5
+            mock_scan.assert_not_called()
+
+        with open(path, 'a') as f:
+            f.write(_assistant_line(6))
+
+        assert reader.get_context_size(str(path)) == 6
+
+
+class TestSharedUsageCache:
+    """プロセス間で共有するusageキャッシュのテストクラス"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """一時ディレクトリのマーカーストア"""
+        store = MarkerStore(tmp_path / 'markers.db', legacy_dir=None)
+        yield store
+        store.close()
+
+    def _reader(self, tmp_path, name, store):
+        """チェックポイントを別々に持つリーダー（別プロセス相当）"""
+        checkpoint_dir = tmp_path / name
+        checkpoint_dir.mkdir()
+        return TranscriptReader(checkpoint_dir=checkpoint_dir, usage_cache=store)
+
+    def test_second_reader_reuses_published_usage(self, tmp_path, store):
+        """最初のリーダーが保存した結果を、他のリーダーはtranscriptを読まずに使う"""
+        path = tmp_path / 'transcript.jsonl'
+        path.write_text(_user_line() + _assistant_line(100, 10))
+        first = self._reader(tmp_path, 'first', store)
+        second = self._reader(tmp_path, 'second', store)
+
+        assert first.get_context_size(str(path)) == 110
+        with patch.object(second, '_read_usage_state') as mock_read:
+            assert second.get_context_size(str(path)) == 110
+            mock_read.assert_not_called()
+
+    def test_append_invalidates_entry(self, tmp_path, store):
+        """追記でサイズが変わった場合はtranscriptを読み直して共有する"""
+        path = tmp_path / 'transcript.jsonl'
+        path.write_text(_assistant_line(100))
+        first = self._reader(tmp_path, 'first', store)
+        second = self._reader(tmp_path, 'second', store)
+        assert first.get_context_size(str(path)) == 100
+
+        with open(path, 'a') as f:
+            f.write(_assistant_line(200))
+
+        assert second.get_context_size(str(path)) == 200
+        with patch.object(first, '_read_usage_state') as mock_read:
+            assert first.get_context_size(str(path)) == 200
+            mock_read.assert_not_called()
+
+    def test_cache_error_falls_back_to_transcript(self, tmp_path):
+        """キャッシュが使えない場合はtranscriptから取得する"""
+        path = tmp_path / 'transcript.jsonl'
+        path.write_text(_assistant_line(7))
+        broken = MarkerStore(tmp_path / 'missing' / 'markers.db', legacy_dir=None)
+        reader = TranscriptReader(checkpoint_dir=tmp_path, usage_cache=broken)
+
+        assert reader.get_context_size(str(path)) == 7
+
+
+class TestCumulativeTokens:
+    """コンパクションを考慮した累積トークン数のテストクラス"""
+
+    @pytest.fixture
+    def reader(self, tmp_path):
+        """チェックポイントを一時ディレクトリに保存するリーダー"""
+        return TranscriptReader(checkpoint_dir=tmp_path)
+
+    def _append(self, path, *lines):
+        """transcriptに行を追記"""
+        with open(path, 'a') as f:
+            f.write(''.join(lines))
+
+    def test_advance_usage_state(self):
+        """増加分のみ加算し、減少・コンパクション境界の直後は基準を置き換える"""
+        state = advance_usage_state(UsageState(), {'input_tokens': 100})
+        assert state.cumulative_tokens == 100
+
+        state = advance_usage_state(state, {'input_tokens': 150})
+        assert state.cumulative_tokens == 150
+
+        state = advance_usage_state(state, {'input_tokens': 40})
+        assert (state.context_tokens, state.cumulative_tokens) == (40, 150)
+
+        state = advance_usage_state(state, {'input_tokens': 90}, after_boundary=True)
+        assert (state.context_tokens, state.cumulative_tokens) == (90, 150)
+
+    def test_is_compaction_boundary(self):
+        """compact_boundary とコンパクトの要約を境界として検出する"""
+        summary = json.dumps({'type': 'user', 'isCompactSummary': True, 'message': {'content': '...'}})
+
+        assert is_compaction_boundary(_compact_boundary_line().encode())
+        assert is_compaction_boundary(summary.encode())
+        assert not is_compaction_boundary(_user_line('compact_boundary').encode())
+        assert not is_compaction_boundary(_assistant_line(1).encode())
+
+    def test_cumulative_tokens_survive_compaction(self, reader, tmp_path):
+        """コンパクション後もコンテキストサイズの増加分だけ累積トークン数が増える"""
+        path = tmp_path / 'transcript.jsonl'
+        path.write_text(_assistant_line(1000))
+        assert reader.get_usage_state(str(path)).cumulative_tokens == 1000
+
+        self._append(path, _assistant_line(5000))
+        assert reader.get_usage_state(str(path)).cumulative_tokens == 5000
+
+        self._append(path, _compact_boundary_line(), _user_line('summary'), _assistant_line(800))
+        state = reader.get_usage_state(str(path))
+        assert (state.context_tokens, state.cumulative_tokens) == (800, 5000)
+
+        self._append(path, _assistant_line(1300))
+        assert reader.get_usage_state(str(path)).cumulative_tokens == 5500
+
+    def test_boundary_is_carried_across_reads(self, reader, tmp_path):
+        """境界の後のusageが次回の読み取りで追記された場合も基準として扱う"""
+        path = tmp_path / 'transcript.jsonl'
+        path.write_text(_assistant_line(500) + _assistant_line(3000))
+        reader.get_usage_state(str(path))
+
+        self._append(path, _compact_boundary_line())
+        assert reader.get_usage_state(str(path)).cumulative_tokens == 3000
+
+        # 境界後の最初のusageはコンパクション前より大きくても加算しない
+        self._append(path, _assistant_line(3200))
+        assert reader.get_usage_state(str(path)).cumulative_tokens == 3000
+
+    def test_legacy_checkpoint_starts_from_context_size(self, reader, tmp_path):
+        """累積トークン数を持たない旧形式のチェックポイントはコンテキストサイズから始める"""
+        path = tmp_path / 'transcript.jsonl'
+        path.write_text(_assistant_line(700))
+        reader.get_usage_state(str(path))
+        checkpoint_path = reader.get_checkpoint_path(str(path))
+        checkpoint = json.loads(checkpoint_path.read_text())
+        del checkpoint['cumulative_tokens'], checkpoint['after_boundary']
+        checkpoint_path.write_text(json.dumps(checkpoint))
+
+        self._append(path, _assistant_line(900))
+
+        assert reader.get_usage_state(str(path)).cumulative_tokens == 900